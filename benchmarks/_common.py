@@ -0,0 +1,8 @@
+import importlib
+from typing import Any
+
+
+def resolve_callable(path: str) -> Any:
+    """Resolves a `module:attribute` path, as given on the command line."""
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
@@ -0,0 +1,46 @@
+import math
+from runtime.episode_trajectory import EpisodeTrajectory, DelverAction
+from runtime.episode_trajectory.snapshots import (
+    FrameSnapshot,
+    EntityStateSnapshot,
+    SkeletalEntityStateSnapshot,
+)
+
+
+def make_synthetic_trajectory(frames: int = 3600, actions_per_second: int = 60):
+    """
+    Builds a trajectory with one moving skeletal entity and one static entity per
+    frame, shaped like what a headless rollout records.
+    """
+    trajectory = EpisodeTrajectory(actions_per_second, True, "synthetic-level")
+
+    for frame in range(frames):
+        run = (frame // 90) % 3 - 1
+        trajectory.add_delver_action(DelverAction(run=run, jump=frame % 45 == 0))
+
+        t = frame / actions_per_second
+        frame_snapshot = FrameSnapshot()
+        frame_snapshot.add_entity_snapshot(
+            SkeletalEntityStateSnapshot(
+                entity_id="Delver:80.0_48.0",
+                state="NORMAL",
+                position=[80.0 + 120.0 * t, 48.0 + 30.0 * abs(math.sin(t * 3))],
+                angle=0.0,
+                velocity=[120.0, 90.0 * math.cos(t * 3)],
+                locomotion_state="RUN" if run else "IDLE",
+                move_angle=0.0 if run > 0 else (180.0 if run < 0 else None),
+                is_moving_intentionally=run != 0,
+            )
+        )
+        frame_snapshot.add_entity_snapshot(
+            EntityStateSnapshot(
+                entity_id="Entity:400.0_48.0",
+                state="NORMAL",
+                position=[400.0, 48.0],
+                angle=0.0,
+                velocity=[0.0, 0.0],
+            )
+        )
+        trajectory.add_frame_snapshot(frame_snapshot)
+
+    return trajectory
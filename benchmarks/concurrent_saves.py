@@ -0,0 +1,97 @@
+"""
+Stress test for concurrent trajectory saving: several processes, each running
+many concurrent save coroutines for the same agent, in a temporary directory.
+
+Checks that every trajectory was saved exactly once under a distinct index, then
+prints a single JSON object with the throughput.
+
+Usage:
+    python -m benchmarks.concurrent_saves [--processes 4] [--saves-per-process 100]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from runtime.episode_trajectory import EpisodeTrajectory, DelverAction
+from runtime.episode_trajectory.trajectory_summary import read_trajectory_summary
+from runtime.episode_trajectory._get_trajectory_dir import get_trajectory_dir
+
+AGENT_NAME = "concurrent-saves"
+
+
+def _save_many(worker: int, saves: int, binary: bool):
+    async def save(number: int):
+        # The level hash identifies the save, so the check can find every one.
+        trajectory = EpisodeTrajectory(60, number % 2 == 0, f"{worker}:{number}")
+        trajectory.add_delver_action(DelverAction(run=1, jump=False))
+        await trajectory.save(AGENT_NAME, binary=binary)
+
+    async def main():
+        await asyncio.gather(*(save(number) for number in range(saves)))
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--saves-per-process", type=int, default=100)
+    parser.add_argument("--binary", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        # Trajectory directories are relative to the working directory.
+        original_dir = os.getcwd()
+        os.chdir(working_dir)
+
+        start_time = time.perf_counter()
+        processes = [
+            multiprocessing.Process(
+                target=_save_many,
+                args=(worker, args.saves_per_process, args.binary),
+            )
+            for worker in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start_time
+
+        expected = {
+            f"{worker}:{number}"
+            for worker in range(args.processes)
+            for number in range(args.saves_per_process)
+        }
+        trajectory_files = sorted(get_trajectory_dir(AGENT_NAME).glob("trajectory_*"))
+        saved = [read_trajectory_summary(path).level_hash for path in trajectory_files]
+        indices = sorted(int(path.stem.split("_")[1]) for path in trajectory_files)
+
+        assert all(process.exitcode == 0 for process in processes)
+        assert sorted(saved) == sorted(expected), "lost or overwritten trajectories"
+        assert indices == list(range(len(expected))), "indices are not contiguous"
+
+        with open(get_trajectory_dir(AGENT_NAME) / "metadata.json") as f:
+            trajectory_count = json.load(f)["trajectory_count"]
+        assert trajectory_count == len(expected), "metadata lost saves"
+
+        os.chdir(original_dir)
+
+    print(
+        json.dumps(
+            {
+                "saves": len(expected),
+                "processes": args.processes,
+                "seconds": elapsed,
+                "saves_per_second": len(expected) / elapsed,
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Measures the cold import time of `runtime` and checks that a headless import (and
+a headless Runtime on the stand-in level) never loads rendering dependencies.
+
+Usage:
+    python -m benchmarks.import_time [--budget-ms 500] [--repetitions 5]
+
+Every measurement runs in a fresh interpreter. A single JSON object is printed;
+the exit status is 1 if a rendering module was loaded or the best import time
+exceeds the budget, so this can gate CI.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+RENDERING_MODULES = ("pyglet", "pyglet_dragonbones")
+
+# Run in a fresh interpreter: prints the import time and the rendering modules
+# loaded by importing runtime and building a headless Runtime.
+_PROBE = """
+import json, sys, time
+start_time = time.perf_counter()
+import runtime
+import_seconds = time.perf_counter() - start_time
+
+def rendering_modules():
+    return sorted(
+        name for name in sys.modules if name.split(".")[0] in {rendering_modules!r}
+    )
+
+after_import = rendering_modules()
+from benchmarks.stand_in_level import make_stand_in_runtime
+runtime = make_stand_in_runtime()
+for step in range(60):
+    runtime.apply_delver_action({{"run": 1, "jump": step == 0}}, 1 / 60)
+    runtime.update(1 / 60)
+
+print(json.dumps({{
+    "import_seconds": import_seconds,
+    "after_import": after_import,
+    "after_headless_run": rendering_modules(),
+}}))
+"""
+
+
+def _probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(rendering_modules=RENDERING_MODULES)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=500.0)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    probes = [_probe() for _ in range(args.repetitions)]
+    import_ms = [probe["import_seconds"] * 1000 for probe in probes]
+    loaded_rendering_modules = sorted(
+        {
+            name
+            for probe in probes
+            for name in probe["after_import"] + probe["after_headless_run"]
+        }
+    )
+
+    best_ms = min(import_ms)
+    within_budget = best_ms <= args.budget_ms
+    print(
+        json.dumps(
+            {
+                "import_ms": {"best": best_ms, "worst": max(import_ms)},
+                "budget_ms": args.budget_ms,
+                "within_budget": within_budget,
+                "rendering_modules_loaded": loaded_rendering_modules,
+            }
+        )
+    )
+
+    if loaded_rendering_modules or not within_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compares interpolate_frames with calling interpolate_frame_snapshots once per
+in-between frame, resampling the synthetic episode from 60 to 144 Hz.
+
+Usage:
+    python -m benchmarks.interpolation [--frames 3600]
+
+Checks that both ways agree, including a delver tilting from +20 to -20 degrees,
+whose in-between angle must stay near 0 rather than wrap around. Then prints a
+single JSON object.
+"""
+
+import argparse
+import json
+import math
+import time
+import numpy as np
+from runtime.world_objects.entities.delver import Delver
+from runtime.episode_trajectory.snapshots import (
+    FrameSnapshot,
+    FrameSnapshotStore,
+    SkeletalEntityStateSnapshot,
+    interpolate_frame_snapshots,
+    interpolate_frames,
+    resample_frames,
+)
+from ._synthetic_trajectory import make_synthetic_trajectory
+
+SOURCE_RATE = 60
+TARGET_RATE = 144
+
+
+def _tilting_frames(frames: int) -> list[FrameSnapshot]:
+    """A delver tilting back and forth between the air tilt angles."""
+    tilt = Delver.AIR_TILT_ANGLE
+    return [
+        FrameSnapshot(
+            [
+                SkeletalEntityStateSnapshot(
+                    entity_id="Delver:80.0_48.0",
+                    state="NORMAL",
+                    position=[80.0 + frame, 48.0],
+                    angle=tilt if frame % 2 == 0 else -tilt,
+                    velocity=[60.0, 0.0],
+                    locomotion_state="JUMP",
+                    move_angle=None,
+                    is_moving_intentionally=False,
+                )
+            ]
+        )
+        for frame in range(frames)
+    ]
+
+
+def _legacy_frames(
+    frame_list: list[FrameSnapshot], positions: np.ndarray
+) -> list[FrameSnapshot]:
+    frames = []
+    for position in positions:
+        earlier = math.floor(position)
+        alpha = position - earlier
+        if alpha == 0:
+            frames.append(frame_list[earlier])
+        else:
+            frames.append(
+                interpolate_frame_snapshots(
+                    frame_list[earlier], frame_list[earlier + 1], alpha
+                )
+            )
+    return frames
+
+
+def _max_difference(
+    frames: list[FrameSnapshot], store: FrameSnapshotStore, fields: list[str]
+) -> float:
+    difference = 0.0
+    for frame, stored_frame in zip(frames, store):
+        for entity, stored_entity in zip(frame.entities, stored_frame.entities):
+            for field in fields:
+                difference = max(
+                    difference,
+                    float(
+                        np.abs(
+                            np.subtract(
+                                getattr(entity, field), getattr(stored_entity, field)
+                            )
+                        ).max()
+                    ),
+                )
+    return difference
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=3600)
+    args = parser.parse_args()
+
+    tilting = _tilting_frames(4)
+    halfway = interpolate_frames(tilting, [0.5, 1.5, 2.5])
+    tilt_difference = _max_difference(
+        _legacy_frames(tilting, np.array([0.5, 1.5, 2.5])), halfway, ["angle"]
+    )
+    assert tilt_difference < 1e-9, f"tilt angles differ by {tilt_difference}"
+
+    store = make_synthetic_trajectory(args.frames).frame_snapshots
+    if not isinstance(store, FrameSnapshotStore):
+        store = FrameSnapshotStore.from_frames(store)
+    frame_list = list(store)
+    positions = np.arange(0.0, len(store) - 1, SOURCE_RATE / TARGET_RATE)
+
+    start_time = time.perf_counter()
+    resampled = resample_frames(store, SOURCE_RATE, TARGET_RATE)
+    vectorized_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    legacy = _legacy_frames(frame_list, positions)
+    legacy_seconds = time.perf_counter() - start_time
+
+    difference = _max_difference(
+        legacy, resampled, ["position", "velocity", "angle", "angular_velocity"]
+    )
+    assert difference < 1e-6, f"interpolated frames differ by {difference}"
+
+    print(
+        json.dumps(
+            {
+                "frames": args.frames,
+                "resampled_frames": len(resampled),
+                "max_difference": difference,
+                "tilt_max_difference": tilt_difference,
+                "ms": {
+                    "resample_frames": vectorized_seconds * 1e3,
+                    "interpolate_frame_snapshots": legacy_seconds * 1e3,
+                },
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compares ObservationEncoder's vectorized ray fan with casting each ray through
+a pymunk Space segment query, one call per ray, on the stand-in level.
+
+Usage:
+    python -m benchmarks.observations [--runtimes 64] [--num-rays 16]
+
+Each runtime's delver is moved to a different spot first. Checks that both ways
+agree on every ray, then prints a single JSON object.
+"""
+
+import argparse
+import json
+import math
+import timeit
+import numpy as np
+import pymunk
+from runtime.observation_encoder import ObservationEncoder
+from .stand_in_level import make_stand_in_runtime
+
+
+def naive_rays(runtime, encoder: ObservationEncoder) -> np.ndarray:
+    """The per-ray approach: one Space query per ray."""
+    origin = runtime.delver.body.position
+    space = runtime.space
+    fractions = np.ones(encoder.num_rays)
+    for i in range(encoder.num_rays):
+        angle = i * 2 * math.pi / encoder.num_rays
+        end = origin + pymunk.Vec2d(math.cos(angle), math.sin(angle)) * (
+            encoder.ray_length
+        )
+        # Rays start inside the delver, so segment_query_first would only ever
+        # return its own shape; take the nearest platform hit instead.
+        for hit in sorted(
+            space.segment_query(origin, end, 0, pymunk.ShapeFilter()),
+            key=lambda hit: hit.alpha,
+        ):
+            shape = hit.shape
+            if shape.body.body_type == pymunk.Body.STATIC and not shape.sensor:
+                fractions[i] = hit.alpha
+                break
+    return fractions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runtimes", type=int, default=64)
+    parser.add_argument("--num-rays", type=int, default=16)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    encoder = ObservationEncoder(num_rays=args.num_rays)
+    runtimes = []
+    for i in range(args.runtimes):
+        runtime = make_stand_in_runtime()
+        runtime.delver.body.position = (64 + (i * 37) % 1150, 48 + (i * 53) % 400)
+        runtimes.append(runtime)
+
+    rays = encoder.layout["rays"]
+    vectorized = encoder.encode_batch(runtimes)[:, rays]
+    naive = np.stack([naive_rays(runtime, encoder) for runtime in runtimes])
+    max_difference = float(np.abs(vectorized - naive).max())
+    assert max_difference < 1e-7, f"ray fractions differ by {max_difference}"
+
+    def per_observation_us(function) -> float:
+        seconds = min(timeit.repeat(function, number=args.number, repeat=5))
+        return seconds / args.number / args.runtimes * 1e6
+
+    print(
+        json.dumps(
+            {
+                "runtimes": args.runtimes,
+                "num_rays": args.num_rays,
+                "observation_size": encoder.observation_size,
+                "max_ray_difference": max_difference,
+                "us_per_observation": {
+                    "naive_rays_only": per_observation_us(
+                        lambda: [naive_rays(runtime, encoder) for runtime in runtimes]
+                    ),
+                    "encoder_one_by_one": per_observation_us(
+                        lambda: [encoder.encode(runtime) for runtime in runtimes]
+                    ),
+                    "encoder_batched": per_observation_us(
+                        lambda: encoder.encode_batch(runtimes)
+                    ),
+                },
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
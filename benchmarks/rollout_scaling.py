@@ -0,0 +1,141 @@
+"""
+Measures how RolloutExecutor throughput scales with the number of worker processes.
+
+Usage:
+    python -m benchmarks.rollout_scaling [--level-factory my_levels:load_level]
+
+`--level-factory` points to a module-level callable that returns a Level; the
+stand-in level is used by default. One JSON object is printed per worker count,
+then a summary of the whole curve. The suite reports the same sweep as its
+rollout_scaling benchmark.
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable, Iterable
+from runtime import RolloutExecutor
+from ._common import resolve_callable
+from .stand_in_level import STAND_IN_LEVEL_HASH
+
+STAND_IN_LEVEL_FACTORY = "benchmarks.stand_in_level:make_stand_in_level"
+
+
+def run_right_policy(runtime, step: int):
+    """Deterministic policy: run right and jump every half second."""
+    return {"run": 1, "jump": step % 30 == 0}
+
+
+def default_worker_counts() -> list[int]:
+    """Powers of two up to the CPU count, and the CPU count itself."""
+    cpu_count = os.cpu_count() or 1
+    counts = [n for n in (1, 2, 4, 8, 16, 32, 64) if n < cpu_count]
+    return counts + [cpu_count]
+
+
+def _measure(
+    level_factory: Callable[[], Any],
+    level_hash: str | None,
+    workers: int,
+    episodes: int,
+    max_steps: int,
+) -> dict:
+    with RolloutExecutor(
+        level_factory,
+        run_right_policy,
+        max_workers=workers,
+        max_steps=max_steps,
+        level_hash=level_hash,
+    ) as executor:
+        # Warm the pool up so process start-up and level construction are not timed.
+        executor.run(workers)
+
+        start_time = time.perf_counter()
+        summaries = executor.run(episodes)
+        elapsed = time.perf_counter() - start_time
+
+    steps = sum(summary.steps for summary in summaries)
+    return {
+        "workers": workers,
+        "episodes": episodes,
+        "seconds": elapsed,
+        "episodes_per_second": episodes / elapsed,
+        "steps_per_second": steps / elapsed,
+    }
+
+
+def measure_scaling(
+    level_factory: Callable[[], Any],
+    worker_counts: Iterable[int],
+    episodes_per_worker: int,
+    max_steps: int,
+    level_hash: str | None = None,
+) -> list[dict]:
+    """
+    Throughput at each worker count, with its speedup over the first count's
+    per-worker throughput and its parallel efficiency.
+    """
+    results = []
+    baseline = None
+    for workers in worker_counts:
+        result = _measure(
+            level_factory,
+            level_hash,
+            workers,
+            workers * episodes_per_worker,
+            max_steps,
+        )
+        if baseline is None:
+            baseline = result["episodes_per_second"] / workers
+        result["speedup"] = result["episodes_per_second"] / baseline
+        result["efficiency"] = result["speedup"] / workers
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--level-factory", default=STAND_IN_LEVEL_FACTORY)
+    parser.add_argument(
+        "--level-hash",
+        help="Level hash for the workers' Runtimes (the stand-in level's by default).",
+    )
+    parser.add_argument(
+        "--workers",
+        default=",".join(str(n) for n in default_worker_counts()),
+        help="Comma-separated worker counts to measure.",
+    )
+    parser.add_argument("--episodes-per-worker", type=int, default=8)
+    parser.add_argument("--max-steps", type=int, default=600)
+    args = parser.parse_args()
+
+    level_hash = args.level_hash
+    if level_hash is None and args.level_factory == STAND_IN_LEVEL_FACTORY:
+        level_hash = STAND_IN_LEVEL_HASH
+
+    results = measure_scaling(
+        resolve_callable(args.level_factory),
+        (int(n) for n in args.workers.split(",")),
+        args.episodes_per_worker,
+        args.max_steps,
+        level_hash,
+    )
+    for result in results:
+        print(json.dumps(result))
+    print(
+        json.dumps(
+            {
+                "cpu_count": os.cpu_count(),
+                "workers": [result["workers"] for result in results],
+                "episodes_per_second": [
+                    result["episodes_per_second"] for result in results
+                ],
+                "speedup": [result["speedup"] for result in results],
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
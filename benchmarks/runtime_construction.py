@@ -0,0 +1,75 @@
+"""
+Compares Runtime construction time with a cold and a warm level geometry cache.
+
+Usage:
+    python -m benchmarks.runtime_construction --level-factory my_levels:load_level
+
+`--level-factory` points to a module-level callable that returns a Level.
+A single JSON object is printed.
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from runtime import Runtime
+from runtime.level_geometry_cache import level_geometry_cache
+from ._common import resolve_callable
+
+LEVEL_HASH = "benchmark-level"
+
+
+def _time_construction(level, repetitions: int, before_each=None) -> list[float]:
+    durations = []
+    for _ in range(repetitions):
+        if before_each:
+            before_each()
+        start_time = time.perf_counter()
+        Runtime(level, render=False, level_hash=LEVEL_HASH)
+        durations.append(time.perf_counter() - start_time)
+    return durations
+
+
+def _summary(durations: list[float]) -> dict:
+    return {
+        "mean_ms": statistics.mean(durations) * 1000,
+        "median_ms": statistics.median(durations) * 1000,
+        "min_ms": min(durations) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--level-factory", required=True)
+    parser.add_argument("--repetitions", type=int, default=50)
+    args = parser.parse_args()
+
+    level = resolve_callable(args.level_factory)()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        level_geometry_cache.cache_dir = None
+        cold = _time_construction(level, args.repetitions, level_geometry_cache.clear)
+        warm = _time_construction(level, args.repetitions)
+
+        # Warm from disk: the in-memory entry is dropped before every construction.
+        level_geometry_cache.cache_dir = cache_dir
+        level_geometry_cache.clear()
+        Runtime(level, render=False, level_hash=LEVEL_HASH)
+        disk = _time_construction(level, args.repetitions, level_geometry_cache.clear)
+        level_geometry_cache.cache_dir = None
+
+    print(
+        json.dumps(
+            {
+                "repetitions": args.repetitions,
+                "cold": _summary(cold),
+                "warm_memory": _summary(warm),
+                "warm_disk": _summary(disk),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark of entity snapshot capture and decoding, through the cached
+factory registry and through the per-call dispatch it replaced.
+
+Usage:
+    python -m benchmarks.snapshot_factories --level-factory my_levels:load_level
+
+`--level-factory` points to a module-level callable that returns a Level; its
+entities are captured. A single JSON object is printed.
+"""
+
+import argparse
+import json
+import timeit
+from dataclasses import fields
+import runtime.world_objects.entities as entities
+from runtime import Runtime
+from runtime.world_objects.entities import Entity, SkeletalEntity
+from runtime.episode_trajectory.snapshots import (
+    FrameSnapshot,
+    EntityStateSnapshotFactory,
+    SkeletalEntityStateSnapshotFactory,
+)
+from ._common import resolve_callable
+
+
+def _uncached_factory(entity_type: type) -> EntityStateSnapshotFactory:
+    """The dispatch done for every snapshot before the registry existed."""
+    if issubclass(entity_type, SkeletalEntity) or entity_type == SkeletalEntity:
+        return SkeletalEntityStateSnapshotFactory()
+    return EntityStateSnapshotFactory()
+
+
+def _per_call_us(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--level-factory", required=True)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    runtime = Runtime(resolve_callable(args.level_factory)(), render=False)
+    world_objects = runtime.world_objects_controller.get_world_objects_by_type(Entity)
+
+    frame_snapshot = FrameSnapshot()
+    for entity in world_objects:
+        frame_snapshot.add_entity(entity)
+    snapshot_jsons = [
+        {field.name: getattr(snapshot, field.name) for field in fields(snapshot)}
+        for snapshot in frame_snapshot.entities
+    ]
+
+    def capture_cached():
+        frame = FrameSnapshot()
+        for entity in world_objects:
+            frame.add_entity(entity)
+
+    def capture_uncached():
+        frame = FrameSnapshot()
+        for entity in world_objects:
+            factory = _uncached_factory(type(entity))
+            frame.add_entity_snapshot(factory.create_state_snapshot_from_entity(entity))
+
+    def decode_cached():
+        frame = FrameSnapshot()
+        for snapshot_json in snapshot_jsons:
+            frame.add_entity_from_json(snapshot_json)
+
+    def decode_uncached():
+        frame = FrameSnapshot()
+        for snapshot_json in snapshot_jsons:
+            factory = _uncached_factory(getattr(entities, snapshot_json["entity_type"]))
+            frame.add_entity_snapshot(
+                factory.create_state_snapshot_from_json(snapshot_json)
+            )
+
+    print(
+        json.dumps(
+            {
+                "entities_per_frame": len(world_objects),
+                "capture_frame_us": {
+                    "registry": _per_call_us(capture_cached, args.number),
+                    "per_call_dispatch": _per_call_us(capture_uncached, args.number),
+                },
+                "decode_frame_us": {
+                    "registry": _per_call_us(decode_cached, args.number),
+                    "per_call_dispatch": _per_call_us(decode_uncached, args.number),
+                },
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
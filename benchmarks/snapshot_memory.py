@@ -0,0 +1,54 @@
+"""
+Compares the memory held by an episode's frame snapshots as a list of
+FrameSnapshot objects and as a FrameSnapshotStore.
+
+Usage:
+    python -m benchmarks.snapshot_memory [--frames 3600]
+
+A single JSON object is printed.
+"""
+
+import argparse
+import json
+import tracemalloc
+from runtime.episode_trajectory.snapshots import FrameSnapshotStore
+from ._synthetic_trajectory import make_synthetic_trajectory
+
+
+def _traced_bytes(build) -> tuple[int, object]:
+    tracemalloc.start()
+    try:
+        result = build()
+        traced_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return traced_bytes, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=3600)
+    args = parser.parse_args()
+
+    store = make_synthetic_trajectory(args.frames).frame_snapshots
+    if not isinstance(store, FrameSnapshotStore):
+        store = FrameSnapshotStore.from_frames(store)
+
+    list_bytes, frame_list = _traced_bytes(lambda: list(store))
+    store_bytes, copied_store = _traced_bytes(
+        lambda: FrameSnapshotStore.from_frames(frame_list)
+    )
+    assert copied_store == frame_list
+
+    results = {
+        "frames": args.frames,
+        "list_bytes": list_bytes,
+        "store_bytes": store_bytes,
+        "store_column_bytes": copied_store.nbytes,
+        "ratio": list_bytes / store_bytes,
+    }
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+A synthetic stand-in for `level.Level`, so benchmarks run without the level editor
+package or level files.
+
+It provides only what Runtime reads from a level: `map.tile_size`,
+`map.grid_pos_to_actual_pos`, `map.world_objects_map.all_elements` and a
+"platforms" tilemap layer, whose `tiles` grid holds a floor, two walls and a few
+floating platforms. pytiling's tracer needs a real tilemap layer, so
+StandInRuntime traces the grid itself, the way pytiling does: into segments along
+the borders of solid tiles. make_stand_in_level() seeds the level geometry cache
+with that geometry under STAND_IN_LEVEL_HASH, so plain Runtimes built with that
+level hash (e.g. by a RuntimePool or RolloutExecutor) find it there.
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterator
+import numpy as np
+import pymunk
+from runtime import Runtime
+from runtime.level_geometry_cache import LevelGeometry, level_geometry_cache
+from runtime.world_objects.collision_type import CollisionType
+
+STAND_IN_LEVEL_HASH = "benchmark-stand-in-level"
+
+TILE_SIZE = (32, 32)
+GRID_SIZE = (40, 20)
+
+# Solid platform blocks as (left, bottom), (right, top) grid positions.
+PLATFORM_BLOCKS = [
+    ((0, 0), (40, 1)),  # floor
+    ((0, 1), (1, 20)),  # left wall
+    ((39, 1), (40, 20)),  # right wall
+    ((6, 4), (10, 5)),
+    ((14, 6), (19, 7)),
+    ((24, 4), (28, 5)),
+]
+
+
+def stand_in_tiles() -> np.ndarray:
+    """The platforms layer's tile grid, indexed [y, x] from the bottom left."""
+    tiles = np.zeros((GRID_SIZE[1], GRID_SIZE[0]), dtype=np.uint8)
+    for (left, bottom), (right, top) in PLATFORM_BLOCKS:
+        tiles[bottom:top, left:right] = 1
+    return tiles
+
+
+@dataclass
+class StandInElement:
+    name: str
+    position: tuple[int, int]
+    canvas_object_name: str = "default"
+
+
+@dataclass
+class StandInWorldObjectsMap:
+    all_elements: list[StandInElement] = field(
+        default_factory=lambda: [
+            StandInElement("delver", (2, 1)),
+            StandInElement("goal", (36, 1)),
+        ]
+    )
+
+
+class StandInTilemapLayer:
+    def __init__(self, tiles: np.ndarray):
+        self.tiles = tiles
+
+
+class StandInTilemap:
+    def __init__(self):
+        self.layers = {"platforms": StandInTilemapLayer(stand_in_tiles())}
+
+    def get_layer(self, name: str):
+        return self.layers[name]
+
+
+class StandInMap:
+    tile_size = TILE_SIZE
+    grid_size = GRID_SIZE
+
+    def __init__(self):
+        self.tilemap = StandInTilemap()
+        self.world_objects_map = StandInWorldObjectsMap()
+
+    def grid_pos_to_actual_pos(self, position: tuple[int, int]) -> tuple[int, int]:
+        return (position[0] * TILE_SIZE[0], position[1] * TILE_SIZE[1])
+
+
+class StandInLevel:
+    def __init__(self):
+        self.map = StandInMap()
+
+
+def _edge_runs(edges: np.ndarray) -> Iterator[tuple[int, int]]:
+    """(start, stop) of the runs of equal, non-zero values in a line of edges."""
+    start = None
+    for i, edge in enumerate([*edges.tolist(), 0]):
+        if start is not None and edge != edges[start]:
+            yield start, i
+            start = None
+        if start is None and edge:
+            start = i
+
+
+def trace_platforms(layer: StandInTilemapLayer, space: pymunk.Space):
+    """
+    Adds a static segment along every border between solid and empty tiles, with
+    collinear borders merged. Outside the grid counts as empty.
+    """
+    tile_width, tile_height = TILE_SIZE
+    solid = np.pad(layer.tiles != 0, 1).astype(np.int8)
+    # Non-zero where the solid side changes, signed by which side is solid.
+    horizontal_borders = solid[1:, 1:-1] - solid[:-1, 1:-1]
+    vertical_borders = solid[1:-1, 1:] - solid[1:-1, :-1]
+
+    segments = [
+        ((left * tile_width, y * tile_height), (right * tile_width, y * tile_height))
+        for y, borders in enumerate(horizontal_borders)
+        for left, right in _edge_runs(borders)
+    ] + [
+        ((x * tile_width, bottom * tile_height), (x * tile_width, top * tile_height))
+        for x, borders in enumerate(vertical_borders.T)
+        for bottom, top in _edge_runs(borders)
+    ]
+
+    shapes = []
+    for start, end in segments:
+        shape = pymunk.Segment(space.static_body, start, end, 0)
+        shape.friction = 1.0
+        shape.collision_type = CollisionType.PLATFORM
+        shapes.append(shape)
+    space.add(*shapes)
+
+
+class StandInRuntime(Runtime):
+    """A Runtime that traces the stand-in's tile grid on level geometry misses."""
+
+    def _trace_platform_physics(self):
+        trace_platforms(self.level.map.tilemap.get_layer("platforms"), self.space)
+
+
+def seed_stand_in_geometry():
+    """Puts the stand-in geometry into the process-wide level geometry cache."""
+    if level_geometry_cache.get(STAND_IN_LEVEL_HASH) is None:
+        space = pymunk.Space()
+        layer = StandInTilemap().get_layer("platforms")
+        geometry = LevelGeometry.capture(space, lambda: trace_platforms(layer, space))
+        level_geometry_cache.put(STAND_IN_LEVEL_HASH, geometry)
+
+
+def make_stand_in_level() -> StandInLevel:
+    seed_stand_in_geometry()
+    return StandInLevel()
+
+
+def make_stand_in_runtime(**kwargs) -> StandInRuntime:
+    """Builds a headless Runtime on the stand-in level."""
+    return StandInRuntime(
+        make_stand_in_level(), render=False, level_hash=STAND_IN_LEVEL_HASH, **kwargs
+    )
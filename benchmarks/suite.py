@@ -0,0 +1,275 @@
+"""
+Benchmarks the runtime hot paths on the stand-in level, offline.
+
+Usage:
+    python -m benchmarks.suite [--output results.json] [--only update_steps ...]
+
+Measures Runtime construction, RuntimePool acquisition, headless Runtime.update,
+RolloutExecutor throughput against the number of workers, FrameSnapshot capture,
+EpisodeTrajectory JSON encoding and decoding, TrajectorySaver saves,
+TrajectoryStatsCalculator.get_stats and interpolate_frame_snapshots. A single
+JSON object is printed (and written to `--output`): the environment, then one
+entry per benchmark with its value and unit, so runs can be compared to track
+regressions.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+import numpy as np
+import pymunk
+from runtime import Runtime, RuntimePool
+from runtime.config import PHYSICS_FPS
+from runtime.level_geometry_cache import level_geometry_cache
+from runtime.world_objects.entities import Entity
+from runtime.episode_trajectory import (
+    EpisodeTrajectoryFactory,
+    TrajectoryStatsCalculator,
+)
+from runtime.episode_trajectory.trajectory_saver import TrajectorySaver
+from runtime.episode_trajectory.snapshots import (
+    FrameSnapshot,
+    interpolate_frame_snapshots,
+)
+from ._synthetic_trajectory import make_synthetic_trajectory
+from .rollout_scaling import default_worker_counts, measure_scaling
+from .stand_in_level import (
+    STAND_IN_LEVEL_HASH,
+    StandInRuntime,
+    make_stand_in_level,
+    make_stand_in_runtime,
+)
+
+AGENT_NAME = "benchmark-suite"
+
+
+def _best_per_call(function, number: int, repeat: int = 5) -> float:
+    """Best seconds per call over `repeat` runs of `number` calls."""
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def _result(value: float, unit: str, **details) -> dict:
+    return {"value": value, "unit": unit, **details}
+
+
+def bench_runtime_construction(args) -> dict:
+    """
+    Construction with the level geometry cached, and without: the cache is cleared
+    before each uncached construction, so the platforms are traced from the tiles.
+    """
+    level = make_stand_in_level()
+    number = max(args.scale // 100, 5)
+    seconds = _best_per_call(
+        lambda: Runtime(level, render=False, level_hash=STAND_IN_LEVEL_HASH),
+        number=number,
+    )
+    uncached_seconds = min(
+        timeit.repeat(
+            lambda: StandInRuntime(level, render=False),
+            setup=level_geometry_cache.clear,
+            number=1,
+            repeat=number,
+        )
+    )
+    return _result(seconds * 1e3, "ms", uncached_ms=uncached_seconds * 1e3)
+
+
+def bench_runtime_pool_acquire(args) -> dict:
+    """Starting an episode from a warm RuntimePool, with release() after it."""
+    level = make_stand_in_level()
+    with RuntimePool(background_refill=False) as pool:
+        pool.prewarm(level, STAND_IN_LEVEL_HASH)
+
+        acquire_seconds = []
+        for _ in range(max(args.scale // 10, 50)):
+            start_time = time.perf_counter()
+            runtime = pool.acquire(level, STAND_IN_LEVEL_HASH)
+            acquire_seconds.append(time.perf_counter() - start_time)
+            pool.release(runtime)
+
+    return _result(
+        float(np.median(acquire_seconds)) * 1e3,
+        "ms",
+        p99_ms=float(np.percentile(acquire_seconds, 99)) * 1e3,
+    )
+
+
+def bench_update_steps(args) -> dict:
+    runtime = make_stand_in_runtime()
+    dt = 1.0 / PHYSICS_FPS
+    steps = args.scale * 3
+
+    start_time = time.perf_counter()
+    for step in range(steps):
+        runtime.apply_delver_action({"run": 1, "jump": step % 30 == 0}, dt)
+        runtime.update(dt)
+        if runtime.victorious:
+            runtime.reset()
+    elapsed = time.perf_counter() - start_time
+
+    return _result(steps / elapsed, "steps/s", steps=steps)
+
+
+def bench_rollout_scaling(args) -> dict:
+    """Episodes per second of a RolloutExecutor at each worker count."""
+    curve = measure_scaling(
+        make_stand_in_level,
+        default_worker_counts(),
+        episodes_per_worker=max(args.scale // 900, 2),
+        max_steps=PHYSICS_FPS * 10,
+        level_hash=STAND_IN_LEVEL_HASH,
+    )
+    return _result(
+        curve[-1]["episodes_per_second"],
+        "episodes/s",
+        cpu_count=os.cpu_count(),
+        workers=curve,
+    )
+
+
+def bench_frame_snapshot_capture(args) -> dict:
+    runtime = make_stand_in_runtime()
+    entities = runtime.world_objects_controller.get_world_objects_by_type(Entity)
+
+    def capture():
+        frame_snapshot = FrameSnapshot()
+        for entity in entities:
+            frame_snapshot.add_entity(entity)
+
+    seconds = _best_per_call(capture, number=args.scale)
+    return _result(seconds * 1e6, "us/frame", entities=len(entities))
+
+
+def bench_trajectory_to_json(args) -> dict:
+    trajectory = make_synthetic_trajectory(args.scale)
+    seconds = _best_per_call(trajectory.to_json, number=1, repeat=3)
+    return _result(seconds * 1e3, "ms", frames=args.scale)
+
+
+def bench_trajectory_from_json(args) -> dict:
+    trajectory_json = make_synthetic_trajectory(args.scale).to_json()
+    seconds = _best_per_call(
+        lambda: EpisodeTrajectoryFactory.from_json(trajectory_json),
+        number=1,
+        repeat=3,
+    )
+    return _result(seconds * 1e3, "ms", frames=args.scale)
+
+
+def bench_trajectory_saves(args) -> dict:
+    trajectory_json = make_synthetic_trajectory(PHYSICS_FPS).to_json()
+    saves = max(args.scale // 20, 10)
+
+    async def save_all():
+        saver = TrajectorySaver(AGENT_NAME)
+        start_time = time.perf_counter()
+        for _ in range(saves):
+            await saver.save_trajectory_json(trajectory_json)
+        return time.perf_counter() - start_time
+
+    elapsed = asyncio.run(save_all())
+    return _result(saves / elapsed, "saves/s", saves=saves)
+
+
+def bench_trajectory_stats(args) -> dict:
+    """Runs after bench_trajectory_saves, over the trajectories it saved."""
+
+    async def get_stats():
+        calculator = TrajectoryStatsCalculator(AGENT_NAME)
+        start_time = time.perf_counter()
+        stats = await calculator.get_stats()
+        cold = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        await calculator.get_stats()
+        incremental = time.perf_counter() - start_time
+        return stats, cold, incremental
+
+    stats, cold, incremental = asyncio.run(get_stats())
+    return _result(
+        cold * 1e3,
+        "ms",
+        trajectories=stats["amount"],
+        incremental_ms=incremental * 1e3,
+    )
+
+
+def bench_interpolate_frame_snapshots(args) -> dict:
+    frames = list(make_synthetic_trajectory(2).frame_snapshots)
+    seconds = _best_per_call(
+        lambda: interpolate_frame_snapshots(frames[0], frames[1], 0.5),
+        number=args.scale,
+    )
+    return _result(seconds * 1e6, "us/frame", entities=len(frames[0].entities))
+
+
+BENCHMARKS = {
+    "runtime_construction": bench_runtime_construction,
+    "runtime_pool_acquire": bench_runtime_pool_acquire,
+    "update_steps": bench_update_steps,
+    "rollout_scaling": bench_rollout_scaling,
+    "frame_snapshot_capture": bench_frame_snapshot_capture,
+    "trajectory_to_json": bench_trajectory_to_json,
+    "trajectory_from_json": bench_trajectory_from_json,
+    "trajectory_saves": bench_trajectory_saves,
+    "trajectory_stats": bench_trajectory_stats,
+    "interpolate_frame_snapshots": bench_interpolate_frame_snapshots,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=3600,
+        help="Frames per trajectory, and base iteration count of the benchmarks.",
+    )
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--output", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    if "trajectory_stats" in names and "trajectory_saves" not in names:
+        # The stats are computed over the saved trajectories.
+        names.insert(names.index("trajectory_stats"), "trajectory_saves")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as working_dir:
+        # Trajectory directories are relative to the working directory.
+        original_dir = os.getcwd()
+        os.chdir(working_dir)
+        try:
+            for name in names:
+                results[name] = BENCHMARKS[name](args)
+        finally:
+            os.chdir(original_dir)
+
+    report = json.dumps(
+        {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "machine": platform.machine(),
+                "pymunk": pymunk.version,
+                "numpy": np.__version__,
+            },
+            "scale": args.scale,
+            "benchmarks": results,
+        }
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares size and encode/decode speed of the JSON and binary (.npz) trajectory
+formats on a synthetic one-minute episode, including keyframe + delta encoding.
+
+Usage:
+    python -m benchmarks.trajectory_formats [--frames 3600] [--keyframe-interval 60]
+
+A single JSON object is printed.
+"""
+
+import argparse
+import json
+import time
+from runtime.episode_trajectory import EpisodeTrajectoryFactory
+from ._synthetic_trajectory import make_synthetic_trajectory
+
+
+def _best_of(function, repetitions: int) -> float:
+    best = float("inf")
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=3600)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--keyframe-interval", type=int, default=60)
+    args = parser.parse_args()
+
+    trajectory = make_synthetic_trajectory(args.frames)
+    json_string = trajectory.to_json()
+    npz_bytes = trajectory.to_npz()
+    npz_compressed_bytes = trajectory.to_npz(compress=True)
+    npz_keyframe_bytes = trajectory.to_npz(keyframe_interval=args.keyframe_interval)
+
+    assert EpisodeTrajectoryFactory.from_npz(npz_bytes) == trajectory
+    assert EpisodeTrajectoryFactory.from_npz(npz_keyframe_bytes) == trajectory
+
+    results = {
+        "frames": args.frames,
+        "json": {
+            "bytes": len(json_string.encode()),
+            "encode_ms": _best_of(trajectory.to_json, args.repetitions) * 1000,
+            "decode_ms": _best_of(
+                lambda: EpisodeTrajectoryFactory.from_json(json_string),
+                args.repetitions,
+            )
+            * 1000,
+        },
+        "npz": {
+            "bytes": len(npz_bytes),
+            "encode_ms": _best_of(trajectory.to_npz, args.repetitions) * 1000,
+            "decode_ms": _best_of(
+                lambda: EpisodeTrajectoryFactory.from_npz(npz_bytes), args.repetitions
+            )
+            * 1000,
+        },
+        "npz_compressed": {
+            "bytes": len(npz_compressed_bytes),
+            "encode_ms": _best_of(
+                lambda: trajectory.to_npz(compress=True), args.repetitions
+            )
+            * 1000,
+            "decode_ms": _best_of(
+                lambda: EpisodeTrajectoryFactory.from_npz(npz_compressed_bytes),
+                args.repetitions,
+            )
+            * 1000,
+        },
+        "npz_keyframes": {
+            "bytes": len(npz_keyframe_bytes),
+            "encode_ms": _best_of(
+                lambda: trajectory.to_npz(keyframe_interval=args.keyframe_interval),
+                args.repetitions,
+            )
+            * 1000,
+            "decode_ms": _best_of(
+                lambda: EpisodeTrajectoryFactory.from_npz(npz_keyframe_bytes),
+                args.repetitions,
+            )
+            * 1000,
+        },
+    }
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
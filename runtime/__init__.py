@@ -1,3 +1,24 @@
 from .runtime import Runtime
+from .vector_runtime import VectorRuntime, VectorRuntimeState, LOCOMOTION_STATES
+from .rollout_executor import RolloutExecutor, EpisodeSummary
+from .runtime_pool import RuntimePool
+from .observation_encoder import ObservationEncoder
+from .replay_verifier import ReplayVerification, verify_replay
+from .state_hash import hash_entity_states, first_divergent_step
+from .instrumentation import RuntimeInstrumentation
 
-__all__ = ["Runtime"]
+__all__ = [
+    "Runtime",
+    "VectorRuntime",
+    "VectorRuntimeState",
+    "LOCOMOTION_STATES",
+    "RolloutExecutor",
+    "EpisodeSummary",
+    "RuntimePool",
+    "ObservationEncoder",
+    "ReplayVerification",
+    "verify_replay",
+    "hash_entity_states",
+    "first_divergent_step",
+    "RuntimeInstrumentation",
+]
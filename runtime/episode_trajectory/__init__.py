@@ -2,6 +2,10 @@ from .episode_trajectory import EpisodeTrajectory, EpisodeTrajectoryFactory
 from .delver_action import DelverAction
 from .trajectory_loader import TrajectoryLoader
 from .trajectory_stats_calculator import TrajectoryStatsCalculator
+from .streaming_trajectory_recorder import StreamingTrajectoryRecorder
+from .trajectory_reader import TrajectoryReader
+from .trajectory_catalog import TrajectoryCatalog, CatalogEntry
+from .trajectory_summary import TrajectorySummary, read_trajectory_summary
 
 
 __all__ = [
@@ -10,4 +14,10 @@ __all__ = [
     "EpisodeTrajectoryFactory",
     "TrajectoryLoader",
     "TrajectoryStatsCalculator",
+    "StreamingTrajectoryRecorder",
+    "TrajectoryReader",
+    "TrajectoryCatalog",
+    "CatalogEntry",
+    "TrajectorySummary",
+    "read_trajectory_summary",
 ]
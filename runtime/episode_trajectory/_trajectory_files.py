@@ -0,0 +1,36 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from .episode_trajectory import EpisodeTrajectory
+
+# Suffixes a saved trajectory can have, in lookup order.
+TRAJECTORY_SUFFIXES = (".traj", ".npz", ".json")
+
+
+def get_trajectory_file_path(trajectory_dir: "Path", index: int) -> "Path | None":
+    """Returns the file holding the trajectory with the given index, in any format."""
+    for suffix in TRAJECTORY_SUFFIXES:
+        path = trajectory_dir / f"trajectory_{index}{suffix}"
+        if path.is_file():
+            return path
+    return None
+
+
+def get_claim_file_path(trajectory_dir: "Path", index: int) -> "Path":
+    """Returns the file a saver creates to claim the given index while saving."""
+    return trajectory_dir / f".trajectory_{index}.claim"
+
+
+def parse_trajectory_file_content(
+    file_path: "Path", content: bytes
+) -> "EpisodeTrajectory":
+    """Parses the raw content of a trajectory file, based on its suffix."""
+    from .episode_trajectory import EpisodeTrajectoryFactory
+    from .trajectory_stream_format import decode_stream_trajectory
+
+    if file_path.suffix == ".traj":
+        return decode_stream_trajectory(content)
+    if file_path.suffix == ".npz":
+        return EpisodeTrajectoryFactory.from_npz(content)
+    return EpisodeTrajectoryFactory.from_json(content.decode())
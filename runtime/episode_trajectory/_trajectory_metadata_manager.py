@@ -1,48 +1,268 @@
 # filename: _trajectory_metadata_manager.py
 
+import asyncio
+import atexit
+import copy
 import logging
 import json
+import os
+import threading
+import uuid
 from ._get_trajectory_dir import get_trajectory_dir
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 import aiofiles
 
 if TYPE_CHECKING:
     from pathlib import Path
 
 
+def _default_metadata() -> dict:
+    return {"trajectory_count": 0, "stats": {"amount": 0, "victories": 0}}
+
+
+class _MetadataState:
+    """The in-memory copy of one metadata file, shared by every manager using it."""
+
+    def __init__(self, metadata_path: "Path"):
+        self.metadata_path = metadata_path
+        self.metadata: dict | None = None
+        # Bumped on every change; `written_version` is the last one on disk.
+        self.version = 0
+        self.written_version = 0
+        # st_mtime_ns and content of the file as last read or written by this
+        # process, to tell which fields changed here when another process has
+        # replaced it since.
+        self.disk_mtime_ns: int | None = None
+        self.disk_metadata: dict = {}
+        self.flush_task: "asyncio.Task | None" = None
+        self.write_lock = threading.Lock()
+
+    @property
+    def dirty(self) -> bool:
+        return self.version != self.written_version
+
+
+# One state per metadata file in this process, so all managers of an agent (a new
+# one is created for every save) share the same in-memory metadata.
+_states: dict[str, _MetadataState] = {}
+_states_lock = threading.Lock()
+
+
 class TrajectoryMetadataManager:
     """
     Manages the metadata file for an agent's trajectories asynchronously.
+
+    Reads are served from an in-memory copy, and writes update that copy and are
+    flushed to disk in the background, coalesced over FLUSH_INTERVAL seconds. A
+    flush replaces the file atomically (temp file + rename) and is fsynced, so an
+    awaited flush() is durable. If another process replaced the file meanwhile,
+    the fields it changed are merged in first. Pending changes are also flushed
+    when the event loop shuts the flush task down, and at interpreter exit.
     """
 
     METADATA_FILE = "metadata.json"
+    FLUSH_INTERVAL = 0.5
 
     def __init__(self, agent_name: str):
         self.agent_name = agent_name
 
     async def write_metadata(self, metadata: dict):
-        """Asynchronously writes the metadata to the trajectory directory."""
-        metadata_path = self.trajectory_dir / self.METADATA_FILE
-        json_content = json.dumps(metadata, indent=4)
-        async with aiofiles.open(metadata_path, "w") as f:
-            await f.write(json_content)
+        """Replaces the metadata. It is written to disk by the next flush."""
+        state = self._state
+        state.metadata = copy.deepcopy(metadata)
+        self._mark_changed(state)
 
     async def read_metadata(self) -> dict:
-        """Asynchronously reads the metadata file from the trajectory directory."""
+        """Returns a copy of the current metadata."""
+        state = self._state
+        await self._load(state)
+        return copy.deepcopy(state.metadata)
+
+    async def update_metadata(self, update: Callable[[dict], None]) -> dict:
+        """
+        Applies `update` to the metadata in place and returns a copy of the result.
+        `update` runs synchronously on the event loop, so concurrent
+        read-modify-write cycles on that loop are never lost. Other threads or
+        processes are not excluded: another process's changes are merged field by
+        field when flushing (see _merge_disk_changes), and the same field changed
+        in both keeps this process's value, except trajectory_count, which keeps
+        the highest.
+        """
+        state = self._state
+        await self._load(state)
+        update(state.metadata)
+        self._mark_changed(state)
+        return copy.deepcopy(state.metadata)
+
+    async def flush(self):
+        """Writes pending changes to disk. They are durable once this returns."""
+        state = self._state
+        if not state.dirty:
+            return
+
+        version = state.version
+        metadata = copy.deepcopy(state.metadata)
+        await asyncio.to_thread(_write_state, state, metadata, version)
+
+    @property
+    def trajectory_dir(self) -> "Path":
+        """Returns the path to the trajectory directory. This is not I/O bound."""
+        return get_trajectory_dir(self.agent_name)
+
+    @property
+    def _state(self) -> _MetadataState:
         metadata_path = self.trajectory_dir / self.METADATA_FILE
+        key = str(metadata_path.resolve())
+        with _states_lock:
+            state = _states.get(key)
+            if state is None:
+                state = _states[key] = _MetadataState(metadata_path)
+        return state
+
+    async def _load(self, state: _MetadataState):
+        """
+        Loads the file into memory on first use, and again whenever another
+        process has replaced it and there are no local changes pending.
+        """
+        if state.metadata is not None:
+            if state.dirty or _mtime_ns(state.metadata_path) == state.disk_mtime_ns:
+                return
+
+        metadata_path = state.metadata_path
         try:
+            disk_mtime_ns = _mtime_ns(metadata_path)
             async with aiofiles.open(metadata_path, "r") as f:
                 content = await f.read()
                 # json.loads is a sync, CPU-bound operation.
-                return json.loads(content)
+                metadata = json.loads(content)
         except FileNotFoundError:
-            # If the file doesn't exist, return a default dictionary.
-            return {"trajectory_count": 0, "stats": {"amount": 0, "victories": 0}}
+            # If the file doesn't exist, use a default dictionary.
+            disk_mtime_ns = None
+            metadata = _default_metadata()
         except json.JSONDecodeError:
             logging.warning(f"Could not decode {metadata_path}, resetting.")
-            return {"trajectory_count": 0, "stats": {"amount": 0, "victories": 0}}
+            metadata = _default_metadata()
 
-    @property
-    def trajectory_dir(self) -> "Path":
-        """Returns the path to the trajectory directory. This is not I/O bound."""
-        return get_trajectory_dir(self.agent_name)
+        # Changes made while the file was being read win over its content.
+        if state.metadata is None or not state.dirty:
+            state.metadata = metadata
+            state.disk_mtime_ns = disk_mtime_ns
+            state.disk_metadata = copy.deepcopy(metadata)
+
+    def _mark_changed(self, state: _MetadataState):
+        state.version += 1
+        loop = asyncio.get_running_loop()
+        flush_task = state.flush_task
+        # A task of another event loop, which may be closed, would never run here.
+        if flush_task is None or flush_task.done() or flush_task.get_loop() is not loop:
+            state.flush_task = loop.create_task(self._flush_later(state))
+
+    async def _flush_later(self, state: _MetadataState):
+        try:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+        except asyncio.CancelledError:
+            # The event loop is shutting down: flush before it is gone.
+            if state.dirty:
+                _write_state(state, copy.deepcopy(state.metadata), state.version)
+            raise
+
+        await self.flush()
+        if state.dirty:
+            # Changed while flushing: schedule another round.
+            state.flush_task = asyncio.get_running_loop().create_task(
+                self._flush_later(state)
+            )
+
+
+def _write_state(state: _MetadataState, metadata: dict, version: int):
+    """Atomically replaces the metadata file with `metadata` (of `version`)."""
+    with state.write_lock:
+        if version <= state.written_version:
+            # A newer version has already been written.
+            return
+
+        metadata_path = state.metadata_path
+        if _mtime_ns(metadata_path) != state.disk_mtime_ns:
+            _merge_disk_changes(state, metadata)
+
+        content = json.dumps(metadata, indent=4)
+        temp_path = metadata_path.with_name(
+            f".{metadata_path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        )
+        with open(temp_path, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, metadata_path)
+        _fsync_directory(metadata_path.parent)
+
+        state.disk_mtime_ns = _mtime_ns(metadata_path)
+        state.disk_metadata = metadata
+        state.written_version = max(state.written_version, version)
+
+
+def _merge_disk_changes(state: _MetadataState, metadata: dict):
+    """
+    Another process replaced the metadata file since this one last read or wrote
+    it. Every top-level field this process has not changed since is taken from
+    the file, into `metadata` and the in-memory copy, so the other process's
+    changes (e.g. its stats) are kept. trajectory_count keeps the highest value,
+    since both processes may have saved trajectories.
+    """
+    disk_metadata = _read_metadata_file(state.metadata_path)
+    if disk_metadata is None:
+        return
+
+    base = state.disk_metadata
+    for key, disk_value in disk_metadata.items():
+        if key == "trajectory_count":
+            metadata[key] = max(metadata.get(key, 0), disk_value)
+            if state.metadata is not None:
+                state.metadata[key] = max(state.metadata.get(key, 0), disk_value)
+            continue
+
+        if metadata.get(key) == base.get(key):
+            metadata[key] = copy.deepcopy(disk_value)
+        if state.metadata is not None and state.metadata.get(key) == base.get(key):
+            state.metadata[key] = copy.deepcopy(disk_value)
+
+
+def _read_metadata_file(path: "Path") -> dict | None:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _mtime_ns(path: "Path") -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _fsync_directory(directory: "Path"):
+    """Makes a rename in `directory` durable, where the platform supports it."""
+    try:
+        directory_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directory_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_fd)
+
+
+@atexit.register
+def _flush_all_at_exit():
+    with _states_lock:
+        states = list(_states.values())
+    for state in states:
+        if state.dirty and state.metadata is not None:
+            try:
+                _write_state(state, copy.deepcopy(state.metadata), state.version)
+            except OSError as e:
+                logging.error(f"Could not flush {state.metadata_path}: {e}")
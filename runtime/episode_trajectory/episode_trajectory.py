@@ -1,11 +1,19 @@
 import json
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, replace
 from typing import List
 from .trajectory_saver import TrajectorySaver
 from .snapshots import (
     FrameSnapshot,
+    FrameSnapshotStore,
 )
 from .delver_action import DelverAction
+from .trajectory_summary import JSON_SUMMARY_KEY, TrajectorySummary
+from .trajectory_npz_codec import encode_trajectory_npz, decode_trajectory_npz
+
+# Version of the JSON format. Files without a format_version are version 1, in
+# which the delver's snapshots have the entity_type "SkeletalEntity" and no jump
+# timers; they are still read, as SkeletalEntity snapshots.
+JSON_FORMAT_VERSION = 2
 
 
 @dataclass
@@ -22,8 +30,18 @@ class EpisodeTrajectory:
     # For the original, action-based replay
     delver_actions: "List[DelverAction]" = field(default_factory=list)
 
-    # For the new, 100% accurate state-based replay
-    frame_snapshots: List[FrameSnapshot] = field(default_factory=list)
+    # For the new, 100% accurate state-based replay. Pass a FrameSnapshotStore to
+    # store the frames column-wise, in far less memory (decoded binary
+    # trajectories use one). Indexing it still yields FrameSnapshot objects, but
+    # unlike a list's they are copies: changing an appended or returned frame
+    # changes nothing stored.
+    frame_snapshots: "List[FrameSnapshot] | FrameSnapshotStore" = field(
+        default_factory=list
+    )
+
+    # Optional rolling hash of the physics state after each action (see
+    # runtime.state_hash), to verify an action-based replay without snapshots.
+    state_hashes: "List[int]" = field(default_factory=list)
 
     def add_delver_action(self, action: "DelverAction"):
         """Adds a delver action to the trajectory (for action-based replay)."""
@@ -32,16 +50,70 @@ class EpisodeTrajectory:
     def add_frame_snapshot(self, frame_snapshot: "FrameSnapshot"):
         """
         Creates and adds a snapshot of the current state of all provided entities.
+        With a FrameSnapshotStore, the frame's values are copied; changing it
+        afterwards has no effect.
         """
         self.frame_snapshots.append(frame_snapshot)
 
+    def add_state_hash(self, state_hash: int):
+        """Adds the state hash of the step that the last action was applied to."""
+        self.state_hashes.append(state_hash)
+
+    @property
+    def summary(self) -> TrajectorySummary:
+        return TrajectorySummary(
+            actions_per_second=self.actions_per_second,
+            victorious=self.victorious,
+            level_hash=self.level_hash,
+            frame_count=len(self.frame_snapshots),
+            action_count=len(self.delver_actions),
+        )
+
     def to_json(self) -> str:
-        """Converts the episode trajectory to a JSON string."""
-        return json.dumps(asdict(self), indent=2)
+        """
+        Converts the episode trajectory to a JSON string. It starts with the
+        trajectory's summary, so stats can be read without parsing the rest.
+        """
+        # asdict only recurses into lists, so materialize the snapshot store first.
+        trajectory = replace(self, frame_snapshots=list(self.frame_snapshots))
+        return json.dumps(
+            {
+                JSON_SUMMARY_KEY: asdict(self.summary),
+                "format_version": JSON_FORMAT_VERSION,
+                **asdict(trajectory),
+            },
+            indent=2,
+        )
+
+    def to_npz(
+        self, compress: bool = False, keyframe_interval: int | None = None
+    ) -> bytes:
+        """
+        Converts the episode trajectory to the compact columnar binary format,
+        optionally storing frame snapshots as a keyframe every keyframe_interval
+        frames plus the changed values in between.
+        """
+        return encode_trajectory_npz(
+            self, compress=compress, keyframe_interval=keyframe_interval
+        )
 
-    async def save(self, agent_name: str):
-        """Saves the current trajectory to the trajectory directory."""
-        await TrajectorySaver(agent_name).save_trajectory_json(self.to_json())
+    async def save(
+        self,
+        agent_name: str,
+        binary: bool = False,
+        keyframe_interval: int | None = None,
+    ):
+        """
+        Saves the current trajectory to the trajectory directory, either as JSON or
+        in the compact binary format.
+        """
+        trajectory_saver = TrajectorySaver(agent_name)
+        if binary:
+            await trajectory_saver.save_trajectory_npz(
+                self.to_npz(keyframe_interval=keyframe_interval)
+            )
+        else:
+            await trajectory_saver.save_trajectory_json(self.to_json())
 
 
 class EpisodeTrajectoryFactory:
@@ -49,6 +121,9 @@ class EpisodeTrajectoryFactory:
     def from_json(json_string: str) -> "EpisodeTrajectory":
         """Creates an EpisodeTrajectory from a JSON string."""
         data = json.loads(json_string)
+        format_version = data.get("format_version", 1)
+        if format_version > JSON_FORMAT_VERSION:
+            raise ValueError(f"Unsupported trajectory format version: {format_version}")
 
         episode_trajectory = EpisodeTrajectory(
             data["actions_per_second"], data["victorious"], data["level_hash"]
@@ -67,4 +142,11 @@ class EpisodeTrajectoryFactory:
 
                 episode_trajectory.add_frame_snapshot(frame_snapshot)
 
+        episode_trajectory.state_hashes = data.get("state_hashes", [])
+
         return episode_trajectory
+
+    @staticmethod
+    def from_npz(data: bytes) -> "EpisodeTrajectory":
+        """Creates an EpisodeTrajectory from the compact columnar binary format."""
+        return decode_trajectory_npz(data)
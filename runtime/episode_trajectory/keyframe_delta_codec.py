@@ -0,0 +1,166 @@
+"""
+Keyframe + delta encoding of FrameSnapshotStore columns.
+
+Frames are split into segments of `keyframe_interval` frames. The first frame of a
+segment is a keyframe and stores every value. In the following frames, a value is
+stored only when it differs from the same entity's previous row in the segment;
+otherwise it is carried forward on decode. Values are compared bit for bit, so
+decoding is exact (NaN and -0.0 included).
+
+For every column except entity_id (always stored), the encoded arrays are:
+
+    <column>                   values of the stored rows only, in row order
+    <column>_stored            np.packbits of the (R,) "row is stored" mask
+    <column>_keyframe_offsets  int64, the index in <column> of the first
+                               value of each segment. Absent in older files.
+
+Since segments never depend on earlier ones, any frame is reconstructed from the
+start of its segment, see decode_keyframe_deltas(), which only reads the segment's
+part of the mask and values.
+"""
+
+import numpy as np
+from .snapshots.frame_snapshot_store import ROW_COLUMNS, slice_extra_fields
+
+DELTA_COLUMNS = tuple(name for name in ROW_COLUMNS if name != "entity_id")
+
+
+def encode_keyframe_deltas(
+    arrays: dict[str, np.ndarray], keyframe_interval: int
+) -> dict[str, np.ndarray]:
+    """
+    Encodes the output of FrameSnapshotStore.to_arrays(). String tables, frame
+    offsets, entity ids and extra fields are passed through unchanged.
+    """
+    if keyframe_interval < 1:
+        raise ValueError("keyframe_interval must be at least 1.")
+
+    frame_offsets = arrays["frame_offsets"]
+    entity_id = arrays["entity_id"]
+    order, group_starts = _segment_entity_order(
+        frame_offsets, entity_id, keyframe_interval
+    )
+
+    encoded = {
+        name: arrays[name]
+        for name in ("frame_offsets", "entity_ids", "entity_types", "state_names")
+    }
+    encoded["entity_id"] = entity_id
+    encoded.update(slice_extra_fields(arrays, 0, len(entity_id)))
+    encoded["keyframe_interval"] = np.array(keyframe_interval, dtype=np.int32)
+    keyframe_rows = frame_offsets[::keyframe_interval]
+
+    for name in DELTA_COLUMNS:
+        column = arrays[name]
+        sorted_bits = _bit_pattern(column[order])
+
+        differs = sorted_bits[1:] != sorted_bits[:-1]
+        if differs.ndim > 1:
+            differs = differs.any(axis=1)
+        changed = group_starts.copy()
+        changed[1:] |= differs
+
+        stored = np.empty(len(order), dtype=bool)
+        stored[order] = changed
+
+        encoded[name] = column[stored]
+        encoded[f"{name}_stored"] = np.packbits(stored)
+        encoded[f"{name}_keyframe_offsets"] = _stored_before(stored, keyframe_rows)
+
+    return encoded
+
+
+def decode_keyframe_deltas(
+    arrays: dict[str, np.ndarray], frame_start: int = 0, frame_stop: int | None = None
+) -> dict[str, np.ndarray]:
+    """
+    Rebuilds the FrameSnapshotStore arrays of frames [frame_start, frame_stop) from
+    encoded arrays. Only the rows from the keyframe at or before frame_start are
+    decoded, so the cost does not depend on how far into the data they are.
+    """
+    keyframe_interval = int(arrays["keyframe_interval"])
+    frame_offsets = arrays["frame_offsets"]
+    frame_count = len(frame_offsets) - 1
+    if frame_stop is None or frame_stop > frame_count:
+        frame_stop = frame_count
+    frame_start = min(max(frame_start, 0), frame_stop)
+
+    keyframe = frame_start - frame_start % keyframe_interval
+    row_start = int(frame_offsets[keyframe])
+    row_stop = int(frame_offsets[frame_stop])
+    keep_from = int(frame_offsets[frame_start]) - row_start
+
+    segment_offsets = frame_offsets[keyframe : frame_stop + 1] - row_start
+    entity_id = arrays["entity_id"][row_start:row_stop]
+    order, _ = _segment_entity_order(segment_offsets, entity_id, keyframe_interval)
+    row_count = len(entity_id)
+
+    decoded = {
+        name: arrays[name] for name in ("entity_ids", "entity_types", "state_names")
+    }
+    decoded["frame_offsets"] = frame_offsets[frame_start : frame_stop + 1] - int(
+        frame_offsets[frame_start]
+    )
+    decoded["entity_id"] = entity_id[keep_from:]
+    decoded.update(slice_extra_fields(arrays, row_start + keep_from, row_stop))
+
+    for name in DELTA_COLUMNS:
+        packed = arrays[f"{name}_stored"]
+        first_byte = row_start // 8
+        stored = np.unpackbits(packed[first_byte : -(-row_stop // 8)]).view(bool)
+        stored = stored[row_start - first_byte * 8 : row_stop - first_byte * 8]
+
+        keyframe_offsets = arrays.get(f"{name}_keyframe_offsets")
+        if keyframe_offsets is not None:
+            value_start = int(keyframe_offsets[keyframe // keyframe_interval])
+        else:
+            # Older files have no offsets, so the stored rows before are counted.
+            value_start = int(np.count_nonzero(np.unpackbits(packed, count=row_start)))
+        values = arrays[name][value_start : value_start + np.count_nonzero(stored)]
+
+        dense = np.empty((row_count, *values.shape[1:]), dtype=values.dtype)
+        dense[stored] = values
+
+        # Every (segment, entity) group starts with a stored row, so the running
+        # maximum of stored positions never crosses into the previous group.
+        stored_positions = np.where(stored[order], np.arange(row_count), -1)
+        source_rows = order[np.maximum.accumulate(stored_positions)]
+
+        column = np.empty_like(dense)
+        column[order] = dense[source_rows]
+        decoded[name] = column[keep_from:]
+
+    return decoded
+
+
+def _stored_before(stored: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """The number of stored rows before each of `rows`."""
+    stored_counts = np.concatenate(([0], np.cumsum(stored, dtype=np.int64)))
+    return stored_counts[rows]
+
+
+def _segment_entity_order(
+    frame_offsets: np.ndarray, entity_id: np.ndarray, keyframe_interval: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Orders rows by (segment, entity, row) and flags the first row of each
+    (segment, entity) group in that order.
+    """
+    row_frames = np.repeat(
+        np.arange(len(frame_offsets) - 1), np.diff(frame_offsets).astype(np.int64)
+    )
+    segments = row_frames // keyframe_interval
+    order = np.lexsort((np.arange(len(entity_id)), entity_id, segments))
+
+    group_starts = np.ones(len(order), dtype=bool)
+    group_starts[1:] = (segments[order][1:] != segments[order][:-1]) | (
+        entity_id[order][1:] != entity_id[order][:-1]
+    )
+    return order, group_starts
+
+
+def _bit_pattern(column: np.ndarray) -> np.ndarray:
+    """Compares floats by their bits, so NaN equals NaN and -0.0 differs from 0.0."""
+    if column.dtype.kind == "f":
+        return np.ascontiguousarray(column).view(np.int64)
+    return column
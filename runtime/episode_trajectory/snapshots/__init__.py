@@ -4,10 +4,14 @@ from .skeletal_entity_state_snapshot import (
     SkeletalEntityStateSnapshot,
     SkeletalEntityStateSnapshotFactory,
 )
+from .delver_state_snapshot import DelverStateSnapshot, DelverStateSnapshotFactory
 from .entity_state_factory_provider import (
     EntityStateSnapshotFactoryProvider,
+    entity_state_factory_provider,
 )
 from .interpolate_frame_snapshots import interpolate_frame_snapshots
+from .frame_snapshot_store import FrameSnapshotStore, FrameSnapshotView
+from .snapshot_interpolator import interpolate_frames, resample_frames
 
 
 __all__ = [
@@ -16,6 +20,13 @@ __all__ = [
     "EntityStateSnapshotFactory",
     "SkeletalEntityStateSnapshot",
     "SkeletalEntityStateSnapshotFactory",
+    "DelverStateSnapshot",
+    "DelverStateSnapshotFactory",
     "EntityStateSnapshotFactoryProvider",
+    "entity_state_factory_provider",
     "interpolate_frame_snapshots",
+    "FrameSnapshotStore",
+    "FrameSnapshotView",
+    "interpolate_frames",
+    "resample_frames",
 ]
@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field
+from .skeletal_entity_state_snapshot import (
+    SkeletalEntityStateSnapshot,
+    SkeletalEntityStateSnapshotFactory,
+)
+from typing import cast, TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from runtime.world_objects.entities.entity import Entity
+    from runtime.world_objects.entities.delver import Delver
+
+
+@dataclass(slots=True)
+class DelverStateSnapshot(SkeletalEntityStateSnapshot):
+    """
+    Captures the state of the delver at a moment in time, including the jump timers
+    that decide whether it can jump, so a runtime restored from a snapshot jumps
+    exactly as the recorded one did.
+    """
+
+    jump_cooldown_timer: float = field(default=0.0)
+    jump_tolerance_timer: float = field(default=0.0)
+
+    entity_type: str = field(default="Delver")
+
+    def apply_to_entity(self, entity: "Entity"):
+        # Zero-argument super() does not work in slotted dataclasses.
+        SkeletalEntityStateSnapshot.apply_to_entity(self, entity)
+
+        body = cast("Delver", entity).body
+        body.jump_cooldown_timer = self.jump_cooldown_timer
+        body.jump_tolerance_timer = self.jump_tolerance_timer
+
+
+class DelverStateSnapshotFactory(SkeletalEntityStateSnapshotFactory):
+    def _get_state_snapshot_args(self, entity: "Entity"):
+        body = cast("Delver", entity).body
+
+        return {
+            **super()._get_state_snapshot_args(entity),
+            "jump_cooldown_timer": body.jump_cooldown_timer,
+            "jump_tolerance_timer": body.jump_tolerance_timer,
+        }
+
+    def create_state_snapshot_from_entity(
+        self, entity: "Entity"
+    ) -> DelverStateSnapshot:
+        return DelverStateSnapshot(**self._get_state_snapshot_args(entity))
+
+    def create_state_snapshot_from_json(
+        self, json: dict[str, Any]
+    ) -> DelverStateSnapshot:
+        return DelverStateSnapshot(**json)
@@ -1,21 +1,74 @@
+import runtime.world_objects.entities as entities
+from runtime.world_objects.entities.entity import Entity
 from runtime.world_objects.entities.skeletal_entity import SkeletalEntity
-from typing import TYPE_CHECKING
-
-if TYPE_CHECKING:
-    from . import EntityStateSnapshotFactory
+from runtime.world_objects.entities.delver import Delver
+from .entity_state_snapshot import EntityStateSnapshotFactory
+from .skeletal_entity_state_snapshot import SkeletalEntityStateSnapshotFactory
+from .delver_state_snapshot import DelverStateSnapshotFactory
 
 
 class EntityStateSnapshotFactoryProvider:
-    def from_entity_type(self, entity_type: type) -> "EntityStateSnapshotFactory":
-        from . import (
-            EntityStateSnapshotFactory,
-            SkeletalEntityStateSnapshotFactory,
-        )
-
-        if self._check_relationship(entity_type, SkeletalEntity):
-            return SkeletalEntityStateSnapshotFactory()
-        else:
-            return EntityStateSnapshotFactory()
-
-    def _check_relationship(self, type_1, type_2):
-        return issubclass(type_1, type_2) or type_1 == type_2
+    """
+    Maps entity classes and snapshot `entity_type` names to snapshot factories.
+
+    Factories are registered per entity class and shared: the factory of a class is
+    resolved once through its MRO (so subclasses such as Delver use the factory
+    of their nearest registered base) and then cached, as are name lookups. An
+    entity class that records extra snapshot fields registers its own factory with
+    register(), as Delver does; FrameSnapshotStore keeps the fields its columns
+    don't cover as extra fields.
+    """
+
+    _factories_by_class: dict[type, EntityStateSnapshotFactory] = {}
+    _factories_by_name: dict[str, EntityStateSnapshotFactory] = {}
+    # Entity classes with an explicitly registered factory.
+    _registered: dict[type, EntityStateSnapshotFactory] = {}
+
+    @classmethod
+    def register(
+        cls,
+        entity_class: type,
+        factory: EntityStateSnapshotFactory,
+        entity_type_name: str | None = None,
+    ):
+        """
+        Uses `factory` for `entity_class` and its subclasses, and for snapshots
+        whose entity_type is `entity_type_name` (the class name by default).
+        """
+        cls._registered[entity_class] = factory
+        # Resolutions made before this registration may now be wrong.
+        cls._factories_by_class.clear()
+        cls._factories_by_name[entity_type_name or entity_class.__name__] = factory
+
+    def from_entity_type(self, entity_type: type) -> EntityStateSnapshotFactory:
+        factory = self._factories_by_class.get(entity_type)
+        if factory is None:
+            factory = self._resolve(entity_type)
+            self._factories_by_class[entity_type] = factory
+        return factory
+
+    def from_entity_type_name(
+        self, entity_type_name: str
+    ) -> EntityStateSnapshotFactory:
+        """Returns the factory for the `entity_type` stored in a snapshot."""
+        factory = self._factories_by_name.get(entity_type_name)
+        if factory is None:
+            factory = self.from_entity_type(getattr(entities, entity_type_name))
+            self._factories_by_name[entity_type_name] = factory
+        return factory
+
+    def _resolve(self, entity_type: type) -> EntityStateSnapshotFactory:
+        for base in entity_type.__mro__:
+            factory = self._registered.get(base)
+            if factory is not None:
+                return factory
+        return self._registered[Entity]
+
+
+EntityStateSnapshotFactoryProvider.register(Entity, EntityStateSnapshotFactory())
+EntityStateSnapshotFactoryProvider.register(
+    SkeletalEntity, SkeletalEntityStateSnapshotFactory()
+)
+EntityStateSnapshotFactoryProvider.register(Delver, DelverStateSnapshotFactory())
+
+entity_state_factory_provider = EntityStateSnapshotFactoryProvider()
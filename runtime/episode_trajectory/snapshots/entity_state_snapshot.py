@@ -5,7 +5,7 @@ if TYPE_CHECKING:
     from runtime.world_objects.entities.entity import Entity, EntityState
 
 
-@dataclass
+@dataclass(slots=True)
 class EntityStateSnapshot:
     """
     Captures the complete state of a single entity at a moment in time.
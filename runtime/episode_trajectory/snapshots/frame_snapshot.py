@@ -1,8 +1,5 @@
 from dataclasses import dataclass, field
-from .entity_state_factory_provider import (
-    EntityStateSnapshotFactoryProvider,
-)
-import runtime.world_objects.entities as entities
+from .entity_state_factory_provider import entity_state_factory_provider
 from typing import List, TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -10,7 +7,7 @@ if TYPE_CHECKING:
     from runtime.world_objects.entities.entity import Entity
 
 
-@dataclass
+@dataclass(slots=True)
 class FrameSnapshot:
     """
     Represents the state of all dynamic entities in the simulation at a single frame.
@@ -19,14 +16,14 @@ class FrameSnapshot:
     entities: "List[EntityStateSnapshot]" = field(default_factory=list)
 
     def add_entity_from_json(self, json: dict[str, Any]):
-        snapshot_state_factory = EntityStateSnapshotFactoryProvider().from_entity_type(
-            getattr(entities, json["entity_type"])
+        snapshot_state_factory = entity_state_factory_provider.from_entity_type_name(
+            json["entity_type"]
         )
         entity_state = snapshot_state_factory.create_state_snapshot_from_json(json)
         self.add_entity_snapshot(entity_state)
 
     def add_entity(self, entity: "Entity"):
-        snapshot_state_factory = EntityStateSnapshotFactoryProvider().from_entity_type(
+        snapshot_state_factory = entity_state_factory_provider.from_entity_type(
             type(entity)
         )
         entity_state = snapshot_state_factory.create_state_snapshot_from_entity(entity)
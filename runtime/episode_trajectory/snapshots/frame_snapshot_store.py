@@ -0,0 +1,397 @@
+import json
+from dataclasses import fields
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, overload
+import numpy as np
+from .frame_snapshot import FrameSnapshot
+from .entity_state_factory_provider import entity_state_factory_provider
+from .skeletal_entity_state_snapshot import SkeletalEntityStateSnapshotFactory
+
+if TYPE_CHECKING:
+    from .entity_state_snapshot import EntityStateSnapshot, EntityStateSnapshotFactory
+
+# dtype and per-row shape of every column. There is one row per entity per frame.
+ROW_COLUMNS: dict[str, tuple[Any, tuple[int, ...]]] = {
+    "entity_id": (np.int32, ()),  # Index into the entity id table.
+    "entity_type": (np.int16, ()),  # Index into the entity type table.
+    "state": (np.int16, ()),  # Index into the state name table.
+    "position": (np.float64, (2,)),
+    "velocity": (np.float64, (2,)),
+    "angle": (np.float64, ()),
+    "angular_velocity": (np.float64, ()),
+    "locomotion_state": (np.int16, ()),  # State name index, -1 if absent.
+    "move_angle": (np.float64, ()),  # NaN when None.
+    "is_moving_intentionally": (bool, ()),
+}
+
+# Snapshot fields held by the columns above. Any other field of a snapshot class
+# (see EntityStateSnapshotFactoryProvider.register) is an extra field: the store
+# keeps it JSON-encoded, for the rows that have one, as
+#   extra_field_rows   (X,)  int64  Rows with extra fields, in increasing order.
+#   extra_fields       (X,)  str    JSON object of each such row's extra fields.
+COLUMN_FIELDS = frozenset({*ROW_COLUMNS, "entity_type"})
+EXTRA_FIELD_ARRAYS = ("extra_field_rows", "extra_fields")
+
+
+class _StringTable:
+    """Assigns a small integer code to each distinct string, in first-seen order."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self.codes: dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def to_array(self) -> np.ndarray:
+        return np.array(self.values, dtype=str)
+
+
+class FrameSnapshotStore:
+    """
+    Structure-of-arrays storage for all the frame snapshots of an episode.
+
+    Every snapshot field is kept in a preallocated NumPy column that grows by
+    doubling, instead of one dataclass (plus lists) per entity per frame. It can
+    be used in place of the list in EpisodeTrajectory.frame_snapshots: indexing
+    returns a regular FrameSnapshot built on demand, so apply_to_entity and
+    interpolate_frame_snapshots keep working, while frame_view() gives cheap
+    access to a frame's columns. Snapshot fields without a column are kept as
+    extra fields, see COLUMN_FIELDS.
+
+    Unlike a list, the store holds values rather than objects: append() copies the
+    frame's values, and every index builds a new FrameSnapshot (so `store[i] is
+    store[i]` is False). Changing an appended or returned frame does not change
+    the store.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.entity_ids = _StringTable()
+        self.entity_types = _StringTable()
+        self.state_names = _StringTable()
+
+        self.columns: dict[str, np.ndarray] = {
+            name: np.empty((capacity, *shape), dtype=dtype)
+            for name, (dtype, shape) in ROW_COLUMNS.items()
+        }
+        self._row_count = 0
+        self._frame_offsets: List[int] = [0]
+        # JSON-encoded extra fields, by row.
+        self._extra_fields: dict[int, str] = {}
+        self._factories: "List[EntityStateSnapshotFactory]" = []
+        self._is_skeletal: List[bool] = []
+
+    @staticmethod
+    def from_frames(frame_snapshots: Iterable["FrameSnapshot"]) -> "FrameSnapshotStore":
+        store = FrameSnapshotStore()
+        store.extend(frame_snapshots)
+        return store
+
+    def append(self, frame_snapshot: "FrameSnapshot"):
+        """Adds a frame at the end of the store."""
+        snapshots = frame_snapshot.entities
+        self._ensure_capacity(self._row_count + len(snapshots))
+
+        columns = self.columns
+        row = self._row_count
+        for snapshot in snapshots:
+            columns["entity_id"][row] = self.entity_ids.code(snapshot.entity_id)
+            columns["entity_type"][row] = self._entity_type_code(snapshot.entity_type)
+            columns["state"][row] = self.state_names.code(_state_name(snapshot.state))
+            columns["position"][row] = snapshot.position
+            columns["velocity"][row] = snapshot.velocity or (0.0, 0.0)
+            columns["angle"][row] = snapshot.angle
+            columns["angular_velocity"][row] = snapshot.angular_velocity
+
+            locomotion_state = getattr(snapshot, "locomotion_state", None)
+            columns["locomotion_state"][row] = (
+                -1
+                if locomotion_state is None
+                else self.state_names.code(_state_name(locomotion_state))
+            )
+            move_angle = getattr(snapshot, "move_angle", None)
+            columns["move_angle"][row] = np.nan if move_angle is None else move_angle
+            columns["is_moving_intentionally"][row] = getattr(
+                snapshot, "is_moving_intentionally", False
+            )
+
+            extra_field_names = _extra_field_names(type(snapshot))
+            if extra_field_names:
+                self._extra_fields[row] = json.dumps(
+                    {name: getattr(snapshot, name) for name in extra_field_names}
+                )
+            row += 1
+
+        self._row_count = row
+        self._frame_offsets.append(row)
+
+    def extend(self, frame_snapshots: Iterable["FrameSnapshot"]):
+        for frame_snapshot in frame_snapshots:
+            self.append(frame_snapshot)
+
+    def __len__(self) -> int:
+        return len(self._frame_offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> "FrameSnapshot": ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "List[FrameSnapshot]": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("frame index out of range")
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator["FrameSnapshot"]:
+        for index in range(len(self)):
+            yield self._materialize(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (FrameSnapshotStore, list)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            frame == other_frame for frame, other_frame in zip(self, other)
+        )
+
+    def frame_view(self, index: int) -> "FrameSnapshotView":
+        """Returns a lightweight view on the columns of one frame."""
+        if index < 0:
+            index += len(self)
+        return FrameSnapshotView(
+            self, self._frame_offsets[index], self._frame_offsets[index + 1]
+        )
+
+    @property
+    def frame_offsets(self) -> np.ndarray:
+        """Rows of frame i are [frame_offsets[i], frame_offsets[i + 1])."""
+        return np.array(self._frame_offsets, dtype=np.int64)
+
+    @property
+    def skeletal_entity_types(self) -> np.ndarray:
+        """Whether each entity type code is a skeletal entity's."""
+        return np.array(self._is_skeletal, dtype=bool)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the filled part of the columns."""
+        return sum(
+            column[: self._row_count].nbytes for column in self.columns.values()
+        ) + 8 * len(self._frame_offsets)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """The trimmed columns, string tables, frame offsets and extra fields."""
+        arrays = {
+            name: column[: self._row_count] for name, column in self.columns.items()
+        }
+        arrays["frame_offsets"] = self.frame_offsets
+        arrays["entity_ids"] = self.entity_ids.to_array()
+        arrays["entity_types"] = self.entity_types.to_array()
+        arrays["state_names"] = self.state_names.to_array()
+
+        extra_field_rows = sorted(self._extra_fields)
+        arrays["extra_field_rows"] = np.array(extra_field_rows, dtype=np.int64)
+        arrays["extra_fields"] = np.array(
+            [self._extra_fields[row] for row in extra_field_rows], dtype=str
+        )
+        return arrays
+
+    @staticmethod
+    def from_arrays(arrays: dict[str, np.ndarray]) -> "FrameSnapshotStore":
+        """Rebuilds a store from the output of to_arrays()."""
+        store = FrameSnapshotStore(capacity=0)
+        store.entity_ids = _StringTable(arrays["entity_ids"].tolist())
+        store.state_names = _StringTable(arrays["state_names"].tolist())
+        for entity_type in arrays["entity_types"].tolist():
+            store._entity_type_code(entity_type)
+
+        store.columns = {
+            name: np.asarray(arrays[name], dtype=dtype).reshape(-1, *shape)
+            for name, (dtype, shape) in ROW_COLUMNS.items()
+        }
+        store._frame_offsets = arrays["frame_offsets"].tolist()
+        store._row_count = store._frame_offsets[-1]
+        # Arrays written before extra fields existed have none.
+        if "extra_field_rows" in arrays:
+            store._extra_fields = dict(
+                zip(
+                    arrays["extra_field_rows"].tolist(),
+                    arrays["extra_fields"].tolist(),
+                )
+            )
+        return store
+
+    def _ensure_capacity(self, row_count: int):
+        capacity = len(self.columns["entity_id"])
+        if row_count <= capacity:
+            return
+
+        new_capacity = max(row_count, capacity * 2, 16)
+        for name, column in self.columns.items():
+            grown = np.empty((new_capacity, *column.shape[1:]), dtype=column.dtype)
+            grown[: self._row_count] = column[: self._row_count]
+            self.columns[name] = grown
+
+    def _entity_type_code(self, entity_type: str) -> int:
+        code = self.entity_types.code(entity_type)
+        if code == len(self._factories):
+            factory = entity_state_factory_provider.from_entity_type_name(entity_type)
+            self._factories.append(factory)
+            self._is_skeletal.append(
+                isinstance(factory, SkeletalEntityStateSnapshotFactory)
+            )
+        return code
+
+    def _materialize(self, index: int) -> "FrameSnapshot":
+        return FrameSnapshot(
+            self._materialize_rows(
+                self._frame_offsets[index], self._frame_offsets[index + 1]
+            )
+        )
+
+    def _materialize_rows(self, start: int, stop: int) -> "List[EntityStateSnapshot]":
+        columns = self.columns
+        entity_ids = self.entity_ids.values
+        entity_types = self.entity_types.values
+        state_names = self.state_names.values
+
+        rows = zip(
+            columns["entity_id"][start:stop].tolist(),
+            columns["entity_type"][start:stop].tolist(),
+            columns["state"][start:stop].tolist(),
+            columns["position"][start:stop].tolist(),
+            columns["velocity"][start:stop].tolist(),
+            columns["angle"][start:stop].tolist(),
+            columns["angular_velocity"][start:stop].tolist(),
+            columns["locomotion_state"][start:stop].tolist(),
+            columns["move_angle"][start:stop].tolist(),
+            columns["is_moving_intentionally"][start:stop].tolist(),
+        )
+
+        extra_fields = self._extra_fields
+        snapshots = []
+        for row, (
+            entity_id,
+            entity_type,
+            state,
+            position,
+            velocity,
+            angle,
+            angular_velocity,
+            locomotion_state,
+            move_angle,
+            is_moving_intentionally,
+        ) in enumerate(rows, start):
+            snapshot_args: dict[str, Any] = {
+                "entity_id": entity_ids[entity_id],
+                "state": state_names[state],
+                "position": position,
+                "angle": angle,
+                "velocity": velocity,
+                "angular_velocity": angular_velocity,
+                "entity_type": entity_types[entity_type],
+            }
+            if self._is_skeletal[entity_type]:
+                snapshot_args["locomotion_state"] = state_names[locomotion_state]
+                snapshot_args["move_angle"] = (
+                    None if move_angle != move_angle else move_angle
+                )
+                snapshot_args["is_moving_intentionally"] = is_moving_intentionally
+            if extra_fields and row in extra_fields:
+                snapshot_args.update(json.loads(extra_fields[row]))
+
+            snapshots.append(
+                self._factories[entity_type].create_state_snapshot_from_json(
+                    snapshot_args
+                )
+            )
+
+        return snapshots
+
+
+class FrameSnapshotView:
+    """A frame of a FrameSnapshotStore, exposing its rows as column slices."""
+
+    __slots__ = ("store", "start", "stop")
+
+    def __init__(self, store: FrameSnapshotStore, start: int, stop: int):
+        self.store = store
+        self.start = start
+        self.stop = stop
+
+    def column(self, name: str) -> np.ndarray:
+        """The rows of this frame in the given column (a NumPy view, not a copy)."""
+        return self.store.columns[name][self.start : self.stop]
+
+    @property
+    def entities(self) -> "List[EntityStateSnapshot]":
+        """The frame's entity snapshots, built on demand."""
+        return self.store._materialize_rows(self.start, self.stop)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+
+def slice_extra_fields(
+    arrays: dict[str, np.ndarray], row_start: int, row_stop: int
+) -> dict[str, np.ndarray]:
+    """
+    The extra field arrays of rows [row_start, row_stop) of to_arrays() output,
+    renumbered from row_start. Empty if the arrays have no extra fields.
+    """
+    if "extra_field_rows" not in arrays:
+        return {}
+    extra_field_rows = np.asarray(arrays["extra_field_rows"])
+    first, last = np.searchsorted(extra_field_rows, [row_start, row_stop])
+    return {
+        "extra_field_rows": extra_field_rows[first:last] - row_start,
+        "extra_fields": np.asarray(arrays["extra_fields"])[first:last],
+    }
+
+
+def slice_frames(
+    arrays: dict[str, np.ndarray], frame_start: int, frame_stop: int
+) -> dict[str, np.ndarray]:
+    """
+    The frame offsets, columns and extra fields of frames [frame_start, frame_stop)
+    of to_arrays() output. The columns are views of the given ones.
+    """
+    frame_offsets = arrays["frame_offsets"]
+    row_start = int(frame_offsets[frame_start])
+    row_stop = int(frame_offsets[frame_stop])
+    sliced = {name: arrays[name][row_start:row_stop] for name in ROW_COLUMNS}
+    sliced["frame_offsets"] = frame_offsets[frame_start : frame_stop + 1] - row_start
+    sliced.update(slice_extra_fields(arrays, row_start, row_stop))
+    return sliced
+
+
+_extra_field_names_by_class: dict[type, tuple[str, ...]] = {}
+
+
+def _extra_field_names(snapshot_class: type) -> tuple[str, ...]:
+    names = _extra_field_names_by_class.get(snapshot_class)
+    if names is None:
+        names = _extra_field_names_by_class[snapshot_class] = tuple(
+            field.name
+            for field in fields(snapshot_class)
+            if field.name not in COLUMN_FIELDS
+        )
+    return names
+
+
+def _state_name(state: Any) -> str:
+    """Snapshots hold state names as strings, but tolerate enum members as well."""
+    if isinstance(state, Enum):
+        return state.value if isinstance(state.value, str) else state.name
+    return str(state)
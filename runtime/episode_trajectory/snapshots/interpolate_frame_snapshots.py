@@ -1,3 +1,4 @@
+from dataclasses import fields
 from typing import Any, Dict, List, TYPE_CHECKING
 from pymunk import Vec2d
 
@@ -16,6 +17,11 @@ def lerp_vec(v1: List[float], v2: List[float], alpha: float) -> List[float]:
     return [interpolated_vec.x, interpolated_vec.y]
 
 
+def _fields_dict(entity_state: Any) -> Dict[str, Any]:
+    """Shallow field dictionary of a snapshot (they use __slots__, so no __dict__)."""
+    return {f.name: getattr(entity_state, f.name) for f in fields(entity_state)}
+
+
 def _interpolate_state_dicts(
     prev_state_dict: Dict[str, Any], next_state_dict: Dict[str, Any], alpha: float
 ) -> Dict[str, Any]:
@@ -70,8 +76,8 @@ def interpolate_frame_snapshots(
             continue
 
         # Convert dataclasses to dictionaries to pass to the interpolator
-        prev_dict = prev_entity_state.__dict__
-        next_dict = next_entity_state.__dict__
+        prev_dict = _fields_dict(prev_entity_state)
+        next_dict = _fields_dict(next_entity_state)
 
         # Generate the interpolated state dictionary using the helper
         interpolated_dict = _interpolate_state_dicts(prev_dict, next_dict, alpha)
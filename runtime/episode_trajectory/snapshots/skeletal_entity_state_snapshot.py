@@ -14,7 +14,7 @@ if TYPE_CHECKING:
     from runtime.world_objects.entities.entity import Entity
 
 
-@dataclass
+@dataclass(slots=True)
 class SkeletalEntityStateSnapshot(EntityStateSnapshot):
     """
     Captures the complete state of a single skeletal entity at a moment in time.
@@ -28,7 +28,8 @@ class SkeletalEntityStateSnapshot(EntityStateSnapshot):
     entity_type: str = field(default="SkeletalEntity")
 
     def apply_to_entity(self, entity: "Entity"):
-        super().apply_to_entity(entity)
+        # Zero-argument super() does not work in slotted dataclasses.
+        EntityStateSnapshot.apply_to_entity(self, entity)
 
         entity = cast("SkeletalEntity", entity)
         entity.locomotion_state = entity.resolve_locomotion_state(self.locomotion_state)
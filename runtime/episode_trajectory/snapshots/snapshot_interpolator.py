@@ -0,0 +1,215 @@
+"""
+Vectorized interpolation of whole frame ranges held in a FrameSnapshotStore.
+
+Unlike interpolate_frame_snapshots, which works on one pair of FrameSnapshot
+objects at a time, these functions compute every requested in-between frame in a
+single pass over the store's columns, e.g. to resample a 60 Hz recording for a
+144 Hz display.
+"""
+
+import math
+from typing import Iterable, Mapping
+import numpy as np
+from .frame_snapshot import FrameSnapshot
+from .frame_snapshot_store import ROW_COLUMNS, FrameSnapshotStore, slice_extra_fields
+
+# How each column is interpolated:
+#   "lerp"   linear interpolation.
+#   "angle"  linear interpolation along the shortest arc, see ANGLE_PERIODS.
+#   "step"   the value of the later frame, as interpolate_frame_snapshots does for
+#            non-numeric values. Extra fields (see FrameSnapshotStore) always are.
+FIELD_RULES: dict[str, str] = {
+    "entity_id": "step",
+    "entity_type": "step",
+    "state": "step",
+    "position": "lerp",
+    "velocity": "lerp",
+    "angle": "angle",
+    "angular_velocity": "lerp",
+    "locomotion_state": "step",
+    "move_angle": "angle",
+    "is_moving_intentionally": "step",
+}
+
+# Move angles are in degrees. So is the angle of skeletal entities, which is their
+# skeleton's; plain entities record their body's angle, in radians.
+ANGLE_PERIODS: dict[str, float] = {"angle": 360.0, "move_angle": 360.0}
+RADIANS_PERIOD = 2 * math.pi
+
+
+def interpolate_frames(
+    frame_snapshots: "FrameSnapshotStore | Iterable[FrameSnapshot]",
+    frame_positions: "np.ndarray | Iterable[float]",
+    rules: Mapping[str, str] | None = None,
+) -> FrameSnapshotStore:
+    """
+    Returns one frame per entry of `frame_positions`, a fractional frame index:
+    2.25 is a quarter of the way from frame 2 to frame 3. Whole positions give the
+    recorded frame unchanged. As in interpolate_frame_snapshots, an in-between
+    frame holds the entities of the later frame that also exist in the earlier
+    one.
+    """
+    store = _as_store(frame_snapshots)
+    rules = {**FIELD_RULES, **(rules or {})}
+
+    frame_count = len(store)
+    positions = np.clip(
+        np.asarray(frame_positions, dtype=np.float64), 0, max(frame_count - 1, 0)
+    )
+    arrays = store.to_arrays()
+    if frame_count == 0 or len(positions) == 0:
+        return FrameSnapshotStore.from_arrays(
+            {
+                **arrays,
+                **slice_extra_fields(arrays, 0, 0),
+                "frame_offsets": np.zeros(1, dtype=np.int64),
+            }
+        )
+
+    frame_offsets = arrays["frame_offsets"]
+
+    earlier_frames = np.floor(positions).astype(np.int64)
+    alphas = positions - earlier_frames
+    later_frames = np.where(alphas > 0, earlier_frames + 1, earlier_frames)
+
+    # Rows of each output frame: the rows of its later frame...
+    row_counts = frame_offsets[later_frames + 1] - frame_offsets[later_frames]
+    output_frames = np.repeat(np.arange(len(positions)), row_counts)
+    first_output_rows = np.cumsum(row_counts) - row_counts
+    later_rows = (
+        np.arange(int(row_counts.sum()))
+        - np.repeat(first_output_rows, row_counts)
+        + np.repeat(frame_offsets[later_frames], row_counts)
+    )
+
+    # ...paired with the same entity's row in the earlier frame, if it has one.
+    row_alphas = np.repeat(alphas, row_counts)
+    previous_rows = _previous_frame_rows(arrays)
+    earlier_rows = np.where(row_alphas > 0, previous_rows[later_rows], later_rows)
+    kept = earlier_rows >= 0
+    later_rows = later_rows[kept]
+    earlier_rows = earlier_rows[kept]
+    row_alphas = row_alphas[kept]
+    output_frames = output_frames[kept]
+
+    interpolated = {
+        name: arrays[name] for name in ("entity_ids", "entity_types", "state_names")
+    }
+    interpolated["frame_offsets"] = np.concatenate(
+        ([0], np.cumsum(np.bincount(output_frames, minlength=len(positions))))
+    ).astype(np.int64)
+
+    interpolated.update(_later_extra_fields(arrays, later_rows))
+
+    skeletal_rows = store.skeletal_entity_types[arrays["entity_type"][later_rows]]
+    for name in ROW_COLUMNS:
+        interpolated[name] = _interpolate_column(
+            name,
+            rules[name],
+            arrays[name][earlier_rows],
+            arrays[name][later_rows],
+            row_alphas,
+            _angle_periods(name, skeletal_rows),
+        )
+
+    return FrameSnapshotStore.from_arrays(interpolated)
+
+
+def resample_frames(
+    frame_snapshots: "FrameSnapshotStore | Iterable[FrameSnapshot]",
+    source_rate: float,
+    target_rate: float,
+    rules: Mapping[str, str] | None = None,
+) -> FrameSnapshotStore:
+    """
+    Resamples frames recorded at `source_rate` per second to `target_rate` per
+    second, covering the whole recording, in a single call.
+    """
+    store = _as_store(frame_snapshots)
+    if source_rate <= 0 or target_rate <= 0:
+        raise ValueError("Frame rates must be positive.")
+
+    last_frame = max(len(store) - 1, 0)
+    step = source_rate / target_rate
+    # The small epsilon keeps the last frame despite floating point rounding.
+    frame_positions = np.arange(0.0, last_frame + step * 1e-9, step)
+    if len(store) == 0:
+        frame_positions = frame_positions[:0]
+    return interpolate_frames(store, frame_positions, rules)
+
+
+def _as_store(
+    frame_snapshots: "FrameSnapshotStore | Iterable[FrameSnapshot]",
+) -> FrameSnapshotStore:
+    if isinstance(frame_snapshots, FrameSnapshotStore):
+        return frame_snapshots
+    return FrameSnapshotStore.from_frames(frame_snapshots)
+
+
+def _previous_frame_rows(arrays: dict[str, np.ndarray]) -> np.ndarray:
+    """For every row, the same entity's row in the previous frame, or -1."""
+    frame_offsets = arrays["frame_offsets"]
+    entity_id = arrays["entity_id"]
+    row_frames = np.repeat(
+        np.arange(len(frame_offsets) - 1), np.diff(frame_offsets).astype(np.int64)
+    )
+
+    order = np.lexsort((row_frames, entity_id))
+    sorted_frames = row_frames[order]
+    sorted_ids = entity_id[order]
+    follows = (sorted_ids[1:] == sorted_ids[:-1]) & (
+        sorted_frames[1:] == sorted_frames[:-1] + 1
+    )
+
+    previous_rows = np.full(len(entity_id), -1, dtype=np.int64)
+    previous_rows[order[1:][follows]] = order[:-1][follows]
+    return previous_rows
+
+
+def _later_extra_fields(
+    arrays: dict[str, np.ndarray], later_rows: np.ndarray
+) -> dict[str, np.ndarray]:
+    """The extra fields of the output rows, taken from their later frame's rows."""
+    extra_field_rows = arrays["extra_field_rows"]
+    if len(extra_field_rows) == 0:
+        return slice_extra_fields(arrays, 0, 0)
+
+    positions = np.minimum(
+        np.searchsorted(extra_field_rows, later_rows), len(extra_field_rows) - 1
+    )
+    has_extra_fields = extra_field_rows[positions] == later_rows
+    return {
+        "extra_field_rows": np.flatnonzero(has_extra_fields).astype(np.int64),
+        "extra_fields": arrays["extra_fields"][positions[has_extra_fields]],
+    }
+
+
+def _angle_periods(name: str, skeletal_rows: np.ndarray) -> "np.ndarray | float":
+    """The period of each row of a column interpolated with the "angle" rule."""
+    if name == "angle":
+        return np.where(skeletal_rows, ANGLE_PERIODS["angle"], RADIANS_PERIOD)
+    return ANGLE_PERIODS.get(name, RADIANS_PERIOD)
+
+
+def _interpolate_column(
+    name: str,
+    rule: str,
+    earlier: np.ndarray,
+    later: np.ndarray,
+    alphas: np.ndarray,
+    period: "np.ndarray | float",
+) -> np.ndarray:
+    if rule == "step":
+        return later
+
+    alphas = alphas.reshape(-1, *([1] * (earlier.ndim - 1)))
+    if rule == "lerp":
+        return earlier + alphas * (later - earlier)
+    if rule == "angle":
+        with np.errstate(invalid="ignore"):
+            delta = np.mod(later - earlier + period / 2, period) - period / 2
+            # Stepping back from the later angle keeps results in its range.
+            interpolated = later - (1 - alphas) * delta
+        # A missing angle (NaN, e.g. a move_angle of None) is not interpolated.
+        return np.where(np.isnan(earlier) | np.isnan(later), later, interpolated)
+    raise ValueError(f"Unknown interpolation rule {rule!r} for {name}.")
@@ -0,0 +1,223 @@
+import asyncio
+import os
+import queue
+import threading
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, List
+from ._get_trajectory_dir import get_trajectory_dir
+from .trajectory_npz_codec import encode_trajectory_npz
+from .trajectory_stream_format import (
+    CHUNK_LENGTH,
+    ChunkIndexEntry,
+    TrajectoryStreamHeader,
+)
+
+if TYPE_CHECKING:
+    from .delver_action import DelverAction
+    from .snapshots import FrameSnapshot
+
+# Sentinel telling the writer thread to stop.
+_CLOSE = object()
+
+
+class StreamingTrajectoryRecorder:
+    """
+    Records an episode straight to a chunked `.traj` file while it runs.
+
+    Actions, frame snapshots and state hashes are buffered until `chunk_size`
+    actions or frames have accumulated, then handed to a background thread that
+    encodes and appends them to the file. At most `max_pending_chunks` chunks wait
+    for the writer, after which recording blocks, so memory use stays bounded
+    however long the episode runs. The header (victory, level hash, counts) is
+    finalized by close(). Used as a context manager, the recording is closed on a
+    normal exit and aborted, left unfinalized, when an exception propagates.
+
+    With a keyframe_interval, chunks store frame snapshots as keyframes + deltas;
+    every chunk starts with a keyframe.
+    """
+
+    def __init__(
+        self,
+        file_path: "str | Path",
+        actions_per_second: int,
+        level_hash: str = "",
+        chunk_size: int = 256,
+        max_pending_chunks: int = 4,
+        keyframe_interval: int | None = None,
+    ):
+        self.file_path = Path(file_path)
+        self.header = TrajectoryStreamHeader(actions_per_second, level_hash=level_hash)
+        self.chunk_size = chunk_size
+        self.keyframe_interval = keyframe_interval
+        self.closed = False
+
+        self._pending_actions: "List[DelverAction]" = []
+        self._pending_frames: "List[FrameSnapshot]" = []
+        self._pending_state_hashes: List[int] = []
+        self._chunk_index: List[ChunkIndexEntry] = []
+        self._writer_error: BaseException | None = None
+
+        self._file = open(self.file_path, "wb")
+        self._file.write(self.header.pack())
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending_chunks)
+        self._writer_thread = threading.Thread(
+            target=self._write_chunks, name="trajectory-writer", daemon=True
+        )
+        self._writer_thread.start()
+
+    @staticmethod
+    def for_agent(
+        agent_name: str, actions_per_second: int, level_hash: str = "", **kwargs
+    ) -> "StreamingTrajectoryRecorder":
+        """
+        Creates a recorder writing to a temporary file in the agent's trajectory
+        directory. Use save() to finish it as the agent's next trajectory.
+        """
+        file_name = f".recording_{uuid.uuid4().hex}.traj"
+        file_path = get_trajectory_dir(agent_name) / file_name
+        return StreamingTrajectoryRecorder(
+            file_path, actions_per_second, level_hash, **kwargs
+        )
+
+    def add_delver_action(self, action: "DelverAction"):
+        self._pending_actions.append(action)
+        if len(self._pending_actions) >= self.chunk_size:
+            self._flush_pending()
+
+    def add_frame_snapshot(self, frame_snapshot: "FrameSnapshot"):
+        self._pending_frames.append(frame_snapshot)
+        if len(self._pending_frames) >= self.chunk_size:
+            self._flush_pending()
+
+    def add_state_hash(self, state_hash: int):
+        self._pending_state_hashes.append(state_hash)
+
+    def close(self, victorious: bool = False):
+        """
+        Writes the remaining data, the chunk index and the final header. The file
+        is complete and readable once this returns. The writer thread is stopped
+        and the file closed even if writing fails.
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        try:
+            try:
+                self._flush_pending()
+            finally:
+                self._stop_writer()
+
+            self._raise_writer_error()
+
+            self.header.victorious = victorious
+            self.header.chunk_count = len(self._chunk_index)
+            self.header.index_offset = self._file.tell()
+            self.header.finalized = True
+
+            for entry in self._chunk_index:
+                self._file.write(entry.pack())
+            self._file.seek(0)
+            self._file.write(self.header.pack())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+
+    def abort(self):
+        """
+        Stops recording without finalizing the file, e.g. because the episode
+        failed. Chunks already handed to the writer stay readable by scanning (see
+        TrajectoryReader), but the header is not marked as finalized.
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        try:
+            self._stop_writer()
+        finally:
+            self._file.close()
+
+    async def save(self, agent_name: str, victorious: bool = False):
+        """Closes the recording and stores it as the agent's next trajectory."""
+        from .trajectory_saver import TrajectorySaver
+
+        await asyncio.to_thread(self.close, victorious)
+        await TrajectorySaver(agent_name).save_trajectory_file(self.file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _stop_writer(self):
+        self._queue.put(_CLOSE)
+        self._writer_thread.join()
+
+    def _flush_pending(self):
+        self._raise_writer_error()
+        if not self._pending_actions and not self._pending_frames:
+            return
+
+        # Blocks when the writer is behind, which bounds memory use.
+        self._queue.put(
+            (self._pending_actions, self._pending_frames, self._pending_state_hashes)
+        )
+        self._pending_actions = []
+        self._pending_frames = []
+        self._pending_state_hashes = []
+
+    def _write_chunks(self):
+        from .episode_trajectory import EpisodeTrajectory
+
+        while True:
+            item = self._queue.get()
+            if item is _CLOSE:
+                return
+            if self._writer_error is not None:
+                # Keep draining so the recording thread is never blocked.
+                continue
+
+            actions, frames, state_hashes = item
+            try:
+                chunk = encode_trajectory_npz(
+                    EpisodeTrajectory(
+                        self.header.actions_per_second,
+                        delver_actions=actions,
+                        frame_snapshots=frames,
+                        state_hashes=state_hashes,
+                    ),
+                    keyframe_interval=self.keyframe_interval,
+                )
+                self._file.write(CHUNK_LENGTH.pack(len(chunk)))
+                offset = self._file.tell()
+                self._file.write(chunk)
+            except BaseException as e:
+                self._writer_error = e
+                continue
+
+            self._chunk_index.append(
+                ChunkIndexEntry(
+                    offset=offset,
+                    length=len(chunk),
+                    first_frame=self.header.frame_count,
+                    frame_count=len(frames),
+                    first_action=self.header.action_count,
+                    action_count=len(actions),
+                )
+            )
+            self.header.frame_count += len(frames)
+            self.header.action_count += len(actions)
+
+    def _raise_writer_error(self):
+        if self._writer_error is not None:
+            error_message = f"Could not write trajectory {self.file_path}"
+            raise IOError(error_message) from self._writer_error
+
@@ -0,0 +1,308 @@
+import logging
+import re
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any, List
+from ._get_trajectory_dir import get_trajectory_dir
+from ._trajectory_files import TRAJECTORY_SUFFIXES
+from .trajectory_summary import TrajectorySummary, read_trajectory_summary
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_TRAJECTORY_FILE_NAME = re.compile(r"trajectory_(\d+)$")
+
+
+@dataclass
+class CatalogEntry:
+    trajectory_index: int
+    file_name: str
+    level_hash: str
+    victorious: bool
+    frame_count: int
+    action_count: int
+    actions_per_second: int
+    byte_size: int
+    recorded_at: float  # When the trajectory was catalogued (epoch seconds).
+    modified_at: float  # Modification time of the trajectory file.
+
+    def describes(self, file_path: "Path") -> bool:
+        """Whether the entry is still up to date with the file at `file_path`."""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        return (
+            file_path.name == self.file_name
+            and stat.st_size == self.byte_size
+            and stat.st_mtime == self.modified_at
+        )
+
+    def to_summary(self) -> TrajectorySummary:
+        return TrajectorySummary(
+            actions_per_second=self.actions_per_second,
+            victorious=self.victorious,
+            level_hash=self.level_hash,
+            frame_count=self.frame_count,
+            action_count=self.action_count,
+        )
+
+
+_COLUMNS = tuple(field.name for field in fields(CatalogEntry))
+
+# Stored as the database's user_version once _SCHEMA has been created in it.
+_SCHEMA_VERSION = 1
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS trajectories (
+    trajectory_index INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    level_hash TEXT NOT NULL,
+    victorious INTEGER NOT NULL,
+    frame_count INTEGER NOT NULL,
+    action_count INTEGER NOT NULL,
+    actions_per_second INTEGER NOT NULL,
+    byte_size INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    modified_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trajectories_by_level
+    ON trajectories (level_hash, victorious);
+PRAGMA user_version = {_SCHEMA_VERSION};
+"""
+
+
+class TrajectoryCatalog:
+    """
+    An SQLite index of an agent's saved trajectories, so they can be listed and
+    filtered without parsing the trajectory files.
+
+    TrajectorySaver records every saved trajectory here. For directories written
+    before the catalog existed, rebuild() (or `python -m
+    runtime.episode_trajectory.trajectory_catalog <agent_name>`) indexes the files
+    already on disk. Methods are synchronous; call them through
+    asyncio.to_thread from async code.
+    """
+
+    CATALOG_FILE = "catalog.sqlite3"
+    # Seconds to wait for concurrent savers holding the database lock.
+    LOCK_TIMEOUT = 30.0
+
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+
+    def record_trajectory(
+        self, trajectory_index: int, file_path: "Path", recorded_at: float | None = None
+    ) -> CatalogEntry:
+        """Reads the summary of a saved trajectory file and adds it to the catalog."""
+        summary = read_trajectory_summary(file_path)
+        stat = file_path.stat()
+
+        entry = CatalogEntry(
+            trajectory_index=trajectory_index,
+            file_name=file_path.name,
+            level_hash=summary.level_hash,
+            victorious=summary.victorious,
+            frame_count=summary.frame_count,
+            action_count=summary.action_count,
+            actions_per_second=summary.actions_per_second,
+            byte_size=stat.st_size,
+            recorded_at=time.time() if recorded_at is None else recorded_at,
+            modified_at=stat.st_mtime,
+        )
+        with self._connect() as connection:
+            self._insert(connection, [entry])
+        return entry
+
+    def rebuild(self) -> int:
+        """
+        Replaces the catalog with an index of the trajectory files on disk. Returns
+        the number of catalogued trajectories.
+        """
+        entries: List[CatalogEntry] = []
+        for suffix in TRAJECTORY_SUFFIXES:
+            for file_path in self.trajectory_dir.glob(f"trajectory_*{suffix}"):
+                match = _TRAJECTORY_FILE_NAME.match(file_path.stem)
+                if match is None:
+                    continue
+
+                try:
+                    summary = read_trajectory_summary(file_path)
+                except (ValueError, KeyError, IOError) as e:
+                    logging.warning(f"Could not catalog trajectory {file_path}: {e}")
+                    continue
+
+                stat = file_path.stat()
+                entries.append(
+                    CatalogEntry(
+                        trajectory_index=int(match.group(1)),
+                        file_name=file_path.name,
+                        level_hash=summary.level_hash,
+                        victorious=summary.victorious,
+                        frame_count=summary.frame_count,
+                        action_count=summary.action_count,
+                        actions_per_second=summary.actions_per_second,
+                        byte_size=stat.st_size,
+                        recorded_at=stat.st_mtime,
+                        modified_at=stat.st_mtime,
+                    )
+                )
+
+        with self._connect() as connection:
+            connection.execute("DELETE FROM trajectories")
+            self._insert(connection, entries)
+        return len(entries)
+
+    def get(self, trajectory_index: int) -> CatalogEntry | None:
+        entries = self._select(
+            "WHERE trajectory_index = ?", [trajectory_index], "", []
+        )
+        return entries[0] if entries else None
+
+    def get_range(self, start_index: int, end_index: int) -> List[CatalogEntry]:
+        """The catalogued trajectories with start_index <= index < end_index."""
+        return self._select(
+            "WHERE trajectory_index >= ? AND trajectory_index < ?",
+            [start_index, end_index],
+            "ORDER BY trajectory_index",
+            [],
+        )
+
+    def query(
+        self,
+        level_hash: str | None = None,
+        victorious: bool | None = None,
+        min_frame_count: int | None = None,
+        max_frame_count: int | None = None,
+        order_by: str = "trajectory_index",
+        descending: bool = False,
+        limit: int | None = None,
+    ) -> List[CatalogEntry]:
+        """Lists catalogued trajectories matching every given filter."""
+        if order_by not in _COLUMNS:
+            raise ValueError(f"Cannot order trajectories by {order_by!r}.")
+
+        where, parameters = self._where(
+            level_hash, victorious, min_frame_count, max_frame_count
+        )
+        suffix = f"ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        suffix_parameters: List[Any] = []
+        if limit is not None:
+            suffix += " LIMIT ?"
+            suffix_parameters.append(limit)
+
+        return self._select(where, parameters, suffix, suffix_parameters)
+
+    def count(
+        self,
+        level_hash: str | None = None,
+        victorious: bool | None = None,
+        min_frame_count: int | None = None,
+        max_frame_count: int | None = None,
+    ) -> int:
+        where, parameters = self._where(
+            level_hash, victorious, min_frame_count, max_frame_count
+        )
+        with self._connect() as connection:
+            (count,) = connection.execute(
+                f"SELECT COUNT(*) FROM trajectories {where}", parameters
+            ).fetchone()
+        return count
+
+    def level_hashes(self) -> List[str]:
+        """The distinct levels the catalogued trajectories were recorded on."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT level_hash FROM trajectories ORDER BY level_hash"
+            ).fetchall()
+        return [level_hash for (level_hash,) in rows]
+
+    @property
+    def catalog_path(self) -> "Path":
+        return self.trajectory_dir / self.CATALOG_FILE
+
+    @property
+    def trajectory_dir(self) -> "Path":
+        """Returns the path to the agent's trajectory directory."""
+        return get_trajectory_dir(self.agent_name)
+
+    def _connect(self) -> "closing[sqlite3.Connection]":
+        connection = sqlite3.connect(self.catalog_path, timeout=self.LOCK_TIMEOUT)
+        # Reading the version is cheaper than running the schema script, which
+        # also commits any open transaction.
+        (schema_version,) = connection.execute("PRAGMA user_version").fetchone()
+        if schema_version < _SCHEMA_VERSION:
+            connection.executescript(_SCHEMA)
+        return closing(connection)
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, entries: List[CatalogEntry]):
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with connection:
+            connection.executemany(
+                f"INSERT OR REPLACE INTO trajectories ({', '.join(_COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                [
+                    tuple(getattr(entry, column) for column in _COLUMNS)
+                    for entry in entries
+                ],
+            )
+
+    def _select(
+        self,
+        where: str,
+        parameters: List[Any],
+        suffix: str,
+        suffix_parameters: List[Any],
+    ) -> List[CatalogEntry]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM trajectories {where} {suffix}",
+                [*parameters, *suffix_parameters],
+            ).fetchall()
+
+        entries = [CatalogEntry(*row) for row in rows]
+        for entry in entries:
+            entry.victorious = bool(entry.victorious)
+        return entries
+
+    @staticmethod
+    def _where(
+        level_hash: str | None,
+        victorious: bool | None,
+        min_frame_count: int | None,
+        max_frame_count: int | None,
+    ) -> tuple[str, List[Any]]:
+        conditions: List[str] = []
+        parameters: List[Any] = []
+        if level_hash is not None:
+            conditions.append("level_hash = ?")
+            parameters.append(level_hash)
+        if victorious is not None:
+            conditions.append("victorious = ?")
+            parameters.append(int(victorious))
+        if min_frame_count is not None:
+            conditions.append("frame_count >= ?")
+            parameters.append(min_frame_count)
+        if max_frame_count is not None:
+            conditions.append("frame_count <= ?")
+            parameters.append(max_frame_count)
+
+        if not conditions:
+            return "", parameters
+        return "WHERE " + " AND ".join(conditions), parameters
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Rebuild the trajectory catalog of an agent from its files."
+    )
+    parser.add_argument("agent_name")
+    args = parser.parse_args()
+
+    catalogued = TrajectoryCatalog(args.agent_name).rebuild()
+    print(f"Catalogued {catalogued} trajectories for {args.agent_name}.")
@@ -1,9 +1,8 @@
 import logging
-from runtime.episode_trajectory.episode_trajectory import (
-    EpisodeTrajectory,
-    EpisodeTrajectoryFactory,
-)
+from runtime.episode_trajectory.episode_trajectory import EpisodeTrajectory
 from ._get_trajectory_dir import get_trajectory_dir
+from ._trajectory_files import get_trajectory_file_path, parse_trajectory_file_content
+from .trajectory_reader import TrajectoryReader
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -33,8 +32,8 @@ class TrajectoryLoader:
         index: int,
     ):
         """
-        Loads a trajectory by its index from the current level's directory
-        and returns its JSON content as a string.
+        Loads a trajectory by its index from the current level's directory,
+        whichever format it was saved in.
         """
         try:
             # The trajectory_dir property also ensures the directory exists.
@@ -43,16 +42,18 @@ class TrajectoryLoader:
             logging.error(f"Cannot load trajectory: {e}")
             return None
 
-        trajectory_file_path = trajectory_dir / f"trajectory_{index}.json"
+        trajectory_file_path = get_trajectory_file_path(trajectory_dir, index)
 
-        if not trajectory_file_path.is_file():
-            logging.warning(f"Trajectory file not found: {trajectory_file_path}")
+        if trajectory_file_path is None:
+            missing_path = trajectory_dir / f"trajectory_{index}"
+            logging.warning(f"Trajectory file not found: {missing_path}")
             return None
 
         try:
-            with open(trajectory_file_path, "r") as f:
-                trajectory_json = f.read()
-                trajectory = EpisodeTrajectoryFactory.from_json(trajectory_json)
+            with open(trajectory_file_path, "rb") as f:
+                trajectory = parse_trajectory_file_content(
+                    trajectory_file_path, f.read()
+                )
                 self.trajectory = trajectory
                 return trajectory
 
@@ -60,6 +61,30 @@ class TrajectoryLoader:
             logging.error(f"Error reading trajectory file {trajectory_file_path}: {e}")
             return None
 
+    def open_trajectory(self, index: int) -> "TrajectoryReader | None":
+        """
+        Opens a trajectory for random frame access (e.g. replay scrubbing) without
+        decoding it whole. Close the returned reader when done.
+        """
+        try:
+            trajectory_dir = self.trajectory_dir
+        except ValueError as e:
+            logging.error(f"Cannot open trajectory: {e}")
+            return None
+
+        trajectory_file_path = get_trajectory_file_path(trajectory_dir, index)
+
+        if trajectory_file_path is None:
+            missing_path = trajectory_dir / f"trajectory_{index}"
+            logging.warning(f"Trajectory file not found: {missing_path}")
+            return None
+
+        try:
+            return TrajectoryReader(trajectory_file_path)
+        except (IOError, ValueError) as e:
+            logging.error(f"Error opening trajectory file {trajectory_file_path}: {e}")
+            return None
+
     @property
     def trajectory_dir(self) -> "Path":
         return get_trajectory_dir(self.agent_name)
@@ -0,0 +1,226 @@
+"""
+Compact, columnar binary encoding of an EpisodeTrajectory as a NumPy `.npz` archive.
+
+Layout (format version 1). Every entry is a NumPy array:
+
+    format_version       ()      int32   FORMAT_VERSION, or
+                                         KEYFRAME_DELTA_FORMAT_VERSION.
+    actions_per_second   ()      int32
+    victorious           ()      bool
+    level_hash           ()      str
+    action_run           (A,)    int8    -1, 0 or 1.
+    action_jump          (A,)    bool
+    state_hashes         (H,)    uint64  Optional, absent in older files. Per-step
+                                         state hashes, see runtime.state_hash.
+    frame_offsets        (F+1,)  int64   Rows of frame i are [offsets[i], offsets[i+1]).
+    entity_ids           (E,)    str     String table referenced by entity_id.
+    entity_types         (T,)    str     String table referenced by entity_type.
+    state_names          (S,)    str     String table referenced by state and
+                                         locomotion_state.
+
+One row per entity per frame, in frame order:
+
+    entity_id                (R,)    int32    Index into entity_ids.
+    entity_type              (R,)    int16    Index into entity_types.
+    state                    (R,)    int16    Index into state_names.
+    position                 (R, 2)  float64
+    velocity                 (R, 2)  float64
+    angle                    (R,)    float64
+    angular_velocity         (R,)    float64
+    locomotion_state         (R,)    int16    Index into state_names, -1 if absent.
+    move_angle               (R,)    float64  NaN when None.
+    is_moving_intentionally  (R,)    bool
+
+Skeletal columns hold placeholder values for rows of non-skeletal entities. These are
+the columns of FrameSnapshotStore, which encoding and decoding go through.
+
+Snapshot fields without a column (e.g. DelverStateSnapshot's jump timers), only for
+the rows that have them. Both are optional, absent in older files:
+
+    extra_field_rows     (X,)    int64   Rows with extra fields, in increasing order.
+    extra_fields         (X,)    str     JSON object of the row's extra fields.
+
+Format version 2 is the same layout with the per-row columns (except entity_id)
+keyframe + delta encoded, as described in keyframe_delta_codec, plus:
+
+    keyframe_interval    ()      int32   Frames per keyframe segment.
+
+and, per keyframe + delta encoded column, its <column>_stored mask and (optional,
+absent in older files) <column>_keyframe_offsets.
+"""
+
+import io
+import math
+import struct
+import zipfile
+from typing import TYPE_CHECKING
+import numpy as np
+from .delver_action import DelverAction
+from .snapshots import FrameSnapshotStore
+from .keyframe_delta_codec import decode_keyframe_deltas, encode_keyframe_deltas
+
+if TYPE_CHECKING:
+    from .episode_trajectory import EpisodeTrajectory
+
+FORMAT_VERSION = 1
+KEYFRAME_DELTA_FORMAT_VERSION = 2
+
+# Name and extra field lengths in a zip local file header, which precede the data.
+_ZIP_LOCAL_HEADER_SIZE = 30
+_ZIP_LOCAL_HEADER_LENGTHS = struct.Struct("<HH")
+_ZIP_LOCAL_HEADER_LENGTHS_OFFSET = 26
+
+
+class BufferReader(io.RawIOBase):
+    """
+    A read-only binary file over a buffer, e.g. a memoryview of a memory map, which
+    io.BytesIO would copy.
+    """
+
+    def __init__(self, buffer: "bytes | memoryview"):
+        self._buffer = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._buffer[self._position : self._position + len(buffer)]
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._buffer)
+        self._position = max(offset, 0)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+def encode_trajectory_npz(
+    trajectory: "EpisodeTrajectory",
+    compress=False,
+    keyframe_interval: int | None = None,
+) -> bytes:
+    """
+    Encodes a trajectory into the columnar `.npz` format described above. With a
+    keyframe_interval, frame snapshots are stored as keyframes + deltas.
+    """
+    frame_snapshots = trajectory.frame_snapshots
+    if not isinstance(frame_snapshots, FrameSnapshotStore):
+        frame_snapshots = FrameSnapshotStore.from_frames(frame_snapshots)
+
+    frame_arrays = frame_snapshots.to_arrays()
+    format_version = FORMAT_VERSION
+    if keyframe_interval is not None:
+        frame_arrays = encode_keyframe_deltas(frame_arrays, keyframe_interval)
+        format_version = KEYFRAME_DELTA_FORMAT_VERSION
+
+    arrays = {
+        "format_version": np.array(format_version, dtype=np.int32),
+        "actions_per_second": np.array(trajectory.actions_per_second, dtype=np.int32),
+        "victorious": np.array(trajectory.victorious, dtype=bool),
+        "level_hash": np.array(trajectory.level_hash, dtype=str),
+        "action_run": np.array(
+            [action["run"] for action in trajectory.delver_actions], dtype=np.int8
+        ),
+        "action_jump": np.array(
+            [action["jump"] for action in trajectory.delver_actions], dtype=bool
+        ),
+        "state_hashes": np.array(trajectory.state_hashes, dtype=np.uint64),
+        # The store's columns are exactly the per-row arrays of this format.
+        **frame_arrays,
+    }
+
+    buffer = io.BytesIO()
+    if compress:
+        np.savez_compressed(buffer, **arrays)
+    else:
+        np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def open_trajectory_npz(data: "bytes | memoryview") -> "np.lib.npyio.NpzFile":
+    """
+    Opens an encoded trajectory as a lazy archive (arrays are only read when
+    accessed), after checking its format version. A memoryview is not copied.
+    """
+    file = io.BytesIO(data) if isinstance(data, bytes) else BufferReader(data)
+    archive = np.load(file, allow_pickle=False)
+    format_version = int(archive["format_version"])
+    if format_version not in (FORMAT_VERSION, KEYFRAME_DELTA_FORMAT_VERSION):
+        archive.close()
+        raise ValueError(f"Unsupported trajectory format version: {format_version}")
+    return archive
+
+
+def read_archive_array(
+    archive: "np.lib.npyio.NpzFile", data: memoryview, name: str
+) -> np.ndarray:
+    """
+    Reads array `name` of an archive opened from `data`. Arrays saved without
+    compression are returned as read-only views into `data`, so nothing is copied
+    and only the rows that are used are ever paged in; others are decompressed.
+    """
+    info = archive.zip.getinfo(f"{name}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return archive[name]
+
+    name_length, extra_length = _ZIP_LOCAL_HEADER_LENGTHS.unpack_from(
+        data, info.header_offset + _ZIP_LOCAL_HEADER_LENGTHS_OFFSET
+    )
+    data_start = (
+        info.header_offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length
+    )
+    npy = BufferReader(data[data_start : data_start + info.file_size])
+    version = np.lib.format.read_magic(npy)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(npy)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(npy)
+    else:
+        return archive[name]
+    if dtype.hasobject:
+        return archive[name]
+
+    array = np.frombuffer(
+        data, dtype=dtype, count=math.prod(shape), offset=data_start + npy.tell()
+    )
+    return array.reshape(shape, order="F" if fortran_order else "C")
+
+
+def decode_trajectory_npz(data: bytes) -> "EpisodeTrajectory":
+    """Decodes a trajectory previously written by encode_trajectory_npz."""
+    from .episode_trajectory import EpisodeTrajectory
+
+    with open_trajectory_npz(data) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+
+    if "keyframe_interval" in arrays:
+        arrays.update(decode_keyframe_deltas(arrays))
+
+    episode_trajectory = EpisodeTrajectory(
+        int(arrays["actions_per_second"]),
+        bool(arrays["victorious"]),
+        str(arrays["level_hash"]),
+    )
+
+    for run, jump in zip(
+        arrays["action_run"].tolist(), arrays["action_jump"].tolist()
+    ):
+        episode_trajectory.add_delver_action(DelverAction(run=run, jump=jump))
+
+    if "state_hashes" in arrays:
+        episode_trajectory.state_hashes = arrays["state_hashes"].tolist()
+
+    episode_trajectory.frame_snapshots = FrameSnapshotStore.from_arrays(arrays)
+
+    return episode_trajectory
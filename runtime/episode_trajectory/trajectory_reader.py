@@ -0,0 +1,344 @@
+import mmap
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, List
+from .delver_action import DelverAction
+from .keyframe_delta_codec import decode_keyframe_deltas
+from .snapshots import FrameSnapshotStore
+from .snapshots.frame_snapshot_store import (
+    EXTRA_FIELD_ARRAYS,
+    ROW_COLUMNS,
+    slice_frames,
+)
+from .trajectory_npz_codec import open_trajectory_npz, read_archive_array
+from .trajectory_stream_format import (
+    TrajectoryStreamHeader,
+    iter_chunk_spans,
+    read_chunk_index,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .snapshots import FrameSnapshot
+
+
+class _ChunkArrays:
+    """
+    The arrays of an encoded chunk, each read from the archive on first use. The
+    chunk's data is a view of the memory-mapped file, and uncompressed arrays are
+    views of it too (see read_archive_array).
+    """
+
+    def __init__(self, data: memoryview):
+        self.data = data
+        self.archive = open_trajectory_npz(data)
+        self.files = self.archive.files
+        self._arrays: "dict[str, np.ndarray]" = {}
+
+    def __getitem__(self, name: str) -> "np.ndarray":
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = read_archive_array(
+                self.archive, self.data, name
+            )
+        return array
+
+    def close(self):
+        self.archive.close()
+
+
+@dataclass
+class _Chunk:
+    offset: int
+    length: int
+    first_frame: int
+    frame_count: int
+    first_action: int
+    action_count: int
+
+
+class TrajectoryReader:
+    """
+    Random access to the frames of a saved trajectory, without loading it whole.
+
+    The file is memory-mapped and only the segments holding the requested frames
+    are decoded: keyframe segments for keyframe + delta encoded data, otherwise
+    runs of UNKEYED_SEGMENT_FRAMES frames. `.traj` files are indexed by their chunk
+    index and `.npz` files are read as a single chunk. Arrays stored uncompressed
+    (the default) are read in place from the map, so opening and seeking cost the
+    same however long the episode is; compressed arrays are decompressed whole
+    the first time a chunk needs them. JSON trajectories have no index and are
+    parsed in full on open.
+    """
+
+    # Frames decoded at a time from data without keyframes.
+    UNKEYED_SEGMENT_FRAMES = 256
+
+    def __init__(self, file_path: "str | Path", max_cached_segments: int = 8):
+        self.file_path = Path(file_path)
+        self.max_cached_segments = max_cached_segments
+
+        self._file = None
+        self._mmap = None
+        self._view: memoryview | None = None
+        self._archives: "OrderedDict[int, _ChunkArrays]" = OrderedDict()
+        self._segments: "OrderedDict[tuple[int, int], FrameSnapshotStore]" = (
+            OrderedDict()
+        )
+        self._json_trajectory = None
+
+        if self.file_path.suffix == ".json":
+            self._open_json()
+            return
+
+        self._file = open(self.file_path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+            if self.file_path.suffix == ".traj":
+                self._open_stream()
+            else:
+                self._open_npz()
+        except BaseException:
+            self.close()
+            raise
+
+        self._first_frames = [chunk.first_frame for chunk in self._chunks]
+        self._first_actions = [chunk.first_action for chunk in self._chunks]
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def __getitem__(self, index: int) -> "FrameSnapshot":
+        return self.frame(index)
+
+    def __iter__(self) -> Iterator["FrameSnapshot"]:
+        return iter(self.frames())
+
+    def frame(self, index: int) -> "FrameSnapshot":
+        """Returns frame `index`, decoding only the segment that holds it."""
+        if index < 0:
+            index += self.frame_count
+        if not 0 <= index < self.frame_count:
+            raise IndexError("frame index out of range")
+
+        store, local_index = self._locate_frame(index)
+        return store[local_index]
+
+    def frames(self, start: int = 0, stop: int | None = None) -> "List[FrameSnapshot]":
+        """Returns frames [start, stop), clamped to the recorded frames."""
+        start, stop, _ = slice(start, stop).indices(self.frame_count)
+
+        frames: "List[FrameSnapshot]" = []
+        index = start
+        while index < stop:
+            store, local_index = self._locate_frame(index)
+            count = min(len(store) - local_index, stop - index)
+            frames.extend(store[local_index : local_index + count])
+            index += count
+        return frames
+
+    def delver_actions(
+        self, start: int = 0, stop: int | None = None
+    ) -> "List[DelverAction]":
+        """Returns the recorded delver actions [start, stop)."""
+        start, stop, _ = slice(start, stop).indices(self.action_count)
+        if self._json_trajectory is not None:
+            return self._json_trajectory.delver_actions[start:stop]
+
+        actions: "List[DelverAction]" = []
+        chunk_index = max(bisect_right(self._first_actions, start) - 1, 0)
+        while chunk_index < len(self._chunks):
+            chunk = self._chunks[chunk_index]
+            if chunk.first_action >= stop:
+                break
+            archive = self._archive(chunk_index)
+            local_start = max(start - chunk.first_action, 0)
+            local_stop = min(stop - chunk.first_action, chunk.action_count)
+
+            for run, jump in zip(
+                archive["action_run"][local_start:local_stop].tolist(),
+                archive["action_jump"][local_start:local_stop].tolist(),
+            ):
+                actions.append(DelverAction(run=run, jump=jump))
+            chunk_index += 1
+        return actions
+
+    def state_hashes(self) -> List[int]:
+        """Returns the recorded per-step state hashes, if any."""
+        if self._json_trajectory is not None:
+            return list(self._json_trajectory.state_hashes)
+
+        state_hashes: List[int] = []
+        for chunk_index in range(len(self._chunks)):
+            archive = self._archive(chunk_index)
+            if "state_hashes" in archive.files:
+                state_hashes += archive["state_hashes"].tolist()
+        return state_hashes
+
+    def close(self):
+        for archive in self._archives.values():
+            archive.close()
+        self._archives.clear()
+        self._segments.clear()
+
+        self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Arrays read in place are still referenced elsewhere; the map is
+                # closed once they are garbage collected.
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open_stream(self):
+        header = TrajectoryStreamHeader.unpack(self._mmap)
+        self.actions_per_second = header.actions_per_second
+        self.victorious = header.victorious
+        self.level_hash = header.level_hash
+
+        if header.finalized:
+            self._chunks = [
+                _Chunk(**vars(entry)) for entry in read_chunk_index(self._mmap, header)
+            ]
+        else:
+            # Without an index, count the frames and actions of every chunk.
+            self._chunks = []
+            first_frame = first_action = 0
+            for offset, length in iter_chunk_spans(self._mmap, header):
+                with open_trajectory_npz(self._view[offset : offset + length]) as npz:
+                    frame_count = len(npz["frame_offsets"]) - 1
+                    action_count = len(npz["action_run"])
+                self._chunks.append(
+                    _Chunk(
+                        offset,
+                        length,
+                        first_frame,
+                        frame_count,
+                        first_action,
+                        action_count,
+                    )
+                )
+                first_frame += frame_count
+                first_action += action_count
+
+        self.frame_count = sum(chunk.frame_count for chunk in self._chunks)
+        self.action_count = sum(chunk.action_count for chunk in self._chunks)
+
+    def _open_npz(self):
+        self._chunks = [_Chunk(0, len(self._mmap), 0, 0, 0, 0)]
+        archive = self._archive(0)
+        self.actions_per_second = int(archive["actions_per_second"])
+        self.victorious = bool(archive["victorious"])
+        self.level_hash = str(archive["level_hash"])
+
+        self.frame_count = self._chunks[0].frame_count = (
+            len(archive["frame_offsets"]) - 1
+        )
+        self.action_count = self._chunks[0].action_count = len(archive["action_run"])
+
+    def _open_json(self):
+        from .episode_trajectory import EpisodeTrajectoryFactory
+
+        self._json_trajectory = EpisodeTrajectoryFactory.from_json(
+            self.file_path.read_text()
+        )
+        self.actions_per_second = self._json_trajectory.actions_per_second
+        self.victorious = self._json_trajectory.victorious
+        self.level_hash = self._json_trajectory.level_hash
+
+        frame_snapshots = self._json_trajectory.frame_snapshots
+        if not isinstance(frame_snapshots, FrameSnapshotStore):
+            frame_snapshots = FrameSnapshotStore.from_frames(frame_snapshots)
+
+        self.frame_count = len(frame_snapshots)
+        self.action_count = len(self._json_trajectory.delver_actions)
+        self._chunks = [
+            _Chunk(0, 0, 0, self.frame_count, 0, self.action_count),
+        ]
+        self._first_frames = [0]
+        self._first_actions = [0]
+        self._segments[(0, 0)] = frame_snapshots
+
+    def _locate_frame(self, index: int) -> "tuple[FrameSnapshotStore, int]":
+        """Returns the decoded segment holding frame `index` and its index in it."""
+        chunk_index = bisect_right(self._first_frames, index) - 1
+        local_index = index - self._chunks[chunk_index].first_frame
+        if self._json_trajectory is not None:
+            return self._segments[(0, 0)], local_index
+
+        archive = self._archive(chunk_index)
+        keyframed = "keyframe_interval" in archive.files
+        segment_frames = (
+            int(archive["keyframe_interval"])
+            if keyframed
+            else self.UNKEYED_SEGMENT_FRAMES
+        )
+        segment = local_index // segment_frames
+        segment_start = segment * segment_frames
+
+        key = (chunk_index, segment)
+        store = self._segments.get(key)
+        if store is None:
+            store = self._decode_segment(
+                archive, segment_start, segment_frames, keyframed
+            )
+            self._segments[key] = store
+            if len(self._segments) > self.max_cached_segments:
+                self._segments.popitem(last=False)
+        else:
+            self._segments.move_to_end(key)
+
+        return store, local_index - segment_start
+
+    def _decode_segment(
+        self,
+        archive: _ChunkArrays,
+        segment_start: int,
+        segment_frames: int,
+        keyframed: bool,
+    ) -> FrameSnapshotStore:
+        names = ["frame_offsets", "entity_ids", "entity_types", "state_names"]
+        names += ROW_COLUMNS
+        names += EXTRA_FIELD_ARRAYS
+        if keyframed:
+            names.append("keyframe_interval")
+            names += (f"{name}_stored" for name in ROW_COLUMNS)
+            names += (f"{name}_keyframe_offsets" for name in ROW_COLUMNS)
+        arrays: dict[str, Any] = {
+            name: archive[name] for name in names if name in archive.files
+        }
+
+        frame_count = len(arrays["frame_offsets"]) - 1
+        segment_stop = min(segment_start + segment_frames, frame_count)
+        if keyframed:
+            arrays.update(decode_keyframe_deltas(arrays, segment_start, segment_stop))
+        else:
+            arrays.update(slice_frames(arrays, segment_start, segment_stop))
+        return FrameSnapshotStore.from_arrays(arrays)
+
+    def _archive(self, chunk_index: int) -> _ChunkArrays:
+        archive = self._archives.get(chunk_index)
+        if archive is None:
+            chunk = self._chunks[chunk_index]
+            archive = _ChunkArrays(
+                self._view[chunk.offset : chunk.offset + chunk.length]
+            )
+            self._archives[chunk_index] = archive
+            if len(self._archives) > self.max_cached_segments:
+                self._archives.popitem(last=False)[1].close()
+        else:
+            self._archives.move_to_end(chunk_index)
+        return archive
@@ -1,11 +1,30 @@
+import asyncio
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import time
+import uuid
 from ._get_trajectory_dir import get_trajectory_dir
+from ._trajectory_files import get_claim_file_path, get_trajectory_file_path
 from ._trajectory_metadata_manager import TrajectoryMetadataManager
+from .trajectory_catalog import TrajectoryCatalog
 from .trajectory_stats_calculator import TrajectoryStatsCalculator
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+# Per trajectory directory, the index after the last one this process allocated.
+# Only a starting point for the next allocation, so savers skip indices already
+# known to be taken.
+_next_index_hints: dict[str, int] = {}
+
+# A claim is only held while its file is moved into place, so one this old was
+# left behind by a saver that crashed, and its index can be claimed again.
+STALE_CLAIM_SECONDS = 60.0
+
 
 class TrajectorySaver:
 
@@ -14,25 +33,201 @@ class TrajectorySaver:
 
         self.metadata_manager = TrajectoryMetadataManager(agent_name)
         self.trajectory_status_calculator = TrajectoryStatsCalculator(agent_name)
+        self.catalog = TrajectoryCatalog(agent_name)
 
     async def save_trajectory_json(self, trajectory_json: str):
         """Saves a trajectory JSON, naming it with an incrementing index."""
-        # The trajectory_dir property also ensures the directory exists.
+        await self._save_trajectory_file(trajectory_json.encode(), ".json")
+
+    async def save_trajectory_npz(self, trajectory_npz: bytes):
+        """Saves a binary (.npz) trajectory, naming it with an incrementing index."""
+        await self._save_trajectory_file(trajectory_npz, ".npz")
+
+    async def save_trajectory_file(self, file_path: "Path"):
+        """
+        Moves an already written trajectory file (e.g. a finished streaming
+        recording) into the trajectory directory under the next index.
+        """
+        suffix = file_path.suffix
         trajectory_dir = self.trajectory_dir
+        if file_path.parent.resolve() == trajectory_dir.resolve():
+            await self._store_trajectory_file(file_path, suffix)
+            return
+
+        # Staged in the trajectory directory first, so that the final move into
+        # place is an atomic rename even when the file is on another filesystem.
+        staged_file_path = trajectory_dir / f".saving_{uuid.uuid4().hex}{suffix}"
+        await asyncio.to_thread(shutil.move, file_path, staged_file_path)
+        try:
+            await self._store_trajectory_file(staged_file_path, suffix)
+        finally:
+            if staged_file_path.exists():
+                # Not stored, so the recording is given back where it was.
+                await asyncio.to_thread(shutil.move, staged_file_path, file_path)
+
+    async def _save_trajectory_file(self, content: bytes, suffix: str):
+        # The trajectory_dir property also ensures the directory exists.
+        temp_file_path = self.trajectory_dir / f".saving_{uuid.uuid4().hex}{suffix}"
 
-        trajectory_index = await (
+        def write_temp_file():
+            with open(temp_file_path, "wb") as f:
+                f.write(content)
+
+        await asyncio.to_thread(write_temp_file)
+        try:
+            await self._store_trajectory_file(temp_file_path, suffix)
+        finally:
+            if temp_file_path.exists():
+                os.remove(temp_file_path)
+
+    async def _store_trajectory_file(self, file_path: "Path", suffix: str):
+        """Moves a written file into place under a newly allocated index."""
+        first_candidate = await (
             self.trajectory_status_calculator.get_amount_of_trajectories()
         )
+        trajectory_index, trajectory_file_path = await asyncio.to_thread(
+            self._move_to_next_index, file_path, suffix, first_candidate
+        )
+
+        def count_trajectory(metadata: dict):
+            # Saves can finish out of index order, so the count only ever grows.
+            metadata["trajectory_count"] = max(
+                metadata.get("trajectory_count", 0), trajectory_index + 1
+            )
 
-        trajectory_file_path = trajectory_dir / f"trajectory_{trajectory_index}.json"
+        await self.metadata_manager.update_metadata(count_trajectory)
+
+        await self._record_in_catalog(trajectory_index, trajectory_file_path)
+
+    def _move_to_next_index(
+        self, file_path: "Path", suffix: str, first_candidate: int
+    ) -> "tuple[int, Path]":
+        """
+        Allocates the lowest free index from first_candidate on and moves the file
+        there, without any lock shared between savers. The file must already be
+        in the trajectory directory.
+
+        An index is claimed by exclusively creating its claim file, which only one
+        saver (thread or process) can do at a time. The claimant re-checks that no
+        trajectory exists at that index, moves its file in and only then deletes
+        the claim, so an index is never handed out twice. A claim left behind by a
+        crashed saver (older than STALE_CLAIM_SECONDS, or whose process is gone) is
+        removed, so its index is not lost.
+        """
+        trajectory_dir = self.trajectory_dir
+        hint_key = str(trajectory_dir.resolve())
+        trajectory_index = max(first_candidate, _next_index_hints.get(hint_key, 0))
 
-        with open(trajectory_file_path, "w") as f:
-            f.write(trajectory_json)
+        while True:
+            claim_path = get_claim_file_path(trajectory_dir, trajectory_index)
+            try:
+                claim_file = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not _remove_stale_claim(claim_path):
+                    trajectory_index += 1
+                continue
+            try:
+                os.write(claim_file, _claim_owner().encode())
+            finally:
+                os.close(claim_file)
 
-        metadata = await self.metadata_manager.read_metadata()
-        metadata["trajectory_count"] = trajectory_index + 1
-        await self.metadata_manager.write_metadata(metadata)
+            try:
+                if get_trajectory_file_path(trajectory_dir, trajectory_index) is None:
+                    trajectory_file_path = (
+                        trajectory_dir / f"trajectory_{trajectory_index}{suffix}"
+                    )
+                    os.replace(file_path, trajectory_file_path)
+                    _next_index_hints[hint_key] = max(
+                        _next_index_hints.get(hint_key, 0), trajectory_index + 1
+                    )
+                    return trajectory_index, trajectory_file_path
+            finally:
+                os.remove(claim_path)
+
+            trajectory_index += 1
+
+    async def _record_in_catalog(self, trajectory_index: int, file_path: "Path"):
+        # The trajectory is already saved; a catalog failure only costs its entry,
+        # which TrajectoryCatalog.rebuild() can restore.
+        try:
+            await asyncio.to_thread(
+                self.catalog.record_trajectory, trajectory_index, file_path
+            )
+        except (sqlite3.Error, ValueError, KeyError, IOError) as e:
+            logging.warning(f"Could not catalog trajectory {file_path}: {e}")
 
     @property
     def trajectory_dir(self) -> "Path":
         return get_trajectory_dir(self.agent_name)
+
+
+def _claim_owner() -> str:
+    """Identifies this process in the claim files it creates."""
+    return f"{socket.gethostname()} {os.getpid()}"
+
+
+def _read_claim(claim_path: "Path") -> "tuple[os.stat_result, str] | None":
+    """The claim file's status and owner, or None if it no longer exists."""
+    try:
+        with open(claim_path, "rb") as f:
+            return os.fstat(f.fileno()), f.read().decode(errors="replace")
+    except FileNotFoundError:
+        return None
+
+
+def _is_stale_claim(claim_status: os.stat_result, owner: str) -> bool:
+    if time.time() - claim_status.st_mtime > STALE_CLAIM_SECONDS:
+        return True
+
+    host, _, pid = owner.rpartition(" ")
+    # Processes can only be checked on this host, and safely only on POSIX, where
+    # signal 0 merely probes (on Windows, os.kill terminates the process).
+    if os.name != "posix" or host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def _remove_stale_claim(claim_path: "Path") -> bool:
+    """
+    Removes the claim if it was abandoned by a crashed saver. Returns whether the
+    index is worth claiming again: the claim was stale or has been released.
+
+    The claim is renamed away before it is deleted, and put back if it turns out to
+    be a fresh claim that replaced the stale one meanwhile (another saver removed
+    the stale claim first and claimed the index itself).
+    """
+    claim = _read_claim(claim_path)
+    if claim is None:
+        return True
+    if not _is_stale_claim(*claim):
+        return False
+
+    removed_path = claim_path.with_name(f"{claim_path.name}.{uuid.uuid4().hex}")
+    try:
+        os.rename(claim_path, removed_path)
+    except FileNotFoundError:
+        return True
+
+    removed_claim = _read_claim(removed_path)
+    if removed_claim is not None and (
+        removed_claim[0].st_ino != claim[0].st_ino
+        or removed_claim[0].st_mtime_ns != claim[0].st_mtime_ns
+        or removed_claim[1] != claim[1]
+    ):
+        try:
+            # Unlike a rename, linking never replaces a claim made since.
+            os.link(removed_path, claim_path)
+        except OSError as e:
+            logging.warning(f"Could not restore trajectory claim {claim_path}: {e}")
+        os.remove(removed_path)
+        return False
+
+    os.remove(removed_path)
+    logging.info(f"Removed abandoned trajectory claim {claim_path}")
+    return True
@@ -1,14 +1,23 @@
 from ._trajectory_metadata_manager import TrajectoryMetadataManager
 from ._get_trajectory_dir import get_trajectory_dir
+from ._trajectory_files import (
+    TRAJECTORY_SUFFIXES,
+    get_claim_file_path,
+    get_trajectory_file_path,
+)
+from .trajectory_summary import TrajectorySummary, read_trajectory_summary
+from .trajectory_catalog import CatalogEntry, TrajectoryCatalog
 import json
 import logging
+import sqlite3
 from typing import TYPE_CHECKING, Optional, List, Dict, Any
 import asyncio
-import aiofiles
+import numpy as np
 
 if TYPE_CHECKING:
     from pathlib import Path
-    from .episode_trajectory import EpisodeTrajectory
+
+LENGTH_PERCENTILES = (50, 90, 99)
 
 
 class TrajectoryStatsCalculator:
@@ -16,11 +25,14 @@ class TrajectoryStatsCalculator:
         self.agent_name = agent_name
 
         self.metadata_manager = TrajectoryMetadataManager(agent_name)
+        self.catalog = TrajectoryCatalog(agent_name)
 
     async def get_stats(self) -> Dict[str, int]:
         """
         Calculates trajectory statistics, incrementally updating from the last run.
         Stats are read from and saved to the metadata file to avoid re-reading all files.
+        New trajectories are summarized from the catalog; only the files it lacks or
+        has outdated entries for are read.
         """
         metadata = await self.metadata_manager.read_metadata()
         stats = metadata.get("stats", {"amount": 0, "victories": 0})
@@ -34,7 +46,9 @@ class TrajectoryStatsCalculator:
             f"New trajectories detected. Updating stats from index {last_processed_count}."
         )
 
-        tasks = self._get_new_trajectory_tasks(last_processed_count, total_trajectories)
+        tasks = await self._get_new_trajectory_tasks(
+            last_processed_count, total_trajectories
+        )
 
         if not tasks:
             await self._update_and_save_stats(stats, total_trajectories, metadata)
@@ -51,14 +65,7 @@ class TrajectoryStatsCalculator:
         This is a "legacy" method for testing and validation purposes.
         """
         stats = {"amount": 0, "victories": 0}
-        trajectory_files = await asyncio.to_thread(
-            list, self.trajectory_dir.glob("trajectory_*.json")
-        )
-
-        tasks = [
-            asyncio.create_task(self._read_and_parse_trajectory(path))
-            for path in trajectory_files
-        ]
+        tasks = await self._get_all_trajectory_tasks(use_catalog=False)
 
         if not tasks:
             return stats
@@ -67,27 +74,118 @@ class TrajectoryStatsCalculator:
         await self._process_trajectory_tasks(tasks, stats)
         return stats
 
-    def _get_new_trajectory_tasks(
+    async def get_detailed_stats(self) -> Dict[str, Any]:
+        """
+        Aggregates every trajectory on disk: win rate and episode length (mean and
+        percentiles, in steps), overall and per level. Trajectories are summarized
+        from the catalog, or from their headers when it is missing or out of date.
+        """
+        tasks = await self._get_all_trajectory_tasks()
+        summaries = [summary for summary in await asyncio.gather(*tasks) if summary]
+
+        summaries_by_level: Dict[str, List[TrajectorySummary]] = {}
+        for summary in summaries:
+            summaries_by_level.setdefault(summary.level_hash, []).append(summary)
+
+        return {
+            **self._aggregate_summaries(summaries),
+            "levels": {
+                level_hash: self._aggregate_summaries(level_summaries)
+                for level_hash, level_summaries in sorted(summaries_by_level.items())
+            },
+        }
+
+    @staticmethod
+    def _aggregate_summaries(summaries: List[TrajectorySummary]) -> Dict[str, Any]:
+        amount = len(summaries)
+        victories = sum(summary.victorious for summary in summaries)
+        lengths = np.array([summary.length for summary in summaries], dtype=np.float64)
+
+        return {
+            "amount": amount,
+            "victories": victories,
+            "win_rate": victories / amount if amount else 0.0,
+            "mean_length": float(lengths.mean()) if amount else 0.0,
+            "length_percentiles": {
+                f"p{percentile}": (
+                    float(np.percentile(lengths, percentile)) if amount else 0.0
+                )
+                for percentile in LENGTH_PERCENTILES
+            },
+        }
+
+    async def _get_all_trajectory_tasks(
+        self, use_catalog: bool = True
+    ) -> List[asyncio.Task]:
+        """Creates asyncio tasks for reading every trajectory file on disk."""
+        catalog_entries = await self._read_catalog() if use_catalog else {}
+        trajectory_files = await asyncio.to_thread(
+            lambda: [
+                path
+                for suffix in TRAJECTORY_SUFFIXES
+                for path in self.trajectory_dir.glob(f"trajectory_*{suffix}")
+            ]
+        )
+
+        return [
+            asyncio.create_task(
+                self._read_trajectory_summary(path, catalog_entries.get(path.name))
+            )
+            for path in trajectory_files
+        ]
+
+    async def _get_new_trajectory_tasks(
         self, start_index: int, end_index: int
     ) -> List[asyncio.Task]:
         """Creates asyncio tasks for reading new trajectory files."""
+        catalog_entries = await self._read_catalog(start_index, end_index)
         tasks = []
         for i in range(start_index, end_index):
-            path = self.trajectory_dir / f"trajectory_{i}.json"
-            if not path.is_file():
-                logging.warning(f"Expected trajectory file not found: {path}")
+            path = get_trajectory_file_path(self.trajectory_dir, i)
+            if path is None:
+                # A claimed index is being saved, or was abandoned by a crashed
+                # saver and will be reused; either way it is no trajectory yet.
+                if not get_claim_file_path(self.trajectory_dir, i).exists():
+                    missing_path = self.trajectory_dir / f"trajectory_{i}"
+                    logging.warning(
+                        f"Expected trajectory file not found: {missing_path}"
+                    )
                 continue
-            tasks.append(asyncio.create_task(self._read_and_parse_trajectory(path)))
+            tasks.append(
+                asyncio.create_task(
+                    self._read_trajectory_summary(path, catalog_entries.get(path.name))
+                )
+            )
         return tasks
 
+    async def _read_catalog(
+        self, start_index: int | None = None, end_index: int | None = None
+    ) -> Dict[str, CatalogEntry]:
+        """
+        Catalogued trajectories by file name, all of them or those in the index
+        range. Empty if the catalog cannot be read, so the files are read instead.
+        """
+
+        def read_entries() -> List[CatalogEntry]:
+            if start_index is None or end_index is None:
+                return self.catalog.query()
+            return self.catalog.get_range(start_index, end_index)
+
+        try:
+            entries = await asyncio.to_thread(read_entries)
+        except sqlite3.Error as e:
+            logging.warning(f"Could not read the trajectory catalog: {e}")
+            return {}
+        return {entry.file_name: entry for entry in entries}
+
     @staticmethod
     async def _process_trajectory_tasks(
         tasks: List[asyncio.Task], stats: Dict[str, int]
     ):
         """Processes completed trajectory tasks and updates the victory count."""
         for future in asyncio.as_completed(tasks):
-            trajectory = await future
-            if trajectory and trajectory.victorious:
+            summary = await future
+            if summary and summary.victorious:
                 stats["victories"] += 1
 
     async def _update_and_save_stats(
@@ -96,22 +194,31 @@ class TrajectoryStatsCalculator:
         """Updates the stats dictionary and writes it back to the metadata file."""
         stats["amount"] = total_trajectories
         metadata["stats"] = stats
-        await self.metadata_manager.write_metadata(metadata)
+
+        def set_stats(current_metadata: Dict[str, Any]):
+            # Only touch the stats: saves may have changed the rest meanwhile.
+            current_metadata["stats"] = dict(stats)
+
+        await self.metadata_manager.update_metadata(set_stats)
 
     @staticmethod
-    async def _read_and_parse_trajectory(
-        file_path: "Path",
-    ) -> Optional["EpisodeTrajectory"]:
-        """Asynchronously reads and parses a single trajectory JSON file."""
-        from .episode_trajectory import EpisodeTrajectoryFactory
+    async def _read_trajectory_summary(
+        file_path: "Path", catalog_entry: Optional[CatalogEntry] = None
+    ) -> Optional[TrajectorySummary]:
+        """
+        Returns the summary of a single trajectory file: its catalog entry if it is
+        up to date, otherwise the file's header or leading summary, never the frame
+        snapshots.
+        """
+
+        def summarize() -> TrajectorySummary:
+            if catalog_entry is not None and catalog_entry.describes(file_path):
+                return catalog_entry.to_summary()
+            return read_trajectory_summary(file_path)
 
         try:
-            async with aiofiles.open(file_path, mode="r") as f:
-                content = await f.read()
-                # json.loads is sync, but for small files, it's fine here.
-                # For very large files, consider running in an executor.
-                return EpisodeTrajectoryFactory.from_json(content)
-        except (json.JSONDecodeError, IOError) as e:
+            return await asyncio.to_thread(summarize)
+        except (json.JSONDecodeError, ValueError, KeyError, IOError) as e:
             logging.warning(f"Could not read or parse trajectory {file_path}: {e}")
             return None
 
@@ -0,0 +1,190 @@
+"""
+Chunked trajectory file format (`.traj`), written incrementally while an episode runs.
+
+Layout (format version 1), all integers little-endian:
+
+    header       HEADER_SIZE bytes at offset 0, see TrajectoryStreamHeader.
+    chunks       Back-to-back chunks. Each chunk is an 8-byte length followed by a
+                 binary (.npz) trajectory, as produced by encode_trajectory_npz,
+                 holding the actions and frame snapshots recorded since the
+                 previous chunk.
+    chunk index  `chunk_count` entries of CHUNK_INDEX_ENTRY, starting at
+                 `index_offset`.
+
+The header is written with placeholder values when the file is opened and
+rewritten when the recording is finalized. A file whose header is not marked as
+finalized was not closed properly; its chunks are still readable by scanning.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO, List
+from .snapshots import FrameSnapshotStore
+from .trajectory_npz_codec import decode_trajectory_npz
+
+if TYPE_CHECKING:
+    from .episode_trajectory import EpisodeTrajectory
+
+MAGIC = b"DLVTRAJ\0"
+FORMAT_VERSION = 1
+
+# magic, version, flags, actions_per_second, victorious, frame_count,
+# action_count, chunk_count, index_offset, level_hash (UTF-8, zero padded)
+HEADER_STRUCT = struct.Struct("<8sHHI?QQQQ64s")
+HEADER_SIZE = HEADER_STRUCT.size
+
+CHUNK_LENGTH = struct.Struct("<Q")
+
+# offset (of the .npz data), length, first_frame, frame_count, first_action,
+# action_count
+CHUNK_INDEX_ENTRY = struct.Struct("<QQQQQQ")
+
+FLAG_FINALIZED = 1
+
+
+@dataclass
+class TrajectoryStreamHeader:
+    actions_per_second: int
+    victorious: bool = False
+    level_hash: str = ""
+    frame_count: int = 0
+    action_count: int = 0
+    chunk_count: int = 0
+    index_offset: int = 0
+    finalized: bool = False
+
+    def pack(self) -> bytes:
+        level_hash = self.level_hash.encode()
+        if len(level_hash) > 64:
+            raise ValueError("level_hash must fit in 64 bytes.")
+
+        return HEADER_STRUCT.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            FLAG_FINALIZED if self.finalized else 0,
+            self.actions_per_second,
+            self.victorious,
+            self.frame_count,
+            self.action_count,
+            self.chunk_count,
+            self.index_offset,
+            level_hash,
+        )
+
+    @staticmethod
+    def unpack(data: bytes) -> "TrajectoryStreamHeader":
+        (
+            magic,
+            version,
+            flags,
+            actions_per_second,
+            victorious,
+            frame_count,
+            action_count,
+            chunk_count,
+            index_offset,
+            level_hash,
+        ) = HEADER_STRUCT.unpack_from(data)
+
+        if magic != MAGIC:
+            raise ValueError("Not a trajectory stream file.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported trajectory stream version: {version}")
+
+        return TrajectoryStreamHeader(
+            actions_per_second=actions_per_second,
+            victorious=victorious,
+            level_hash=level_hash.rstrip(b"\0").decode(),
+            frame_count=frame_count,
+            action_count=action_count,
+            chunk_count=chunk_count,
+            index_offset=index_offset,
+            finalized=bool(flags & FLAG_FINALIZED),
+        )
+
+
+@dataclass
+class ChunkIndexEntry:
+    offset: int
+    length: int
+    first_frame: int
+    frame_count: int
+    first_action: int
+    action_count: int
+
+    def pack(self) -> bytes:
+        return CHUNK_INDEX_ENTRY.pack(
+            self.offset,
+            self.length,
+            self.first_frame,
+            self.frame_count,
+            self.first_action,
+            self.action_count,
+        )
+
+
+def read_stream_header(file: BinaryIO) -> TrajectoryStreamHeader:
+    """Reads only the fixed-size header at the start of a `.traj` file."""
+    file.seek(0)
+    return TrajectoryStreamHeader.unpack(file.read(HEADER_SIZE))
+
+
+def read_chunk_index(
+    data: bytes | memoryview, header: TrajectoryStreamHeader
+) -> List[ChunkIndexEntry]:
+    """Reads the chunk index of a finalized `.traj` file held in `data`."""
+    return [
+        ChunkIndexEntry(
+            *CHUNK_INDEX_ENTRY.unpack_from(
+                data, header.index_offset + i * CHUNK_INDEX_ENTRY.size
+            )
+        )
+        for i in range(header.chunk_count)
+    ]
+
+
+def decode_stream_trajectory(data: bytes) -> "EpisodeTrajectory":
+    """Decodes a whole `.traj` file into an EpisodeTrajectory."""
+    from .episode_trajectory import EpisodeTrajectory
+
+    header = TrajectoryStreamHeader.unpack(data)
+    episode_trajectory = EpisodeTrajectory(
+        header.actions_per_second,
+        header.victorious,
+        header.level_hash,
+        frame_snapshots=FrameSnapshotStore(),
+    )
+
+    for chunk in _iter_chunks(data, header):
+        chunk_trajectory = decode_trajectory_npz(chunk)
+        episode_trajectory.delver_actions.extend(chunk_trajectory.delver_actions)
+        episode_trajectory.frame_snapshots.extend(chunk_trajectory.frame_snapshots)
+        episode_trajectory.state_hashes.extend(chunk_trajectory.state_hashes)
+
+    return episode_trajectory
+
+
+def iter_chunk_spans(data: bytes | memoryview, header: TrajectoryStreamHeader):
+    """
+    Yields (offset, length) of the .npz data of each chunk. Unfinalized files are
+    walked through their length prefixes, up to the last complete chunk.
+    """
+    if header.finalized:
+        for entry in read_chunk_index(data, header):
+            yield entry.offset, entry.length
+        return
+
+    offset = HEADER_SIZE
+    while offset + CHUNK_LENGTH.size <= len(data):
+        (length,) = CHUNK_LENGTH.unpack_from(data, offset)
+        offset += CHUNK_LENGTH.size
+        if offset + length > len(data):
+            break
+        yield offset, length
+        offset += length
+
+
+def _iter_chunks(data: bytes, header: TrajectoryStreamHeader):
+    view = memoryview(data)
+    for offset, length in iter_chunk_spans(view, header):
+        yield view[offset : offset + length]
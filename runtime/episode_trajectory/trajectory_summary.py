@@ -0,0 +1,80 @@
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+# JSON trajectories start with a "summary" member (see EpisodeTrajectory.to_json),
+# which is looked for in this many leading bytes of the file.
+JSON_SUMMARY_KEY = "summary"
+JSON_SUMMARY_MAX_BYTES = 4096
+_JSON_SUMMARY_START = re.compile(rf'\s*\{{\s*"{JSON_SUMMARY_KEY}"\s*:\s*')
+
+
+@dataclass
+class TrajectorySummary:
+    """The per-episode facts that can be read without decoding frame snapshots."""
+
+    actions_per_second: int
+    victorious: bool
+    level_hash: str
+    frame_count: int
+    action_count: int
+
+    @property
+    def length(self) -> int:
+        """Episode length in steps, whether frames, actions or both were recorded."""
+        return max(self.frame_count, self.action_count)
+
+
+def read_trajectory_summary(file_path: "str | Path") -> TrajectorySummary:
+    """
+    Reads the summary of a saved trajectory. Binary formats only read their header
+    or a few small arrays, and JSON only its leading summary member; JSON saved
+    before it had one has to be parsed, but no snapshot objects are built. Saved
+    trajectories are summarized in the TrajectoryCatalog, which should be
+    preferred when it has them.
+    """
+    from .trajectory_reader import TrajectoryReader
+
+    file_path = Path(file_path)
+    if file_path.suffix == ".json":
+        return _read_json_summary(file_path)
+
+    with TrajectoryReader(file_path) as reader:
+        return TrajectorySummary(
+            actions_per_second=reader.actions_per_second,
+            victorious=reader.victorious,
+            level_hash=reader.level_hash,
+            frame_count=reader.frame_count,
+            action_count=reader.action_count,
+        )
+
+
+def _read_json_summary(file_path: Path) -> TrajectorySummary:
+    with open(file_path, "rb") as f:
+        header = f.read(JSON_SUMMARY_MAX_BYTES).decode(errors="replace")
+
+    match = _JSON_SUMMARY_START.match(header)
+    if match is not None:
+        try:
+            summary, _ = json.JSONDecoder().raw_decode(header, match.end())
+        except json.JSONDecodeError:
+            # Cut off by the header size, so the whole file is parsed instead.
+            pass
+        else:
+            return TrajectorySummary(
+                actions_per_second=summary["actions_per_second"],
+                victorious=summary["victorious"],
+                level_hash=summary["level_hash"],
+                frame_count=summary["frame_count"],
+                action_count=summary["action_count"],
+            )
+
+    data = json.loads(file_path.read_bytes())
+    return TrajectorySummary(
+        actions_per_second=data["actions_per_second"],
+        victorious=data["victorious"],
+        level_hash=data["level_hash"],
+        frame_count=len(data.get("frame_snapshots", [])),
+        action_count=len(data.get("delver_actions", [])),
+    )
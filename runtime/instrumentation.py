@@ -0,0 +1,141 @@
+"""
+Opt-in instrumentation of the Runtime hot paths.
+
+Instrumentation is off by default: every hook is behind a single
+`runtime.instrumentation is None` check, so a Runtime that never enables it pays
+nothing more than that. Once enabled (Runtime.enable_instrumentation()), it
+records:
+
+    Phases (wall time histograms, in seconds; nested phases are inclusive):
+        update                    A whole Runtime.update() call.
+        update_world_objects      WorldObjectsController.update_world_objects().
+        update:<ClassName>        Each WorldObject.update() call, by class.
+        update_physics            The physics catch-up loop of a frame.
+        apply_continuous_forces   Runtime._apply_continuous_forces().
+        space_step                Each pymunk Space.step().
+        ground_query              Each (uncached) entity ground contact query.
+        snapshot_capture          Frame snapshot capture, where callers report it.
+
+    Counters:
+        frames                    update() calls.
+        steps                     step() action steps.
+        physics_steps             Physics steps taken.
+        accumulator_clamps        Frames whose accumulator hit the cap, i.e. the
+                                  simulation fell behind real time ("spiral of
+                                  death" protection kicking in).
+
+    Distributions (value histograms):
+        physics_steps_per_frame   Physics steps run by each update().
+        arbiters                  Distinct contacts of entities after each step,
+                                  sensor overlaps excluded.
+"""
+
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Iterator, Sequence
+
+# Upper bounds of the histogram buckets, plus an implicit overflow bucket.
+# 1 us, 2 us, 5 us, 10 us, ... 500 ms, 1 s.
+DURATION_BUCKETS = tuple(
+    round(mantissa * 10.0**exponent, 6)
+    for exponent in range(-6, 0)
+    for mantissa in (1, 2, 5)
+) + (1.0,)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 12, 16, 32, 64)
+
+
+class Histogram:
+    """Counts of recorded values per bucket, with their count, sum, min and max."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.bucket_counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def record(self, value: float):
+        self.bucket_counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> dict[str, Any]:
+        upper_bounds: list[Any] = [*self.bounds, "inf"]
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            # Each bucket counts the values <= its upper bound ("le") and above the
+            # previous bucket's.
+            "buckets": [
+                {"le": upper_bound, "count": count}
+                for upper_bound, count in zip(upper_bounds, self.bucket_counts)
+            ],
+        }
+
+
+class RuntimeInstrumentation:
+    """Counters and histograms recorded by an instrumented Runtime."""
+
+    def __init__(self):
+        self.clock = time.perf_counter
+        self.phases: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+        self.distributions: dict[str, Histogram] = {}
+
+    def record_phase(self, name: str, seconds: float):
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Histogram(DURATION_BUCKETS)
+        phase.record(seconds)
+
+    def increment(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, value: float):
+        distribution = self.distributions.get(name)
+        if distribution is None:
+            distribution = self.distributions[name] = Histogram(COUNT_BUCKETS)
+        distribution.record(value)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as phase `name`."""
+        start_time = self.clock()
+        try:
+            yield
+        finally:
+            self.record_phase(name, self.clock() - start_time)
+
+    def reset(self):
+        self.phases.clear()
+        self.counters.clear()
+        self.distributions.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "phases": {
+                name: phase.to_dict() for name, phase in sorted(self.phases.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "distributions": {
+                name: distribution.to_dict()
+                for name, distribution in sorted(self.distributions.items())
+            },
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, List
+import numpy as np
+import pymunk
+
+
+@dataclass
+class StaticShapeRecord:
+    """
+    Plain description of a static collision shape, in world coordinates, that can
+    be re-created in any Space.
+    """
+
+    kind: str  # "segment", "poly" or "circle"
+    points: List[List[float]]
+    radius: float
+    friction: float
+    elasticity: float
+    collision_type: int
+    filter: List[int]  # group, categories, mask
+    sensor: bool
+
+    @staticmethod
+    def from_shape(shape: pymunk.Shape) -> "StaticShapeRecord":
+        body = shape.body
+        if isinstance(shape, pymunk.Segment):
+            kind = "segment"
+            local_points = [shape.a, shape.b]
+        elif isinstance(shape, pymunk.Poly):
+            kind = "poly"
+            local_points = shape.get_vertices()
+        elif isinstance(shape, pymunk.Circle):
+            kind = "circle"
+            local_points = [shape.offset]
+        else:
+            raise ValueError(f"Unsupported static shape type: {type(shape).__name__}")
+
+        world_points = [list(body.local_to_world(point)) for point in local_points]
+        shape_filter = shape.filter
+
+        return StaticShapeRecord(
+            kind=kind,
+            points=world_points,
+            radius=shape.radius,
+            friction=shape.friction,
+            elasticity=shape.elasticity,
+            collision_type=shape.collision_type,
+            filter=[shape_filter.group, shape_filter.categories, shape_filter.mask],
+            sensor=shape.sensor,
+        )
+
+    def to_shape(self, body: pymunk.Body) -> pymunk.Shape:
+        if self.kind == "segment":
+            shape = pymunk.Segment(body, self.points[0], self.points[1], self.radius)
+        elif self.kind == "poly":
+            shape = pymunk.Poly(body, self.points, radius=self.radius)
+        elif self.kind == "circle":
+            shape = pymunk.Circle(body, self.radius, self.points[0])
+        else:
+            raise ValueError(f"Unsupported static shape kind: {self.kind}")
+
+        shape.friction = self.friction
+        shape.elasticity = self.elasticity
+        shape.collision_type = self.collision_type
+        shape.filter = pymunk.ShapeFilter(*self.filter)
+        shape.sensor = self.sensor
+        return shape
+
+
+class LevelGeometry:
+    """The static collision geometry of a level, detached from any Space."""
+
+    def __init__(self, shape_records: List[StaticShapeRecord]):
+        self.shape_records = shape_records
+
+    @staticmethod
+    def capture(space: pymunk.Space, build: Callable[[], None]) -> "LevelGeometry":
+        """
+        Runs `build`, which is expected to add static geometry to `space`, and
+        records every shape it added.
+        """
+        existing_shapes = set(space.shapes)
+        build()
+        new_shapes = [shape for shape in space.shapes if shape not in existing_shapes]
+
+        return LevelGeometry([StaticShapeRecord.from_shape(s) for s in new_shapes])
+
+    def add_to_space(self, space: pymunk.Space):
+        """Adds the recorded shapes to the static body of `space`."""
+        body = space.static_body
+        space.add(*(record.to_shape(body) for record in self.shape_records))
+
+    def to_json(self) -> str:
+        return json.dumps([asdict(record) for record in self.shape_records])
+
+    @staticmethod
+    def from_json(json_string: str) -> "LevelGeometry":
+        return LevelGeometry(
+            [StaticShapeRecord(**record) for record in json.loads(json_string)]
+        )
+
+
+class LevelGeometryCache:
+    """
+    Process-wide LRU cache of traced level geometry, keyed by the level's hash.
+    When `cache_dir` is set, entries are also persisted to and read from disk.
+    """
+
+    def __init__(self, max_entries: int = 64, cache_dir: "str | Path | None" = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+
+        self._entries: "OrderedDict[str, LevelGeometry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, level_hash: str) -> LevelGeometry | None:
+        with self._lock:
+            geometry = self._entries.get(level_hash)
+            if geometry is not None:
+                self._entries.move_to_end(level_hash)
+                return geometry
+
+        geometry = self._read_from_disk(level_hash)
+        if geometry is not None:
+            self._store(level_hash, geometry)
+        return geometry
+
+    def put(self, level_hash: str, geometry: LevelGeometry):
+        """
+        Caches the geometry in memory and, with a cache_dir, on disk. A failed disk
+        write is logged and leaves the in-memory entry in place.
+        """
+        self._store(level_hash, geometry)
+        self._write_to_disk(level_hash, geometry)
+
+    def clear(self):
+        """Empties the in-memory cache. Files on disk are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, level_hash: str):
+        with self._lock:
+            return level_hash in self._entries
+
+    def _store(self, level_hash: str, geometry: LevelGeometry):
+        with self._lock:
+            self._entries[level_hash] = geometry
+            self._entries.move_to_end(level_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _cache_file_path(self, level_hash: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return Path(self.cache_dir) / f"{level_hash}.json"
+
+    def _read_from_disk(self, level_hash: str) -> LevelGeometry | None:
+        file_path = self._cache_file_path(level_hash)
+        if file_path is None or not file_path.is_file():
+            return None
+
+        try:
+            with open(file_path, "r") as f:
+                return LevelGeometry.from_json(f.read())
+        except (json.JSONDecodeError, TypeError, IOError) as e:
+            logging.warning(f"Could not read level geometry {file_path}: {e}")
+            return None
+
+    def _write_to_disk(self, level_hash: str, geometry: LevelGeometry):
+        file_path = self._cache_file_path(level_hash)
+        if file_path is None:
+            return
+
+        # Write to a temporary file first so concurrent readers never see a
+        # partially written entry.
+        temp_path = file_path.with_suffix(
+            f".{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w") as f:
+                f.write(geometry.to_json())
+            os.replace(temp_path, file_path)
+        except OSError as e:
+            # The geometry was traced fine; only later processes lose the entry.
+            logging.warning(f"Could not write level geometry {file_path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def hash_level_tiles(level: Any) -> str | None:
+    """
+    A level hash derived from what the platform geometry is traced from: the tile
+    size and the numeric `tiles` grid of the "platforms" tilemap layer. None if
+    the layer has no such grid, so its geometry cannot be cached.
+    """
+    layer = level.map.tilemap.get_layer("platforms")
+    tiles = np.asarray(getattr(layer, "tiles", None))
+    # Object arrays would hash their references, which differ between processes.
+    if tiles.dtype.kind not in "biuf":
+        return None
+
+    digest = hashlib.sha256()
+    digest.update(f"{tiles.shape} {tiles.dtype.str} {level.map.tile_size}".encode())
+    digest.update(np.ascontiguousarray(tiles).tobytes())
+    return f"tiles-{digest.hexdigest()}"
+
+
+level_geometry_cache = LevelGeometryCache()
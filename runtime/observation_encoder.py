@@ -0,0 +1,279 @@
+"""
+Fixed-size NumPy observations of the delver's surroundings, for agents.
+
+Each observation is a float32 vector made of, in order (see
+ObservationEncoder.layout):
+
+    rays        (num_rays,)           Distance to the first platform along each of
+                                      a fan of rays around the delver, as a
+                                      fraction of ray_length (1 = nothing hit).
+                                      Ray 0 points right; the others follow
+                                      counterclockwise.
+    occupancy   ((2r+1) * (2r+1),)    Solid (1) or free (0) tiles around the
+                                      delver's tile, r = grid_radius, row by row
+                                      from the bottom row up. Tiles outside the
+                                      level count as solid.
+    goal        (2,)                  Goal position minus delver position,
+                                      divided by position_scale.
+    velocity    (2,)                  Delver velocity divided by velocity_scale.
+
+Platforms are read once per level from the static collision geometry the Runtime
+traced from the tilemap's platforms layer, and kept as arrays: the ray fan of any
+number of runtimes is then intersected with them in a single vectorized pass,
+instead of one Space.segment_query_first call per ray.
+"""
+
+import math
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Sequence
+import numpy as np
+import pymunk
+
+if TYPE_CHECKING:
+    from .runtime import Runtime
+
+
+class _LevelStaticData:
+    """Platform segments and tile occupancy of a level, computed once."""
+
+    def __init__(self, runtime: "Runtime"):
+        self.level = runtime.level
+        segments = _static_segments(runtime.space)
+        # (S, 2) start points and start-to-end vectors.
+        self.segment_starts = segments[:, 0]
+        self.segment_vectors = segments[:, 1] - segments[:, 0]
+
+        level_map = runtime.level.map
+        self.tile_size = np.asarray(level_map.tile_size, dtype=np.float64)
+        self.grid_origin = np.asarray(
+            level_map.grid_pos_to_actual_pos((0, 0)), dtype=np.float64
+        )
+        self.grid_min, self.occupancy = self._rasterize(segments)
+
+    def tile_of(self, positions: np.ndarray) -> np.ndarray:
+        """Grid positions of the tiles holding `positions` (N, 2)."""
+        return np.floor((positions - self.grid_origin) / self.tile_size).astype(
+            np.int64
+        )
+
+    def _rasterize(self, segments: np.ndarray) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        Marks the tiles whose center lies inside the platform outlines (even-odd
+        rule), over the tiles spanned by the geometry. Returns the grid position of
+        the first tile and the (width, height) occupancy grid.
+        """
+        if len(segments) == 0:
+            return np.zeros(2, dtype=np.int64), np.zeros((0, 0), dtype=bool)
+
+        points = segments.reshape(-1, 2)
+        grid_min = self.tile_of(points.min(axis=0))
+        grid_end = np.ceil(
+            (points.max(axis=0) - self.grid_origin) / self.tile_size
+        ).astype(np.int64)
+        width, height = grid_end - grid_min
+
+        center_xs = (
+            self.grid_origin[0]
+            + (np.arange(width) + grid_min[0] + 0.5) * self.tile_size[0]
+        )
+        starts, ends = segments[:, 0], segments[:, 1]
+        occupancy = np.zeros((width, height), dtype=bool)
+        # One row at a time keeps memory at (width, segments).
+        for row in range(height):
+            center_y = (
+                self.grid_origin[1] + (row + grid_min[1] + 0.5) * self.tile_size[1]
+            )
+            # Segments crossing the horizontal line through the row's centers...
+            crosses = (starts[:, 1] > center_y) != (ends[:, 1] > center_y)
+            if not crosses.any():
+                continue
+            start, end = starts[crosses], ends[crosses]
+            crossing_xs = start[:, 0] + (center_y - start[:, 1]) * (
+                end[:, 0] - start[:, 0]
+            ) / (end[:, 1] - start[:, 1])
+            # ...an odd number of times to the right of a center means inside.
+            right_crossings = (crossing_xs[None, :] > center_xs[:, None]).sum(axis=1)
+            occupancy[:, row] = right_crossings % 2 == 1
+
+        return grid_min, occupancy
+
+
+class ObservationEncoder:
+    """
+    Encodes Runtime states into fixed-size observation vectors, see above. Static
+    level data is cached for the `max_cached_levels` most recently encoded levels,
+    so one encoder serves any number of runtimes and levels.
+    """
+
+    # Most elements of each (runtimes, rays, segments) array built at once by
+    # _cast_rays; larger batches are cast in chunks of runtimes.
+    RAY_CHUNK_ELEMENTS = 1 << 20
+
+    def __init__(
+        self,
+        num_rays: int = 16,
+        ray_length: float = 320.0,
+        grid_radius: int = 3,
+        position_scale: float = 1000.0,
+        velocity_scale: float = 500.0,
+        max_cached_levels: int = 64,
+    ):
+        self.num_rays = num_rays
+        self.ray_length = ray_length
+        self.grid_radius = grid_radius
+        self.position_scale = position_scale
+        self.velocity_scale = velocity_scale
+        self.max_cached_levels = max_cached_levels
+
+        angles = np.arange(num_rays) * (2 * math.pi / num_rays)
+        # (R, 2) full-length ray vectors.
+        self.ray_vectors = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        self.ray_vectors *= ray_length
+
+        grid_offsets = np.arange(-grid_radius, grid_radius + 1)
+        # (G, 2) tile offsets of the occupancy patch, row by row from the bottom.
+        self.grid_offsets = np.stack(
+            np.meshgrid(grid_offsets, grid_offsets, indexing="xy"), axis=-1
+        ).reshape(-1, 2)
+
+        self.layout: dict[str, slice] = {}
+        offset = 0
+        for name, size in (
+            ("rays", num_rays),
+            ("occupancy", len(self.grid_offsets)),
+            ("goal", 2),
+            ("velocity", 2),
+        ):
+            self.layout[name] = slice(offset, offset + size)
+            offset += size
+        self.observation_size = offset
+
+        self._static_data: "OrderedDict[Any, _LevelStaticData]" = OrderedDict()
+
+    def encode(self, runtime: "Runtime") -> np.ndarray:
+        """Returns the observation of one runtime, shape (observation_size,)."""
+        return self.encode_batch([runtime])[0]
+
+    def encode_batch(self, runtimes: "Sequence[Runtime]") -> np.ndarray:
+        """Returns the observations of several runtimes, one row each."""
+        observations = np.empty((len(runtimes), self.observation_size), np.float32)
+        if not runtimes:
+            return observations
+
+        positions = np.empty((len(runtimes), 2), dtype=np.float64)
+        velocities = np.empty((len(runtimes), 2), dtype=np.float64)
+        goal_positions = np.empty((len(runtimes), 2), dtype=np.float64)
+        by_level: dict[int, list[int]] = {}
+        static_data: dict[int, _LevelStaticData] = {}
+        for i, runtime in enumerate(runtimes):
+            body = runtime.delver.body
+            positions[i] = body.position
+            velocities[i] = body.velocity
+            goal_positions[i] = runtime.goal.position
+
+            level_data = self._level_static_data(runtime)
+            by_level.setdefault(id(level_data), []).append(i)
+            static_data[id(level_data)] = level_data
+
+        for key, indices in by_level.items():
+            level_data = static_data[key]
+            level_positions = positions[indices]
+            observations[indices, self.layout["rays"]] = self._cast_rays(
+                level_data, level_positions
+            )
+            observations[indices, self.layout["occupancy"]] = self._occupancy_patch(
+                level_data, level_positions
+            )
+
+        observations[:, self.layout["goal"]] = (
+            goal_positions - positions
+        ) / self.position_scale
+        observations[:, self.layout["velocity"]] = velocities / self.velocity_scale
+        return observations
+
+    def _level_static_data(self, runtime: "Runtime") -> _LevelStaticData:
+        key = runtime.level_hash or id(runtime.level)
+        level_data = self._static_data.get(key)
+        # The level check guards against a reused id() of a collected level.
+        if level_data is None or (
+            runtime.level_hash is None and level_data.level is not runtime.level
+        ):
+            level_data = self._static_data[key] = _LevelStaticData(runtime)
+        self._static_data.move_to_end(key)
+        while len(self._static_data) > self.max_cached_levels:
+            self._static_data.popitem(last=False)
+        return level_data
+
+    def _cast_rays(
+        self, level_data: _LevelStaticData, origins: np.ndarray
+    ) -> np.ndarray:
+        """(N, R) hit fractions of the ray fan from each of `origins` (N, 2)."""
+        segment_count = len(level_data.segment_starts)
+        if segment_count == 0:
+            return np.ones((len(origins), self.num_rays))
+
+        chunk_size = max(1, self.RAY_CHUNK_ELEMENTS // (self.num_rays * segment_count))
+        if len(origins) <= chunk_size:
+            return self._cast_ray_chunk(level_data, origins)
+
+        fractions = np.empty((len(origins), self.num_rays))
+        for start in range(0, len(origins), chunk_size):
+            fractions[start : start + chunk_size] = self._cast_ray_chunk(
+                level_data, origins[start : start + chunk_size]
+            )
+        return fractions
+
+    def _cast_ray_chunk(
+        self, level_data: _LevelStaticData, origins: np.ndarray
+    ) -> np.ndarray:
+        # Solve origin + t * ray = start + u * segment for every (origin, ray,
+        # segment); a hit needs 0 <= t <= 1 and 0 <= u <= 1.
+        rays = self.ray_vectors[None, :, None, :]  # (1, R, 1, 2)
+        segments = level_data.segment_vectors[None, None, :, :]  # (1, 1, S, 2)
+        to_starts = (
+            level_data.segment_starts[None, :, :] - origins[:, None, :]
+        )[:, None, :, :]  # (N, 1, S, 2)
+
+        denominators = _cross(rays, segments)  # (1, R, S)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = _cross(to_starts, segments) / denominators
+            u = _cross(to_starts, rays) / denominators
+        hits = (denominators != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+        return np.where(hits, t, 1.0).min(axis=2)
+
+    def _occupancy_patch(
+        self, level_data: _LevelStaticData, positions: np.ndarray
+    ) -> np.ndarray:
+        """(N, G) occupancy of the tiles around each of `positions` (N, 2)."""
+        tiles = level_data.tile_of(positions)[:, None, :] + self.grid_offsets
+        tiles -= level_data.grid_min
+        width, height = level_data.occupancy.shape
+        inside = (
+            (tiles[..., 0] >= 0)
+            & (tiles[..., 0] < width)
+            & (tiles[..., 1] >= 0)
+            & (tiles[..., 1] < height)
+        )
+        patch = np.ones(inside.shape, dtype=bool)
+        patch[inside] = level_data.occupancy[tiles[inside][:, 0], tiles[inside][:, 1]]
+        return patch
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def _static_segments(space: pymunk.Space) -> np.ndarray:
+    """(S, 2, 2) world-space edges of the solid static shapes of `space`."""
+    segments = []
+    for shape in space.shapes:
+        body = shape.body
+        if body.body_type != pymunk.Body.STATIC or shape.sensor:
+            continue
+        if isinstance(shape, pymunk.Segment):
+            points = [body.local_to_world(shape.a), body.local_to_world(shape.b)]
+            segments.append(points)
+        elif isinstance(shape, pymunk.Poly):
+            vertices = [body.local_to_world(v) for v in shape.get_vertices()]
+            segments += zip(vertices, vertices[1:] + vertices[:1])
+    return np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .runtime import Runtime
+    from .episode_trajectory import EpisodeTrajectory
+
+
+@dataclass
+class ReplayVerification:
+    """Result of re-simulating a trajectory's actions against its state hashes."""
+
+    steps_checked: int
+    # The first step whose state differs from the recording, if any.
+    first_divergent_step: int | None = None
+
+    @property
+    def matches(self) -> bool:
+        return self.first_divergent_step is None
+
+
+def verify_replay(
+    runtime: "Runtime", trajectory: "EpisodeTrajectory"
+) -> ReplayVerification:
+    """
+    Resets `runtime` and replays the trajectory's delver actions the way they were
+    recorded (one update of 1 / actions_per_second per action), comparing the
+    state hash after each step with the recorded one. Stops at the first step that
+    diverges.
+    """
+    if not trajectory.state_hashes:
+        raise ValueError("The trajectory has no state hashes to verify against.")
+
+    expected_hashes = trajectory.state_hashes
+    dt = 1.0 / trajectory.actions_per_second
+    hash_state = runtime.hash_state
+    runtime.hash_state = True
+    runtime.reset()
+
+    try:
+        for step, action in enumerate(trajectory.delver_actions):
+            if step >= len(expected_hashes):
+                return ReplayVerification(step, step)
+
+            runtime.apply_delver_action(action, dt)
+            runtime.update(dt)
+            if runtime.state_hash != expected_hashes[step]:
+                return ReplayVerification(step + 1, step)
+    finally:
+        runtime.hash_state = hash_state
+
+    steps = len(trajectory.delver_actions)
+    if steps < len(expected_hashes):
+        # More hashes than actions: the recording is incomplete.
+        return ReplayVerification(steps, steps)
+    return ReplayVerification(steps)
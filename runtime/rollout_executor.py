@@ -0,0 +1,185 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
+from .runtime import Runtime
+from .episode_trajectory import EpisodeTrajectory
+from .episode_trajectory.snapshots import FrameSnapshot
+from .world_objects.entities import Entity
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+    from level.level import Level
+    from .episode_trajectory import DelverAction
+
+    Policy = Callable[[Runtime, int], DelverAction]
+
+
+@dataclass
+class EpisodeSummary:
+    """Compact result of a rollout, cheap to send back from a worker process."""
+
+    episode_index: int
+    victorious: bool
+    steps: int
+    final_position: tuple[float, float]
+    wall_time: float
+
+
+class RolloutExecutor:
+    """
+    Runs headless Runtime episodes on a pool of worker processes.
+
+    Each worker builds its level and Runtime once, through `level_factory`, and
+    resets the Runtime for every episode it runs. `level_factory` and `policy` are
+    sent to the workers, so they must be picklable (e.g. module-level functions).
+
+    Returned trajectories can record per-step state hashes, and can leave out
+    frame snapshots when actions plus hashes are enough (see verify_replay).
+
+    With a `level_hash`, workers build their Runtime with it, so its traced
+    platform geometry goes through the level geometry cache, and returned
+    trajectories record it.
+    """
+
+    def __init__(
+        self,
+        level_factory: "Callable[[], Level]",
+        policy: "Policy",
+        max_workers: int | None = None,
+        actions_per_second: int = 60,
+        max_steps: int = 3600,
+        return_trajectories: bool = False,
+        mp_context: "BaseContext | None" = None,
+        record_state_hashes: bool = False,
+        record_frame_snapshots: bool = True,
+        level_hash: str | None = None,
+    ):
+        self.max_workers = max_workers
+        self._pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(
+                level_factory,
+                policy,
+                actions_per_second,
+                max_steps,
+                return_trajectories,
+                record_state_hashes,
+                record_frame_snapshots,
+                level_hash,
+            ),
+        )
+
+    def run(
+        self, num_episodes: int, chunksize: int = 1
+    ) -> "list[EpisodeSummary | EpisodeTrajectory]":
+        """Runs `num_episodes` episodes and returns their results in order."""
+        return list(self.imap(range(num_episodes), chunksize=chunksize))
+
+    def imap(
+        self, episode_indices: Iterable[int], chunksize: int = 1
+    ) -> "Iterator[EpisodeSummary | EpisodeTrajectory]":
+        """Lazily yields the result of each episode, in submission order."""
+        return self._pool.map(_run_episode, episode_indices, chunksize=chunksize)
+
+    def shutdown(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+# Per-process state, filled once by the pool initializer.
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(
+    level_factory: "Callable[[], Level]",
+    policy: "Policy",
+    actions_per_second: int,
+    max_steps: int,
+    return_trajectories: bool,
+    record_state_hashes: bool,
+    record_frame_snapshots: bool,
+    level_hash: str | None,
+):
+    _worker["runtime"] = Runtime(
+        level_factory(),
+        render=False,
+        level_hash=level_hash,
+        hash_state=record_state_hashes,
+    )
+    _worker["policy"] = policy
+    _worker["actions_per_second"] = actions_per_second
+    _worker["max_steps"] = max_steps
+    _worker["return_trajectories"] = return_trajectories
+    _worker["record_state_hashes"] = record_state_hashes
+    _worker["record_frame_snapshots"] = record_frame_snapshots
+
+
+def _run_episode(episode_index: int) -> "EpisodeSummary | EpisodeTrajectory":
+    start_time = time.perf_counter()
+
+    runtime: Runtime = _worker["runtime"]
+    runtime.reset()
+    policy = _worker["policy"]
+    actions_per_second = _worker["actions_per_second"]
+    dt = 1.0 / actions_per_second
+
+    trajectory = (
+        EpisodeTrajectory(actions_per_second, level_hash=runtime.level_hash or "")
+        if _worker["return_trajectories"]
+        else None
+    )
+
+    steps = 0
+    victorious = False
+    while steps < _worker["max_steps"]:
+        action = policy(runtime, steps)
+        runtime.apply_delver_action(action, dt)
+        runtime.update(dt)
+        steps += 1
+
+        if trajectory is not None:
+            trajectory.add_delver_action(action)
+            if _worker["record_state_hashes"]:
+                trajectory.add_state_hash(runtime.state_hash)
+            if _worker["record_frame_snapshots"]:
+                trajectory.add_frame_snapshot(_capture_frame(runtime))
+
+        if runtime.victorious:
+            victorious = True
+            break
+
+    if trajectory is not None:
+        trajectory.victorious = victorious
+        return trajectory
+
+    return EpisodeSummary(
+        episode_index=episode_index,
+        victorious=victorious,
+        steps=steps,
+        final_position=runtime.delver.position,
+        wall_time=time.perf_counter() - start_time,
+    )
+
+
+def _capture_frame(runtime: Runtime) -> FrameSnapshot:
+    instrumentation = runtime.instrumentation
+    if instrumentation is not None:
+        start_time = instrumentation.clock()
+
+    frame_snapshot = FrameSnapshot()
+    for entity in runtime.world_objects_controller.get_world_objects_by_type(Entity):
+        frame_snapshot.add_entity(entity)
+
+    if instrumentation is not None:
+        instrumentation.record_phase(
+            "snapshot_capture", instrumentation.clock() - start_time
+        )
+    return frame_snapshot
@@ -1,24 +1,42 @@
-from typing import cast, Any
-from .world_objects import WorldObjectsController, WorldObject
+from typing import cast, Any, Callable
+from .world_objects import WorldObjectsController, WorldObject, CollisionType
+from .world_objects.entities import Entity
 from .world_objects.entities.delver import Delver
 from .world_objects.items import Goal
 import pymunk
-from pytiling import (
-    TilemapBorderTracer,
-    PymunkTilemapPhysics,
-)
 from typing import TYPE_CHECKING
 from .config import PHYSICS_FPS, GRAVITY
+from .level_geometry_cache import (
+    LevelGeometry,
+    hash_level_tiles,
+    level_geometry_cache,
+)
+from .state_hash import INITIAL_STATE_HASH, hash_entity_states
+from .instrumentation import RuntimeInstrumentation
 
 if TYPE_CHECKING:
     from level.level import Level
+    from .episode_trajectory import DelverAction
 
 
 class Runtime:
+    # Most simulated time a single update() may catch up on at normal speed, so a
+    # lag spike doesn't cause a "spiral of death".
+    MAX_FRAME_TIME = 0.25
 
-    def __init__(self, level: Any, render: bool, physics: bool = True):
+    def __init__(
+        self,
+        level: Any,
+        render: bool,
+        physics: bool = True,
+        level_hash: str | None = None,
+        hash_state: bool = False,
+    ):
         self.render = render
         self.level: "Level" = level
+        # The traced platform geometry is shared through the process-wide level
+        # geometry cache, under this hash or one derived from the level's tiles.
+        self.level_hash = level_hash
         self.space = pymunk.Space()
         self.space.gravity = (0, GRAVITY)
 
@@ -49,15 +67,39 @@ class Runtime:
         self.running = False
         self.is_replay = False
 
+        # When enabled, state_hash is a rolling hash of the physics state, updated
+        # after every update() or step() (see state_hash).
+        self.hash_state = hash_state
+        self.state_hash = INITIAL_STATE_HASH
+
         self.world_objects_controller = self.world_objects_controller_factory(
             self.space
         )
+        # Off unless enable_instrumentation() is called; see instrumentation.
+        self.instrumentation: RuntimeInstrumentation | None = None
         self.delver = cast(
             "Delver", self.world_objects_controller.get_world_object("delver")
         )
         self.goal = self.world_objects_controller.get_world_object("goal")
 
+        # Set by pymunk during the physics step in which the delver first overlaps
+        # the goal's sensor, so no per-frame check is needed and no substep is
+        # missed. Each of goal_reached_callbacks is then called with the runtime;
+        # they run inside Space.step, so they must not add or remove shapes.
+        self.reached_goal = False
+        self.goal_reached_callbacks: list[Callable[[Runtime], None]] = []
+        self._setup_goal_detection()
+
     def update(self, dt):
+        """
+        Advances the simulation by `dt` seconds of simulated time, whatever the
+        execution_speed, so replays and rollouts step exactly as recorded. Live
+        drivers call update_live() instead.
+        """
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start_time = instrumentation.clock()
+
         # We update the logic/AI of world objects.
         # Note: We should ideally NOT apply physics forces here directly,
         # but rather set "intent" that is applied in the physics step.
@@ -66,22 +108,218 @@ class Runtime:
         if self.physics:
             self.update_physics(dt)
 
+        if self.hash_state:
+            self._update_state_hash()
+
+        if instrumentation is not None:
+            instrumentation.increment("frames")
+            instrumentation.record_phase("update", instrumentation.clock() - start_time)
+
+    def update_live(self, real_dt: float):
+        """
+        Advances a live (e.g. rendered) run by `real_dt` seconds of real time, so
+        the simulation runs execution_speed times faster (or slower) than that.
+        """
+        self.update(real_dt * self.execution_speed)
+
+    def enable_instrumentation(
+        self, instrumentation: RuntimeInstrumentation | None = None
+    ) -> RuntimeInstrumentation:
+        """
+        Starts recording per-phase timings and counters into `instrumentation` (a
+        new one by default), which is returned.
+        """
+        if instrumentation is None:
+            instrumentation = RuntimeInstrumentation()
+        self._set_instrumentation(instrumentation)
+        return instrumentation
+
+    def disable_instrumentation(self):
+        self._set_instrumentation(None)
+
+    def _set_instrumentation(self, instrumentation: RuntimeInstrumentation | None):
+        """Hands the instrumentation to everything that records into it."""
+        self.instrumentation = instrumentation
+        self.world_objects_controller.instrumentation = instrumentation
+        for entity in self.world_objects_controller.get_world_objects_by_type(Entity):
+            entity.body.instrumentation = instrumentation
+
+    def reset(self):
+        """
+        Restores the level to its initial state for a new episode. The Space and its
+        static platform geometry are kept; only dynamic state is put back to spawn.
+        """
+        self.physics_accumulator = 0.0
+        self.state_hash = INITIAL_STATE_HASH
+        self.reached_goal = False
+        self.world_objects_controller.reset_world_objects()
+
+    def step(
+        self,
+        action: "DelverAction",
+        n_steps: int = 1,
+        physics_steps_per_action: int = 1,
+    ):
+        """
+        Deterministically advances a headless simulation by `n_steps` action steps.
+        Each one applies `action`, updates world objects once and runs exactly
+        `physics_steps_per_action` physics steps, e.g. 2 for 30 actions per second
+        at 60 physics FPS. Unlike update(), nothing is clamped or carried over in
+        the accumulator, so any amount of time can be fast-forwarded.
+        """
+        action_dt = self.physics_dt * physics_steps_per_action
+        if self.instrumentation is not None:
+            self.instrumentation.increment("steps", n_steps)
+
+        for _ in range(n_steps):
+            self.apply_delver_action(action, action_dt)
+            self.world_objects_controller.update_world_objects(action_dt)
+            if self.physics:
+                for _ in range(physics_steps_per_action):
+                    self._step_physics()
+            if self.hash_state:
+                self._update_state_hash()
+
+    def run_until(
+        self,
+        predicate: "Callable[[Runtime], bool]",
+        action: "DelverAction | Callable[[Runtime, int], DelverAction]",
+        max_steps: int,
+        physics_steps_per_action: int = 1,
+    ) -> int:
+        """
+        Calls step() until `predicate(runtime)` holds after a step, or `max_steps`
+        steps were taken, and returns the number of steps taken. `action` is either
+        a fixed action or a policy called as `policy(runtime, step)` before each
+        step.
+        """
+        policy = action if callable(action) else None
+        for steps in range(max_steps):
+            self.step(
+                policy(self, steps) if policy else action,
+                physics_steps_per_action=physics_steps_per_action,
+            )
+            if predicate(self):
+                return steps + 1
+        return max_steps
+
+    def apply_delver_action(self, action: "DelverAction", dt: float):
+        """Feeds an agent action to the delver for the current frame."""
+        if action["run"] != 0:
+            self.delver.run(dt, action["run"])
+        if action["jump"]:
+            self.delver.jump(dt)
+
+    @property
+    def victorious(self) -> bool:
+        """Whether the delver has reached the goal."""
+        if self.physics:
+            return self.reached_goal
+        # Without physics steps (e.g. replays driven by snapshots) no sensor
+        # events fire, so the bounding boxes are compared instead.
+        return self.delver.check_collision(self.goal)
+
+    def _setup_goal_detection(self):
+        handler = self.space.add_collision_handler(
+            CollisionType.DELVER, CollisionType.GOAL
+        )
+
+        def begin(arbiter, space, data):
+            self._on_goal_reached()
+            return True
+
+        handler.begin = begin
+
+    def _on_goal_reached(self):
+        if self.reached_goal:
+            return
+        self.reached_goal = True
+        for callback in self.goal_reached_callbacks:
+            callback(self)
+
     def update_physics(self, dt):
         self.physics_accumulator += dt
 
         # We cap the accumulator to prevent the "spiral of death"
         # if the game lags significantly (e.g. breakpoint or heavy load).
-        if self.physics_accumulator > 0.25:
-            self.physics_accumulator = 0.25
+        # A sped-up run legitimately needs proportionally more time per frame.
+        max_accumulator = self.MAX_FRAME_TIME * max(self.execution_speed, 1.0)
+        instrumentation = self.instrumentation
+        if self.physics_accumulator > max_accumulator:
+            self.physics_accumulator = max_accumulator
+            if instrumentation is not None:
+                instrumentation.increment("accumulator_clamps")
 
-        while self.physics_accumulator >= self.physics_dt:
-            # Pymunk clears forces after every step. If we step twice in one frame
-            # (to catch up), the second step would have ZERO move force if we didn't
-            # re-apply it here.
-            self._apply_continuous_forces()
+        if instrumentation is not None:
+            start_time = instrumentation.clock()
+            physics_steps = 0
 
-            self.space.step(self.physics_dt)
+        while self.physics_accumulator >= self.physics_dt:
+            self._step_physics()
             self.physics_accumulator -= self.physics_dt
+            if instrumentation is not None:
+                physics_steps += 1
+
+        if instrumentation is not None:
+            instrumentation.observe("physics_steps_per_frame", physics_steps)
+            instrumentation.record_phase(
+                "update_physics", instrumentation.clock() - start_time
+            )
+
+    def _step_physics(self):
+        if self.instrumentation is not None:
+            self._step_physics_instrumented(self.instrumentation)
+            return
+
+        # Pymunk clears forces after every step. If we step twice in one frame
+        # (to catch up), the second step would have ZERO move force if we didn't
+        # re-apply it here.
+        self._apply_continuous_forces()
+
+        self.space.step(self.physics_dt)
+        self._invalidate_ground_contacts()
+
+    def _step_physics_instrumented(self, instrumentation: RuntimeInstrumentation):
+        """_step_physics(), timing each part and counting the resulting contacts."""
+        clock = instrumentation.clock
+
+        start_time = clock()
+        self._apply_continuous_forces()
+        forces_applied_time = clock()
+        self.space.step(self.physics_dt)
+        stepped_time = clock()
+        self._invalidate_ground_contacts()
+
+        instrumentation.record_phase(
+            "apply_continuous_forces", forces_applied_time - start_time
+        )
+        instrumentation.record_phase("space_step", stepped_time - forces_applied_time)
+        instrumentation.increment("physics_steps")
+
+        contacts: set[frozenset[int]] = set()
+
+        def add_contact(arbiter: pymunk.Arbiter):
+            shape_a, shape_b = arbiter.shapes
+            # Sensor overlaps are not contacts, as in EntityBody._query_is_on_ground.
+            if shape_a.sensor or shape_b.sensor:
+                return
+            # A contact between two entities is seen from both of their bodies.
+            contacts.add(frozenset((id(shape_a), id(shape_b))))
+
+        for entity in self.world_objects_controller.get_world_objects_by_type(Entity):
+            entity.body.each_arbiter(add_contact)
+        instrumentation.observe("arbiters", len(contacts))
+
+    def _update_state_hash(self):
+        self.state_hash = hash_entity_states(
+            self.world_objects_controller.get_world_objects_by_type(Entity),
+            self.state_hash,
+        )
+
+    def _invalidate_ground_contacts(self):
+        """Contacts change on every step, so cached ground state must be dropped."""
+        for entity in self.world_objects_controller.get_world_objects_by_type(Entity):
+            entity.body.invalidate_ground_contact()
 
     def _apply_continuous_forces(self):
         """
@@ -104,6 +342,24 @@ class Runtime:
         return self.level.map.tilemap
 
     def _setup_platform_physics(self):
+        level_hash = self.level_hash
+        if level_hash is None:
+            level_hash = hash_level_tiles(self.level)
+        if level_hash is None:
+            self._trace_platform_physics()
+            return
+
+        geometry = level_geometry_cache.get(level_hash)
+        if geometry is None:
+            geometry = LevelGeometry.capture(self.space, self._trace_platform_physics)
+            level_geometry_cache.put(level_hash, geometry)
+        else:
+            geometry.add_to_space(self.space)
+
+    def _trace_platform_physics(self):
+        # Only needed on a level geometry cache miss, so imported on first use.
+        from pytiling import TilemapBorderTracer, PymunkTilemapPhysics
+
         platforms = self.level.map.tilemap.get_layer("platforms")
         border_tracer = TilemapBorderTracer(platforms)
         PymunkTilemapPhysics(border_tracer, self.space)
@@ -0,0 +1,246 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator, List
+from .runtime import Runtime
+
+if TYPE_CHECKING:
+    from level.level import Level
+
+
+class _LevelEntry:
+    def __init__(self, level: "Level", level_hash: str):
+        self.level = level
+        self.level_hash = level_hash
+        self.idle: List[Runtime] = []
+        self.refilling = False
+
+
+class RuntimePool:
+    """
+    Keeps ready-to-run headless Runtimes per level, so starting an episode does not
+    pay for building the Space, tracing platforms and creating world objects.
+
+    acquire() hands out an idle Runtime of the level, already reset, and release()
+    resets it and takes it back. Each level is kept topped up to
+    `runtimes_per_level` idle runtimes by a background thread. Levels are keyed by
+    their hash and evicted least recently used first once more than `max_levels`
+    are pooled. `max_idle_runtimes` caps the idle runtimes of all levels together,
+    which bounds the pool's memory use; once it is reached, a level being topped up
+    takes the place of idle runtimes of the least recently used other levels.
+    """
+
+    def __init__(
+        self,
+        runtimes_per_level: int = 2,
+        max_levels: int = 16,
+        max_idle_runtimes: int = 64,
+        background_refill: bool = True,
+    ):
+        self.runtimes_per_level = runtimes_per_level
+        self.max_levels = max_levels
+        self.max_idle_runtimes = max_idle_runtimes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, _LevelEntry]" = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+        self._refill_executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="runtime-pool")
+            if background_refill
+            else None
+        )
+
+    def prewarm(self, level: "Level", level_hash: str, count: int | None = None):
+        """Builds idle runtimes for the level until it has `count` of them."""
+        with self._lock:
+            entry = self._touch(level, level_hash)
+        self._fill(entry, self.runtimes_per_level if count is None else count)
+
+    def acquire(self, level: "Level", level_hash: str) -> Runtime:
+        """
+        Returns a reset Runtime of the level, idle if one is available and newly
+        built otherwise. Give it back with release() when the episode is over.
+        """
+        with self._lock:
+            entry = self._touch(level, level_hash)
+            runtime = entry.idle.pop() if entry.idle else None
+            if runtime is not None:
+                self._idle_count -= 1
+                self.hits += 1
+            else:
+                self.misses += 1
+            should_refill = self._should_refill(entry)
+
+        if should_refill:
+            self._refill_executor.submit(self._refill, entry)
+
+        if runtime is None:
+            runtime = self._build(entry)
+        return runtime
+
+    def release(self, runtime: Runtime):
+        """Resets `runtime` and keeps it for its level, if there is room for it."""
+        _recycle(runtime)
+
+        with self._lock:
+            entry = self._entries.get(runtime.level_hash or "")
+            if entry is None or entry.level is not runtime.level:
+                # The level was evicted meanwhile.
+                return
+            if len(entry.idle) >= self.runtimes_per_level:
+                return
+            self._add_idle(entry, runtime)
+
+    @contextmanager
+    def lease(self, level: "Level", level_hash: str) -> Iterator[Runtime]:
+        """acquire() and release() around a block."""
+        runtime = self.acquire(level, level_hash)
+        try:
+            yield runtime
+        finally:
+            self.release(runtime)
+
+    def evict(self, level_hash: str):
+        with self._lock:
+            entry = self._entries.pop(level_hash, None)
+            if entry is not None:
+                self._idle_count -= len(entry.idle)
+                entry.idle.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._idle_count = 0
+
+    def close(self):
+        """Stops the refill thread and drops every pooled runtime."""
+        if self._refill_executor is not None:
+            self._refill_executor.shutdown(wait=True)
+        self.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        """The number of idle runtimes, over all levels."""
+        return self._idle_count
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "levels": len(self._entries),
+                "idle_runtimes": self._idle_count,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _touch(self, level: "Level", level_hash: str) -> _LevelEntry:
+        """Returns the level's entry, marked as most recently used. Holds the lock."""
+        entry = self._entries.get(level_hash)
+        if entry is None:
+            # The hash identifies the level, so later calls may pass another copy
+            # of it; runtimes are built from the first one.
+            entry = self._entries[level_hash] = _LevelEntry(level, level_hash)
+            while len(self._entries) > self.max_levels:
+                _, evicted = self._entries.popitem(last=False)
+                self._idle_count -= len(evicted.idle)
+        self._entries.move_to_end(level_hash)
+        return entry
+
+    def _should_refill(self, entry: _LevelEntry) -> bool:
+        """Holds the lock."""
+        if self._refill_executor is None or entry.refilling:
+            return False
+        if len(entry.idle) >= self.runtimes_per_level or not self._has_room(entry):
+            return False
+        entry.refilling = True
+        return True
+
+    def _refill(self, entry: _LevelEntry):
+        try:
+            self._fill(entry, self.runtimes_per_level)
+        finally:
+            entry.refilling = False
+
+    def _fill(self, entry: _LevelEntry, count: int):
+        while True:
+            with self._lock:
+                if (
+                    len(entry.idle) >= count
+                    or self._entries.get(entry.level_hash) is not entry
+                    or not self._make_room(entry)
+                ):
+                    return
+            # Built outside the lock, so acquire() is never held up by it.
+            runtime = self._build(entry)
+            with self._lock:
+                if self._entries.get(entry.level_hash) is not entry:
+                    return
+                self._add_idle(entry, runtime)
+
+    def _is_full(self) -> bool:
+        """Holds the lock."""
+        return self._idle_count >= self.max_idle_runtimes
+
+    def _has_room(self, entry: _LevelEntry) -> bool:
+        """
+        Whether an idle runtime can be added for the entry's level, if need be by
+        dropping one of a colder level. Holds the lock.
+        """
+        return not self._is_full() or self._coldest_other_level(entry) is not None
+
+    def _make_room(self, entry: _LevelEntry) -> bool:
+        """
+        Frees a slot for an idle runtime of the entry's level, dropping an idle
+        runtime of the least recently used other level when the pool is full.
+        Returns False if there is no room. Holds the lock.
+        """
+        if not self._is_full():
+            return True
+        coldest = self._coldest_other_level(entry)
+        if coldest is None:
+            return False
+        coldest.idle.pop()
+        self._idle_count -= 1
+        return True
+
+    def _coldest_other_level(self, entry: _LevelEntry) -> _LevelEntry | None:
+        """The least recently used other level with idle runtimes. Holds the lock."""
+        for other in self._entries.values():
+            if other is not entry and other.idle:
+                return other
+        return None
+
+    def _add_idle(self, entry: _LevelEntry, runtime: Runtime):
+        """Holds the lock."""
+        entry.idle.append(runtime)
+        self._idle_count += 1
+
+        # Over the ceiling: drop idle runtimes of the least recently used levels.
+        for other in list(self._entries.values()):
+            if self._idle_count <= self.max_idle_runtimes:
+                break
+            while other.idle and self._idle_count > self.max_idle_runtimes:
+                other.idle.pop()
+                self._idle_count -= 1
+
+    @staticmethod
+    def _build(entry: _LevelEntry) -> Runtime:
+        return Runtime(entry.level, render=False, level_hash=entry.level_hash)
+
+
+def _recycle(runtime: Runtime):
+    """Puts a used runtime back into the state of a freshly built one."""
+    runtime.reset()
+    runtime.execution_speed = 1.0
+    runtime.hash_state = False
+    runtime.disable_instrumentation()
+    runtime.goal_reached_callbacks.clear()
+    runtime.running = False
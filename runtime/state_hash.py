@@ -0,0 +1,66 @@
+"""
+Rolling hash of the physics state, for cheap determinism checks.
+
+Every step, the numeric state of each entity (Entity.state_hash_values: position,
+velocity, angle and angular velocity, plus e.g. the delver's jump timers) is
+quantized to multiples of STATE_HASH_QUANTUM and hashed, with its discrete state
+(Entity.state_hash_labels: the EntityState and locomotion state), together with
+the previous step's hash. Two runs that agree on every quantized value and state
+up to a step share its hash, so comparing two hash streams finds the first step
+where they diverge without storing or comparing whole frame snapshots.
+"""
+
+import hashlib
+import struct
+from typing import TYPE_CHECKING, Iterable, Sequence
+import numpy as np
+
+if TYPE_CHECKING:
+    from .world_objects.entities import Entity
+
+# A power of two, so quantization itself adds no rounding error.
+STATE_HASH_QUANTUM = 1 / 1024
+
+# The hash "before" the first step.
+INITIAL_STATE_HASH = 0
+
+_HASH_STRUCT = struct.Struct("<Q")
+
+
+def hash_entity_states(
+    entities: "Iterable[Entity]", previous_hash: int = INITIAL_STATE_HASH
+) -> int:
+    """Returns the 64-bit hash of the entities' quantized state after previous_hash."""
+    scale = 1 / STATE_HASH_QUANTUM
+    values: list[float] = []
+    labels: list[str] = []
+    for entity in entities:
+        values += entity.state_hash_values()
+        labels += entity.state_hash_labels()
+
+    # For the handful of entities of a level, plain Python beats building arrays.
+    quantized = struct.pack(f"<{len(values)}q", *[round(v * scale) for v in values])
+    digest = hashlib.blake2b(
+        _HASH_STRUCT.pack(previous_hash) + quantized + "\0".join(labels).encode(),
+        digest_size=8,
+    ).digest()
+    return _HASH_STRUCT.unpack(digest)[0]
+
+
+def first_divergent_step(
+    expected_hashes: Sequence[int], actual_hashes: Sequence[int]
+) -> int | None:
+    """
+    Returns the index of the first step whose hashes differ, or where one stream
+    ends before the other, or None if both are identical.
+    """
+    common_length = min(len(expected_hashes), len(actual_hashes))
+    differs = np.flatnonzero(
+        np.asarray(expected_hashes[:common_length], dtype=np.uint64)
+        != np.asarray(actual_hashes[:common_length], dtype=np.uint64)
+    )
+    if len(differs):
+        return int(differs[0])
+    if len(expected_hashes) != len(actual_hashes):
+        return common_length
+    return None
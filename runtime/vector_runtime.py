@@ -0,0 +1,168 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Sequence
+import numpy as np
+from .runtime import Runtime
+from .config import PHYSICS_FPS
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+    from level.level import Level
+
+
+# Locomotion states are exposed as small integer codes. The index of each name
+# in this tuple is its code.
+LOCOMOTION_STATES = ("IDLE", "RUN", "GO_UP", "FALL", "LAND", "JUMP")
+_LOCOMOTION_STATE_CODES = {name: code for code, name in enumerate(LOCOMOTION_STATES)}
+
+
+@dataclass
+class VectorRuntimeState:
+    """
+    Stacked state of every environment of a VectorRuntime after a step.
+    The first dimension of each array is the environment index.
+    """
+
+    position: np.ndarray  # (N, 2) float64
+    velocity: np.ndarray  # (N, 2) float64
+    is_on_ground: np.ndarray  # (N,) bool
+    locomotion_state: np.ndarray  # (N,) int8, see LOCOMOTION_STATES
+    victorious: np.ndarray  # (N,) bool
+    truncated: np.ndarray  # (N,) bool
+    episode_steps: np.ndarray  # (N,) int32
+
+    @property
+    def done(self) -> np.ndarray:
+        return self.victorious | self.truncated
+
+
+class VectorRuntime:
+    """
+    Owns several headless Runtimes and steps them in lockstep, exchanging
+    batched NumPy arrays with the caller instead of per-environment objects.
+    """
+
+    def __init__(
+        self,
+        levels: "Sequence[Level] | Level",
+        num_envs: int | None = None,
+        frame_dt: float = 1.0 / PHYSICS_FPS,
+        max_episode_steps: int | None = None,
+        auto_reset: bool = True,
+        level_hashes: "Sequence[str | None] | None" = None,
+    ):
+        if not isinstance(levels, Sequence):
+            levels = [levels]
+        if not levels:
+            raise ValueError("VectorRuntime needs at least one level.")
+
+        self.levels: "list[Level]" = list(levels)
+        # Optional hashes, parallel to `levels`, used to share traced geometry.
+        self.level_hashes = (
+            list(level_hashes) if level_hashes is not None else [None] * len(levels)
+        )
+        if len(self.level_hashes) != len(self.levels):
+            raise ValueError("level_hashes must have one entry per level.")
+        self.num_envs = num_envs if num_envs is not None else len(self.levels)
+        if self.num_envs <= 0:
+            raise ValueError("num_envs must be positive.")
+
+        self.frame_dt = frame_dt
+        self.max_episode_steps = max_episode_steps
+        self.auto_reset = auto_reset
+
+        # Environments are assigned to levels round-robin.
+        self.runtimes: list[Runtime] = [
+            self._runtime_factory(env_index) for env_index in range(self.num_envs)
+        ]
+        self.episode_steps = np.zeros(self.num_envs, dtype=np.int32)
+
+    def step(self, run: "ArrayLike", jump: "ArrayLike") -> VectorRuntimeState:
+        """
+        Applies one action per environment and advances every runtime by
+        frame_dt. `run` holds -1, 0 or 1 per environment and `jump` a bool.
+        """
+        run_array = np.broadcast_to(np.asarray(run, dtype=np.int8), (self.num_envs,))
+        jump_array = np.broadcast_to(np.asarray(jump, dtype=bool), (self.num_envs,))
+
+        dt = self.frame_dt
+        for runtime, direction, should_jump in zip(
+            self.runtimes, run_array.tolist(), jump_array.tolist()
+        ):
+            delver = runtime.delver
+            if direction != 0:
+                delver.run(dt, direction)
+            if should_jump:
+                delver.jump(dt)
+            runtime.update(dt)
+
+        self.episode_steps += 1
+        state = self._collect_state()
+
+        if self.auto_reset:
+            finished = np.flatnonzero(state.done)
+            if finished.size:
+                self.reset(finished.tolist())
+
+        return state
+
+    def reset(self, env_indices: "Sequence[int] | None" = None) -> VectorRuntimeState:
+        """
+        Starts a new episode on the given environments (all of them by default)
+        and returns the state of every environment afterwards.
+        """
+        if env_indices is None:
+            env_indices = range(self.num_envs)
+
+        for env_index in env_indices:
+            self.runtimes[env_index].reset()
+            self.episode_steps[env_index] = 0
+
+        return self._collect_state()
+
+    def _runtime_factory(self, env_index: int) -> Runtime:
+        level_index = env_index % len(self.levels)
+        return Runtime(
+            self.levels[level_index],
+            render=False,
+            level_hash=self.level_hashes[level_index],
+        )
+
+    def _collect_state(self) -> VectorRuntimeState:
+        num_envs = self.num_envs
+        position = np.empty((num_envs, 2), dtype=np.float64)
+        velocity = np.empty((num_envs, 2), dtype=np.float64)
+        is_on_ground = np.empty(num_envs, dtype=bool)
+        locomotion_state = np.empty(num_envs, dtype=np.int8)
+        victorious = np.empty(num_envs, dtype=bool)
+
+        for env_index, runtime in enumerate(self.runtimes):
+            delver = runtime.delver
+            body = delver.body
+            position[env_index] = body.position
+            velocity[env_index] = body.velocity
+            is_on_ground[env_index] = body.is_on_ground
+            locomotion_state[env_index] = _locomotion_state_code(
+                delver.locomotion_state
+            )
+            victorious[env_index] = runtime.victorious
+
+        if self.max_episode_steps is None:
+            truncated = np.zeros(num_envs, dtype=bool)
+        else:
+            truncated = (self.episode_steps >= self.max_episode_steps) & ~victorious
+
+        return VectorRuntimeState(
+            position=position,
+            velocity=velocity,
+            is_on_ground=is_on_ground,
+            locomotion_state=locomotion_state,
+            victorious=victorious,
+            truncated=truncated,
+            episode_steps=self.episode_steps.copy(),
+        )
+
+
+def _locomotion_state_code(locomotion_state: Any) -> int:
+    return _LOCOMOTION_STATE_CODES.get(
+        getattr(locomotion_state, "value", locomotion_state), -1
+    )
@@ -1,4 +1,5 @@
 from .world_object import WorldObject
 from .world_objects_controller import WorldObjectsController
+from .collision_type import CollisionType
 
-__all__ = ["WorldObject", "WorldObjectsController"]
+__all__ = ["WorldObject", "WorldObjectsController", "CollisionType"]
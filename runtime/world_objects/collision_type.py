@@ -0,0 +1,12 @@
+from enum import IntEnum
+
+
+class CollisionType(IntEnum):
+    """The pymunk collision types of the shapes in a Runtime's space."""
+
+    DELVER = 1
+    # Set on the traced platform geometry by pytiling.
+    PLATFORM = 2
+    # Sensor shapes of items, which detect overlaps without colliding.
+    ITEM = 3
+    GOAL = 4
@@ -1,11 +1,9 @@
 from enum import Enum
-import pyglet
-from pyglet_dragonbones.skeleton import Skeleton
 from .delver_body import DelverBody
 import pymunk
 from ..skeletal_entity import SkeletalEntity, LocomotionState
 from runtime.config import ASSETS_PATH
-from utils import vector_to_angle
+from runtime.utils import vector_to_angle
 
 
 class DelverLocomotionState(str, Enum):
@@ -27,6 +25,10 @@ class Delver(SkeletalEntity):
         super().__init__(runtime, body, skeleton)
 
     def _skeleton_factory(self, render):
+        # Imported here so headless runs never load pyglet or its graphics modules.
+        import pyglet
+        from pyglet_dragonbones.skeleton import Skeleton
+
         if render == True:
             delver_groups = {
                 "feather": pyglet.graphics.Group(6),
@@ -60,6 +62,14 @@ class Delver(SkeletalEntity):
             self.locomotion_state = DelverLocomotionState.JUMP
             self.play_locomotion_animation()
 
+    def state_hash_values(self) -> list[float]:
+        # The jump timers decide whether the delver can jump, as in its snapshots.
+        return [
+            *super().state_hash_values(),
+            self.body.jump_cooldown_timer,
+            self.body.jump_tolerance_timer,
+        ]
+
     def draw(self, dt):
         if self.skeleton:
             self.skeleton.draw(dt)
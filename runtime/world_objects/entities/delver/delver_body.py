@@ -1,4 +1,5 @@
 from ..entity_body import EntityBody
+from ...collision_type import CollisionType
 import pymunk
 from pymunk import Vec2d
 
@@ -36,7 +37,7 @@ class DelverBody(EntityBody):
                 tx=center_of_gravity[0], ty=center_of_gravity[1]
             ),
         )
-        self.shape.collision_type = 1
+        self.shape.collision_type = CollisionType.DELVER
         self.jump_tolerance_timer = 0
         self.jump_cooldown_timer = 0
         self.jumped = False
@@ -49,13 +50,7 @@ class DelverBody(EntityBody):
             self.jumped = True
 
             # Check if we are physically touching something (Arbiter exists)
-            has_contact = False
-
-            def check_contact(arbiter):
-                nonlocal has_contact
-                has_contact = True
-
-            self.each_arbiter(check_contact)
+            has_contact = self.has_contact
 
             # GAP FIX:
             # If we are allowed to jump (Raycast/Coyote) but have NO physical contact,
@@ -72,6 +67,12 @@ class DelverBody(EntityBody):
 
         return self.jumped
 
+    def reset(self):
+        super().reset()
+        self.jump_tolerance_timer = 0
+        self.jump_cooldown_timer = 0
+        self.jumped = False
+
     def update(self, dt):
         super().update(dt)
 
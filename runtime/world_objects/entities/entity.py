@@ -30,6 +30,12 @@ class Entity(WorldObject):
     def shape(self):
         return next(iter(self.body.shapes))
 
+    @property
+    def bounding_box(self):
+        """Computed from the collision shape when read, rather than every frame."""
+        bb = self.shape.cache_bb()
+        return (bb.left, bb.bottom, bb.right, bb.top)
+
     @property
     def is_on_ground(self) -> bool:
         """Check if the entity is on the ground."""
@@ -82,11 +88,39 @@ class Entity(WorldObject):
             False  # Reset the flag for the next frame's input
         )
 
-        bb = self.shape.cache_bb()
-        self.bounding_box = (bb.left, bb.bottom, bb.right, bb.top)
-
         self.body.update(dt)
 
+    def reset(self):
+        self.state = EntityState.NORMAL
+        self.is_moving_intentionally = False
+        self.body.reset()
+        super().reset()
+
+    def state_hash_values(self) -> list[float]:
+        """The numeric state hashed every step by runtime.state_hash."""
+        body = self.body
+        position = body.position
+        velocity = body.velocity
+        return [
+            position.x,
+            position.y,
+            velocity.x,
+            velocity.y,
+            body.angle,
+            body.angular_velocity,
+        ]
+
+    def state_hash_labels(self) -> list[str]:
+        """The discrete state hashed every step by runtime.state_hash."""
+        return [self.state.name]
+
+    def cleanup(self):
+        """Removes the body from the space, so the entity stops colliding."""
+        space = self.body.space
+        if space is not None:
+            space.remove(self.body, *self.body.shapes)
+        super().cleanup()
+
     def _limit_speed(self):
         vx, vy = self.body.velocity
         max_vx, max_vy = self.MAX_SPEED
@@ -114,6 +148,7 @@ class Entity(WorldObject):
     def position(self, position: tuple[float, float]):
         self._conditionally_set_spawn_based_id(position)
         self.body.position = Vec2d(position[0], position[1])
+        self.body.invalidate_ground_contact()
 
     @property
     def angle(self):
@@ -122,6 +157,7 @@ class Entity(WorldObject):
     @angle.setter
     def angle(self, angle: float):
         self.body.angle = angle
+        self.body.invalidate_ground_contact()
 
     @property
     def target_angle(self) -> float | None:
@@ -1,7 +1,13 @@
 import pymunk
 from .entity import EntityState
+from ..collision_type import CollisionType
 import math
 from pymunk import Vec2d
+from typing import TYPE_CHECKING, cast
+
+if TYPE_CHECKING:
+    from runtime.instrumentation import RuntimeInstrumentation
+
 
 class EntityBody(pymunk.Body):
     MOVE_FORCE: float
@@ -23,10 +29,19 @@ class EntityBody(pymunk.Body):
         self.braking_force = self.BRAKING_FORCE
         self.min_velocity_to_brake = self.MIN_VELOCITY_TO_BRAKE
 
+        # Contact state is computed lazily at most once per physics step.
+        self._on_ground: bool | None = None
+        self._has_contact = False
+
+        # Set by Runtime.enable_instrumentation().
+        self.instrumentation: "RuntimeInstrumentation | None" = None
+
     def setup_collision_handlers(self):
         if not self.space:
             raise ValueError("Space not set for the entity's body.")
-        collision_handler = self.space.add_collision_handler(1, 2)
+        collision_handler = self.space.add_collision_handler(
+            CollisionType.DELVER, CollisionType.PLATFORM
+        )
         collision_handler.pre_solve = self._on_collision_pre_solve
 
     def _on_collision_pre_solve(self, arbiter, space, data):
@@ -73,10 +88,73 @@ class EntityBody(pymunk.Body):
     def update(self, dt):
         pass
 
+    def reset(self):
+        """
+        Puts the body back at rest. If the body is in a space, it is removed and
+        re-added so that cached contacts from the previous episode are discarded.
+        """
+        space = self.space
+        shapes = list(self.shapes)
+        if space is not None:
+            space.remove(self, *shapes)
+
+        self.velocity = Vec2d(0, 0)
+        self.angular_velocity = 0
+        self.force = Vec2d(0, 0)
+        self.torque = 0
+        self.angle = 0
+
+        self.move_force = self.MOVE_FORCE
+        self.braking_force = self.BRAKING_FORCE
+        self.min_velocity_to_brake = self.MIN_VELOCITY_TO_BRAKE
+
+        if space is not None:
+            space.add(self, *shapes)
+
+        self.invalidate_ground_contact()
+
+    def invalidate_ground_contact(self):
+        """
+        Drops the cached contact state. Called after every physics step and whenever
+        the body is moved outside of the simulation.
+        """
+        self._on_ground = None
+
     @property
     def is_on_ground(self) -> bool:
         """
-        Checks if the entity is on the ground using a segment query (raycast) downwards.
+        Whether the entity is on the ground. The result is cached until the next
+        physics step, so it can be read freely within a frame.
+        """
+        if self._on_ground is None:
+            self._update_contact_state()
+        return cast(bool, self._on_ground)
+
+    @property
+    def has_contact(self) -> bool:
+        """Whether the body is physically touching anything (an arbiter exists)."""
+        if self._on_ground is None:
+            self._update_contact_state()
+        return self._has_contact
+
+    def _update_contact_state(self):
+        self._has_contact = False
+
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            self._on_ground = self._query_is_on_ground()
+            return
+
+        start_time = instrumentation.clock()
+        self._on_ground = self._query_is_on_ground()
+        instrumentation.record_phase(
+            "ground_query", instrumentation.clock() - start_time
+        )
+
+    def _query_is_on_ground(self) -> bool:
+        """
+        Checks if the entity is on the ground using its contacts and, failing that, a
+        segment query (raycast) downwards.
         """
         if self.space == None:
             return False
@@ -91,6 +169,11 @@ class EntityBody(pymunk.Body):
 
         def check_arbiter(arbiter):
             nonlocal is_touching_ground
+            # Overlapping an item's sensor is not a physical contact.
+            if arbiter.shapes[0].sensor or arbiter.shapes[1].sensor:
+                return
+
+            self._has_contact = True
             if is_touching_ground:
                 return
 
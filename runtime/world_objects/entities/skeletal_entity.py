@@ -66,6 +66,14 @@ class SkeletalEntity(Entity):
             if abs(self.velocity.y) > 1.0:
                 self.previous_on_air_velocity = (self.velocity.x, self.velocity.y)
 
+    def reset(self):
+        super().reset()
+        self.locomotion_state = LocomotionState.IDLE
+        self.previous_on_air_velocity = (0, 0)
+        self.move_angle = None
+        self.angle = 0.0
+        self.scale = (1, 1)
+
     @property
     def locomotion_state(self):
         return self._locomotion_state
@@ -104,6 +112,13 @@ class SkeletalEntity(Entity):
 
         self.locomotion_state = new_state
 
+    def state_hash_labels(self) -> list[str]:
+        locomotion_state = self.locomotion_state
+        return [
+            *super().state_hash_labels(),
+            getattr(locomotion_state, "value", locomotion_state),
+        ]
+
     def resolve_locomotion_state(self, state_name: str):
         for enum_cls in self.locomotion_state_enums:
             try:
@@ -168,6 +183,7 @@ class SkeletalEntity(Entity):
             self.skeleton.run_animation(animation_name, starting_frame, speed, on_end)
 
     def cleanup(self):
+        super().cleanup()
         if hasattr(self, "skeleton") and self.skeleton:
             del self.skeleton.batch
             del self.skeleton
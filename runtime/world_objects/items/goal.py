@@ -1,7 +1,9 @@
 from .item import Item
+from ..collision_type import CollisionType
 from runtime.config import ASSETS_PATH
 
 class Goal(Item):
+    COLLISION_TYPE = CollisionType.GOAL
 
     def __init__(self, runtime, variation: str, render):
         super().__init__(
@@ -1,5 +1,7 @@
 from ..world_object import WorldObject
+from ..collision_type import CollisionType
 from typing import Optional, Any, TYPE_CHECKING
+import pymunk
 
 
 if TYPE_CHECKING:
@@ -8,6 +10,8 @@ if TYPE_CHECKING:
 
 
 class Item(WorldObject):
+    # Collision type of the item's sensor shape, see Runtime for the handlers.
+    COLLISION_TYPE = CollisionType.ITEM
 
     def __init__(
         self,
@@ -23,6 +27,9 @@ class Item(WorldObject):
         self.render = render
         self.size: tuple[int, int] = size
 
+        # Overlaps with the delver are detected by pymunk during the physics step.
+        self.sensor = self._create_sensor(runtime.space)
+
         if render:
             self.batch = batch
             self.sprite = self._create_sprite(sprite_path, animation)
@@ -31,6 +38,15 @@ class Item(WorldObject):
         else:
             self.sprite = None
 
+    def _create_sensor(self, space: pymunk.Space) -> pymunk.Shape:
+        body = pymunk.Body(body_type=pymunk.Body.STATIC)
+        body.position = self.position
+        sensor = pymunk.Poly.create_box(body, self.size)
+        sensor.sensor = True
+        sensor.collision_type = self.COLLISION_TYPE
+        space.add(body, sensor)
+        return sensor
+
     def _create_sprite(
         self, sprite_path: Optional[str], animation: Optional["Animation"]
     ):
@@ -72,21 +88,28 @@ class Item(WorldObject):
         if self.sprite:
             self._update_sprite_position()
 
-    def _update_sprite_position(self):
-        if self.sprite:
-            self.sprite.update(x=self.position[0], y=self.position[1])
+        # Static bodies are not moved by the simulation, so pymunk must be told.
+        body = self.sensor.body
+        body.position = position
+        if body.space is not None:
+            body.space.reindex_shapes_for_body(body)
 
-    def update(self, dt):
-        """Update the item and its sprite if needed."""
+    @property
+    def bounding_box(self):
+        """Computed from the position when read, rather than every frame."""
         x, y = self.position
         width, height = self.size
-        self.bounding_box = (
+        return (
             x - width // 2,
             y - height // 2,
             x + width // 2,
             y + height // 2,
         )
 
+    def _update_sprite_position(self):
+        if self.sprite:
+            self.sprite.update(x=self.position[0], y=self.position[1])
+
     def draw(self, dt):
         """Draw the sprite if it exists."""
         if self.sprite:
@@ -96,3 +119,10 @@ class Item(WorldObject):
         """Clean up the sprite when no longer needed."""
         if self.sprite:
             self.sprite.delete()
+        self.cleanup()
+
+    def cleanup(self):
+        """Removes the sensor from the space, so the item stops detecting overlaps."""
+        body = self.sensor.body
+        if body.space is not None:
+            body.space.remove(body, self.sensor)
@@ -10,16 +10,12 @@ class WorldObject:
 
         self._position = (0.0, 0.0)
         self._spawn_based_id: str | None = None
-
-        self._bounding_box: tuple[float, float, float, float] | None = None
+        self._spawn_position: tuple[float, float] | None = None
 
     @property
-    def bounding_box(self):
-        return self._bounding_box
-
-    @bounding_box.setter
-    def bounding_box(self, bounding_box: tuple[float, float, float, float]):
-        self._bounding_box = bounding_box
+    def bounding_box(self) -> tuple[float, float, float, float] | None:
+        """(left, bottom, right, top), or None for objects without an extent."""
+        return None
 
     @property
     def position(self):
@@ -37,6 +33,7 @@ class WorldObject:
             self._spawn_based_id = (
                 f"{self.__class__.__name__}:{position[0]}_{position[1]}"
             )
+            self._spawn_position = position
 
     @property
     def spawn_based_id(self):
@@ -72,6 +69,11 @@ class WorldObject:
             x1_max < x2_min or x1_min > x2_max or y1_max < y2_min or y1_min > y2_max
         )
 
+    def reset(self):
+        """Restore the world object to the state it was spawned with."""
+        if self._spawn_position is not None:
+            self.position = self._spawn_position
+
     def cleanup(self):
         pass
 
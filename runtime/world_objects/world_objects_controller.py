@@ -1,7 +1,13 @@
-from typing import TYPE_CHECKING, List
+import bisect
+from typing import TYPE_CHECKING, List, Tuple
 
 if TYPE_CHECKING:
     from .entities.entity import WorldObject
+    from runtime.instrumentation import RuntimeInstrumentation
+
+
+def _spawn_based_id_key(world_object: "WorldObject") -> str:
+    return world_object.spawn_based_id
 
 
 class WorldObjectsController:
@@ -10,12 +16,24 @@ class WorldObjectsController:
         self.world_object_groups: dict[str, set["WorldObject"]] = {}
         self.world_objects_by_spawn_based_id: dict[str, "WorldObject"] = {}
 
+        # Kept sorted by spawn_based_id on every add/remove, so iteration order is
+        # deterministic without sorting each frame. The list is replaced rather than
+        # mutated, which keeps loops over it safe if objects are added or removed
+        # while they run.
+        self._sorted_world_objects: List["WorldObject"] = []
+        self._world_objects_by_type: dict[type, Tuple["WorldObject", ...]] = {}
+        self._unique_identifiers: dict[str, "WorldObject"] = {}
+
+        # Set by Runtime.enable_instrumentation().
+        self.instrumentation: "RuntimeInstrumentation | None" = None
+
     def add_world_object(
         self,
         world_object: "WorldObject",
         group_name: str | None = None,
         unique_identifier: str | None = None,
     ):
+        is_new = world_object not in self.world_objects
         self.world_objects.add(world_object)
 
         if group_name is not None:
@@ -25,31 +43,96 @@ class WorldObjectsController:
 
         if unique_identifier is not None:
             setattr(self, unique_identifier, world_object)
+            self._unique_identifiers[unique_identifier] = world_object
 
         self.world_objects_by_spawn_based_id[world_object.spawn_based_id] = world_object
 
+        if is_new:
+            sorted_world_objects = list(self._sorted_world_objects)
+            bisect.insort(sorted_world_objects, world_object, key=_spawn_based_id_key)
+            self._sorted_world_objects = sorted_world_objects
+            self._world_objects_by_type.clear()
+
+    def remove_world_object(self, world_object: "WorldObject"):
+        """
+        Removes a world object and every reference the controller holds to it, and
+        cleans it up.
+        """
+        if world_object not in self.world_objects:
+            return
+        self.world_objects.remove(world_object)
+
+        for group in self.world_object_groups.values():
+            group.discard(world_object)
+
+        for unique_identifier, identified in list(self._unique_identifiers.items()):
+            if identified is world_object:
+                delattr(self, unique_identifier)
+                del self._unique_identifiers[unique_identifier]
+
+        spawn_based_id = world_object.spawn_based_id
+        if self.world_objects_by_spawn_based_id.get(spawn_based_id) is world_object:
+            del self.world_objects_by_spawn_based_id[spawn_based_id]
+
+        self._sorted_world_objects = [
+            obj for obj in self._sorted_world_objects if obj is not world_object
+        ]
+        self._world_objects_by_type.clear()
+
+        world_object.cleanup()
+
     def get_world_object(self, name: str) -> "WorldObject":
         return getattr(self, name)
 
     def _get_sorted_objects(self) -> List["WorldObject"]:
         """
         Helper method to get a deterministically sorted list of world objects.
-        It sorts based on the unique spawn_based_id of each object.
+        It is ordered by the unique spawn_based_id of each object.
         """
-        return sorted(list(self.world_objects), key=lambda obj: obj.spawn_based_id)
-
-    def get_world_objects_by_type(self, world_object_type: type):
-        """Get all world objects of a specific type."""
-        return [
-            obj
-            for obj in self._get_sorted_objects()
-            if isinstance(obj, world_object_type)
-        ]
+        return self._sorted_world_objects
+
+    def get_world_objects_by_type(
+        self, world_object_type: type
+    ) -> Tuple["WorldObject", ...]:
+        """
+        Get all world objects of a specific type. The tuple is cached until objects
+        are added or removed, so it is cheap to call every physics step.
+        """
+        world_objects = self._world_objects_by_type.get(world_object_type)
+        if world_objects is None:
+            world_objects = tuple(
+                obj
+                for obj in self._sorted_world_objects
+                if isinstance(obj, world_object_type)
+            )
+            self._world_objects_by_type[world_object_type] = world_objects
+        return world_objects
 
     def update_world_objects(self, dt: float):
-        for world_object in self._get_sorted_objects():
+        if self.instrumentation is not None:
+            self._update_world_objects_instrumented(dt, self.instrumentation)
+            return
+
+        for world_object in self._sorted_world_objects:
             world_object.update(dt)
 
+    def _update_world_objects_instrumented(
+        self, dt: float, instrumentation: "RuntimeInstrumentation"
+    ):
+        clock = instrumentation.clock
+        start_time = clock()
+        for world_object in self._sorted_world_objects:
+            object_start_time = clock()
+            world_object.update(dt)
+            instrumentation.record_phase(
+                f"update:{type(world_object).__name__}", clock() - object_start_time
+            )
+        instrumentation.record_phase("update_world_objects", clock() - start_time)
+
+    def reset_world_objects(self):
+        for world_object in self._sorted_world_objects:
+            world_object.reset()
+
     def draw_world_objects(self, dt: float):
-        for world_object in self._get_sorted_objects():
+        for world_object in self._sorted_world_objects:
             world_object.draw(dt)
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from benchmarks.concurrent_saves import AGENT_NAME, _save_many
+from runtime.episode_trajectory import EpisodeTrajectory
+from runtime.episode_trajectory._get_trajectory_dir import get_trajectory_dir
+from runtime.episode_trajectory.trajectory_saver import STALE_CLAIM_SECONDS
+from runtime.episode_trajectory.trajectory_summary import read_trajectory_summary
+
+PROCESSES = 3
+SAVES_PER_PROCESS = 20
+
+
+def test_parallel_saves_get_unique_indices(tmp_path, monkeypatch):
+    # Trajectory directories are relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+
+    processes = [
+        multiprocessing.Process(
+            target=_save_many, args=(worker, SAVES_PER_PROCESS, worker % 2 == 0)
+        )
+        for worker in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0] * PROCESSES
+
+    expected = sorted(
+        f"{worker}:{number}"
+        for worker in range(PROCESSES)
+        for number in range(SAVES_PER_PROCESS)
+    )
+    trajectory_dir = get_trajectory_dir(AGENT_NAME)
+    trajectory_files = list(trajectory_dir.glob("trajectory_*"))
+    indices = sorted(int(path.stem.split("_")[1]) for path in trajectory_files)
+    saved = sorted(
+        read_trajectory_summary(path).level_hash for path in trajectory_files
+    )
+
+    assert indices == list(range(len(expected)))
+    assert saved == expected
+    assert not list(trajectory_dir.glob(".trajectory_*.claim"))
+
+    with open(trajectory_dir / "metadata.json") as f:
+        assert json.load(f)["trajectory_count"] == len(expected)
+
+
+def test_abandoned_claim_is_reclaimed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Also creates the directory.
+    trajectory_dir = get_trajectory_dir(AGENT_NAME)
+
+    # Left behind by a saver that crashed while saving the first trajectory.
+    claim_path = trajectory_dir / ".trajectory_0.claim"
+    claim_path.touch()
+    abandoned_time = time.time() - 2 * STALE_CLAIM_SECONDS
+    os.utime(claim_path, (abandoned_time, abandoned_time))
+
+    asyncio.run(EpisodeTrajectory(60, False, "reclaimed").save(AGENT_NAME))
+
+    assert [path.name for path in trajectory_dir.glob("trajectory_*")] == [
+        "trajectory_0.json"
+    ]
+    assert not claim_path.exists()
@@ -0,0 +1,18 @@
+import subprocess
+import sys
+from pathlib import Path
+from benchmarks.import_time import RENDERING_MODULES
+
+REPOSITORY_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_importing_runtime_does_not_load_rendering_modules():
+    check = "; ".join(
+        f"assert {module!r} not in sys.modules, {module!r}"
+        for module in RENDERING_MODULES
+    )
+    subprocess.run(
+        [sys.executable, "-c", f"import runtime, sys; {check}"],
+        check=True,
+        cwd=REPOSITORY_ROOT,
+    )